@@ -2,12 +2,12 @@ import os
 import sys
 from datetime import timedelta
 
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, jsonify
 import django
 from flask_cors import CORS
 
 import redis
-from flask_jwt_extended import JWTManager, create_access_token
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
 
 from data.service.cron_jobs.main import start_background_scheduler
 
@@ -27,14 +27,27 @@ django.setup()
 
 from database.model.models import Position
 from shared.utils.logger import configure_logger
+from shared.utils.pipeline_resumption import PipelineResumption
 
 configure_logger(os.getenv("LOGGER_LEVEL", "INFO"))
 
 cache = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 
+pipeline_resumption = None
+
+
+def resume_pipeline(pipeline):
+
+    ingestion = start_symbol_trading(pipeline)
+
+    # Waits for the pipeline to be started on the ingestion engine.
+    ingestion.result()
+
 
 def startup_task(app):
 
+    global pipeline_resumption
+
     start_background_scheduler()
 
     open_positions = Position.objects.filter(pipeline__active=True)
@@ -44,11 +57,18 @@ def startup_task(app):
         bearer_token = 'Bearer ' + access_token
         cache.set("bearer_token", bearer_token)
 
+    pipelines = []
     for open_position in open_positions:
-        start_symbol_trading(open_position.pipeline)
         open_position.pipeline.active = True
         open_position.pipeline.save()
 
+        pipelines.append(open_position.pipeline)
+
+    pipeline_resumption = PipelineResumption(
+        resume_pipeline,
+        get_candle_size=lambda pipeline: pipeline.interval
+    ).start(pipelines)
+
 
 def create_app():
     app = Flask(__name__, static_folder="../build/static", template_folder="../build")
@@ -68,6 +88,11 @@ def create_app():
 
     startup_task(app)
 
+    @app.get('/api/startup_status')
+    @jwt_required()
+    def startup_status():
+        return jsonify(pipeline_resumption.to_dict())
+
     @app.get('/', defaults={'path': ''})
     @app.get('/<path:path>')
     def index(path):
@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 
 import django
@@ -15,6 +14,7 @@ from data.service.helpers.decorators.handle_app_errors import handle_app_errors
 from data.service.helpers.exceptions import PipelineStartFail, DataPipelineDoesNotExist
 from data.service.helpers.responses import Responses
 from data.sources._sources import DataHandler
+from data.sources.binance.engine import get_ingestion_engine
 from shared.exchanges import BinanceHandler
 from shared.utils.decorators import handle_db_connection_error
 from shared.utils.helpers import get_item_from_cache, get_logging_row_header
@@ -28,8 +28,6 @@ cache = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 
 bots_api = Blueprint('bots_api', __name__)
 
-executor = ThreadPoolExecutor(16)
-
 binance_instances = []
 
 binance_client = BinanceHandler()
@@ -41,7 +39,8 @@ def initialize_data_collection(pipeline, header):
 
     data_handler = DataHandler(pipeline, header=header)
     binance_instances.append(data_handler.binance_handler)
-    data_handler.binance_handler.start_data_ingestion(header=header)
+
+    return data_handler.binance_handler
 
 
 def reduce_instances(instances, instance, pipeline_id, header):
@@ -74,9 +73,8 @@ def start_symbol_trading(pipeline):
 
     logging.info(header + f"Starting data pipeline.")
 
-    executor.submit(
-        initialize_data_collection,
-        pipeline,
+    return get_ingestion_engine().start_data_ingestion(
+        lambda: initialize_data_collection(pipeline, header),
         header
     )
 
@@ -0,0 +1 @@
+from data.service.cron_jobs.archive_data._archive_data import archive_exchange_data
@@ -0,0 +1,25 @@
+import logging
+import os
+
+import django
+
+from shared.data.archive import archive_data
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import ExchangeData
+
+
+def is_pruning_enabled():
+    return os.getenv('DATA_ARCHIVE_PRUNE', '').lower() in ('1', 'true')
+
+
+def archive_exchange_data():
+    """
+    Exports closed months of raw data to the Parquet archive, and prunes them
+    from the database if DATA_ARCHIVE_PRUNE is set.
+    """
+    logging.debug('Archiving exchange data...')
+
+    archive_data(ExchangeData, prune=is_pruning_enabled())
@@ -3,7 +3,11 @@ import os
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from data.service.cron_jobs.archive_data import archive_exchange_data
 from data.service.cron_jobs.check_app_is_running import check_app_is_running
+from data.service.cron_jobs.manage_partitions import manage_partitions
+from data.service.cron_jobs.repair_gaps import repair_gaps
+from shared.data.archive import ARCHIVE_PATH
 
 
 def start_background_scheduler():
@@ -16,4 +20,18 @@ def start_background_scheduler():
     scheduler = BackgroundScheduler()
     scheduler.add_job(check_app_is_running, "interval", seconds=int(interval_between_checks))
 
+    interval_between_repairs = os.getenv('GAP_REPAIR_INTERVAL', 3600)
+
+    scheduler.add_job(repair_gaps, "interval", seconds=int(interval_between_repairs))
+
+    # Partitions are created months ahead, so a daily check keeps them ahead of the new rows.
+    interval_between_partition_checks = os.getenv('PARTITIONS_INTERVAL', 86400)
+
+    scheduler.add_job(manage_partitions, "interval", seconds=int(interval_between_partition_checks))
+
+    if ARCHIVE_PATH:
+        interval_between_archives = os.getenv('ARCHIVE_INTERVAL', 86400)
+
+        scheduler.add_job(archive_exchange_data, "interval", seconds=int(interval_between_archives))
+
     scheduler.start()
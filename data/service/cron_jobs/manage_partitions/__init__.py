@@ -0,0 +1 @@
+from data.service.cron_jobs.manage_partitions._manage_partitions import manage_partitions
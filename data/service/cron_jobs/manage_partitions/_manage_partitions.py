@@ -0,0 +1,21 @@
+import logging
+import os
+
+import django
+from django.core.management import call_command
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+# Number of months after the current one for which partitions of the candle tables are created.
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', 3))
+
+
+def manage_partitions():
+    """
+    Creates the monthly partitions of the candle tables ahead of time, so that new rows
+    are routed onto their month's partition rather than onto the default partition.
+    """
+    logging.debug('Creating partitions of the candle tables...')
+
+    call_command("manage_partitions", months_ahead=PARTITION_MONTHS_AHEAD)
@@ -0,0 +1 @@
+from data.service.cron_jobs.repair_gaps._repair_gaps import repair_gaps, repair_symbol_gaps
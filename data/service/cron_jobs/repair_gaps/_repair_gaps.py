@@ -0,0 +1,126 @@
+import logging
+import os
+
+import django
+import pandas as pd
+
+import shared.exchanges.binance.constants as const
+from data.sources.binance._binance import backfill_budget
+from data.sources.binance.backfill import backfill_data
+from data.sources.binance.coverage import add_coverage, get_coverage, get_gaps
+from data.sources.binance.load import load_data
+from data.sources.binance.transform import transform_data
+from shared.data.queries import query_data
+from shared.exchanges.binance import BinanceHandler
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import ExchangeData, StructuredData, Pipeline
+
+
+def repair_gaps():
+    """
+    Fills the gaps left in the raw data of active pipelines, eg. by websocket
+    disconnections, and rebuilds the structured data around them.
+    """
+    logging.debug('Repairing gaps in historical data...')
+
+    symbols = Pipeline.objects.filter(active=True).values_list('symbol_id', flat=True).distinct()
+
+    for symbol in symbols:
+        repair_symbol_gaps(symbol)
+
+
+def repair_symbol_gaps(symbol, base_candle_size='5m', exchange='binance', klines_fetcher=None, header=''):
+    """
+    Fills the gaps within the covered history of a symbol.
+
+    Parameters
+    ----------
+    symbol: str - required. Symbol for which to repair data.
+    base_candle_size: str - optional. Candle size of the raw data.
+    exchange: str - optional. Exchange name.
+    klines_fetcher: method - optional. Klines fetching function, with the signature of Client.get_klines.
+    header: Header for logging line.
+
+    Returns
+    -------
+    Number of gaps which were repaired.
+
+    """
+    coverage = get_coverage(ExchangeData, symbol, base_candle_size, exchange)
+
+    if not coverage:
+        return 0
+
+    # Only gaps within the covered history. The latest data is fetched by the pipelines themselves.
+    gaps = get_gaps(ExchangeData, symbol, base_candle_size, end_date=coverage[-1][1], exchange=exchange)
+
+    if not gaps:
+        return 0
+
+    logging.info(header + f"Repairing {len(gaps)} gap(s) in {symbol} {base_candle_size} data.")
+
+    if klines_fetcher is None:
+        klines_fetcher = BinanceHandler().get_klines
+
+    candle_sizes = Pipeline.objects \
+        .filter(active=True, symbol_id=symbol, exchange_id=exchange) \
+        .values_list('interval', flat=True) \
+        .distinct()
+
+    repaired_gaps = 0
+    for gap_start, gap_end in gaps:
+        failed_windows = backfill_data(
+            ExchangeData,
+            klines_fetcher,
+            symbol,
+            base_candle_size,
+            start_date=gap_start,
+            end_date=gap_end,
+            budget=backfill_budget,
+            exchange=exchange,
+            header=header
+        )
+
+        if failed_windows > 0:
+            continue
+
+        # The gap was fetched, so it is covered even if the exchange has no data for it.
+        add_coverage(ExchangeData, exchange, symbol, base_candle_size, [(gap_start, gap_end)])
+
+        for candle_size in candle_sizes:
+            rebuild_structured_data(symbol, candle_size, base_candle_size, gap_start, gap_end, exchange, header)
+
+        repaired_gaps += 1
+
+    return repaired_gaps
+
+
+def rebuild_structured_data(symbol, candle_size, base_candle_size, start_date, end_date, exchange='binance', header=''):
+
+    frequency = const.CANDLE_SIZES_MAPPER[candle_size]
+
+    start_date = pd.Timestamp(start_date).floor(frequency)
+    end_date = pd.Timestamp(end_date).ceil(frequency)
+
+    data = query_data(ExchangeData, start_date, symbol, base_candle_size, exchange)
+
+    if len(data) == 0:
+        return
+
+    data = data[data.index < end_date]
+
+    transformed_data = transform_data(
+        data,
+        candle_size,
+        exchange,
+        symbol,
+        reference_candle_size=base_candle_size,
+        is_removing_zeros=True,
+        is_removing_rows=True,
+        header=header
+    )
+
+    load_data(StructuredData, transformed_data, pipeline_id=None, count_updates=False, header=header)
@@ -1,7 +1,10 @@
+import asyncio
 import json
 import logging
 import os
+from json import JSONDecodeError
 
+import aiohttp
 import redis
 import requests
 
@@ -11,11 +14,64 @@ from shared.utils.helpers import get_item_from_cache
 
 cache = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 
+# Whether the model app generates the signals within the requests, falling back to jobs when they take too long.
+SYNCHRONOUS_SIGNALS = os.getenv('SYNCHRONOUS_SIGNALS', 'false').lower() in ('1', 'true')
+
 
 def prepare_payload(**kwargs):
     return {key: value for key, value in kwargs.items()}
 
 
+def prepare_signal_payload(**kwargs):
+    if SYNCHRONOUS_SIGNALS:
+        kwargs["synchronous"] = True
+
+    return prepare_payload(**kwargs)
+
+
+def get_authorization_headers():
+    bearer_token = cache.get("bearer_token")
+
+    return {"Authorization": bearer_token.decode() if isinstance(bearer_token, bytes) else bearer_token}
+
+
+async def request_json_async(session, method, url, num_times=2, **kwargs):
+    """
+    Asynchronous counterpart of the requests above, retrying failed connections.
+
+    Parameters
+    ----------
+    session: aiohttp.ClientSession - required. Session with which to send the request.
+    method: str - required. HTTP method.
+    url: str - required. Request url.
+    num_times: int - optional. Number of retries of failed connections.
+
+    Returns
+    -------
+    Decoded JSON response, or an error response if the request failed.
+
+    """
+    for _ in range(num_times + 1):
+        try:
+            async with session.request(method, url, headers=get_authorization_headers(), **kwargs) as r:
+                text = await r.text()
+                logging.debug(text)
+
+                return json.loads(text)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning(e)
+            logging.debug('Retrying failed connection.')
+        except JSONDecodeError as e:
+            logging.warning(e)
+            break
+
+    return {
+        "success": False,
+        "message": "There was an error processing the request.",
+        "code": 502
+    }
+
+
 @retry_failed_connection(num_times=1)
 def check_job_status(job_id):
     url = MODEL_APP_ENDPOINTS["CHECK_JOB"](os.getenv("MODEL_APP_URL"), job_id)
@@ -29,13 +85,22 @@ def check_job_status(job_id):
     return response
 
 
+async def check_job_status_async(session, job_id):
+    url = MODEL_APP_ENDPOINTS["CHECK_JOB"](os.getenv("MODEL_APP_URL"), job_id)
+
+    response = await request_json_async(session, "GET", url, num_times=1)
+    logging.debug(f"{job_id}: {response}")
+
+    return response
+
+
 @retry_failed_connection(num_times=2)
 @json_error_handler
 def generate_signal(pipeline_id, header=''):
 
     url = MODEL_APP_ENDPOINTS["GENERATE_SIGNAL"](os.getenv("MODEL_APP_URL"))
 
-    payload = prepare_payload(
+    payload = prepare_signal_payload(
         pipeline_id=pipeline_id
     )
 
@@ -50,6 +115,38 @@ def generate_signal(pipeline_id, header=''):
     return response
 
 
+async def generate_signal_async(session, pipeline_id, header=''):
+
+    url = MODEL_APP_ENDPOINTS["GENERATE_SIGNAL"](os.getenv("MODEL_APP_URL"))
+
+    payload = prepare_signal_payload(
+        pipeline_id=pipeline_id
+    )
+
+    logging.info(header + "Triggering signal generation.")
+
+    response = await request_json_async(session, "POST", url, json=payload)
+    logging.debug(response.get("message"))
+
+    return response
+
+
+async def generate_signals_async(session, pipeline_ids):
+
+    url = MODEL_APP_ENDPOINTS["GENERATE_SIGNAL"](os.getenv("MODEL_APP_URL"))
+
+    payload = prepare_signal_payload(
+        pipeline_ids=pipeline_ids
+    )
+
+    logging.info(f"Triggering signal generation of {len(pipeline_ids)} pipelines.")
+
+    response = await request_json_async(session, "POST", url, json=payload)
+    logging.debug(response.get("message"))
+
+    return response
+
+
 @retry_failed_connection(num_times=4)
 @json_error_handler
 def start_stop_symbol_trading(payload, start_or_stop):
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+
+import redis
+
+from shared.utils.job_notifications import JOB_NOTIFICATIONS_CHANNEL, get_job_result
+
+# Seconds to wait before subscribing again after the connection to redis is lost.
+RECONNECT_DELAY = 5
+
+
+class JobListener:
+    """
+    Subscribes to the channel on which the model app publishes the conclusion of
+    signal generation jobs, and wakes up whoever is waiting for them. A single
+    subscription, on a dedicated thread, serves all the jobs of the process.
+
+    While the subscription is down, waiting returns immediately, so that callers
+    fall back to polling for the status of the job.
+    """
+
+    def __init__(self, connection=None, channel=JOB_NOTIFICATIONS_CHANNEL):
+        self.connection = connection or redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+        self.channel = channel
+
+        self.available = False
+
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+        self._pubsub = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stopped.clear()
+
+            self._thread = threading.Thread(target=self._run, name='job-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self.available = False
+
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+
+    def wait(self, job_id, timeout):
+        """
+        Blocks until a job concludes.
+
+        Parameters
+        ----------
+        job_id: str - required. Id of the job.
+        timeout: float - required. Maximum number of seconds to wait for.
+
+        Returns
+        -------
+        Response of the job, in the format of the check_job endpoint,
+        or None if it did not conclude on time or the listener is not available.
+
+        """
+        if not self.available:
+            return None
+
+        future = self._register(job_id)
+
+        try:
+            # The job may have concluded before the waiter was registered.
+            response = get_job_result(self.connection, job_id)
+
+            return response if response is not None else future.result(timeout)
+
+        except (TimeoutError, redis.RedisError):
+            return None
+
+        finally:
+            self._unregister(job_id, future)
+
+    async def wait_async(self, job_id, timeout):
+        """
+        Asynchronous counterpart of wait, which does not hold a thread while waiting.
+        """
+        if not self.available:
+            return None
+
+        future = self._register(job_id)
+
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                None, get_job_result, self.connection, job_id
+            )
+
+            if response is None:
+                response = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+            return response
+
+        except (asyncio.TimeoutError, redis.RedisError):
+            return None
+
+        finally:
+            self._unregister(job_id, future)
+
+    def _register(self, job_id):
+        future = Future()
+
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append(future)
+
+        return future
+
+    def _unregister(self, job_id, future):
+        with self._lock:
+            futures = self._waiters.get(job_id, [])
+
+            if future in futures:
+                futures.remove(future)
+
+            if not futures:
+                self._waiters.pop(job_id, None)
+
+    def _dispatch(self, message):
+        if message.get("type") != "message":
+            return
+
+        try:
+            payload = json.loads(message["data"])
+            job_id, response = payload["job_id"], payload["response"]
+        except (TypeError, ValueError, KeyError):
+            logging.warning(f"Invalid job notification: {message['data']}.")
+            return
+
+        with self._lock:
+            futures = self._waiters.pop(job_id, [])
+
+        for future in futures:
+            try:
+                future.set_result(response)
+            except InvalidStateError:
+                # The waiter gave up on the job.
+                pass
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._pubsub = self.connection.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(self.channel)
+
+                self.available = True
+
+                for message in self._pubsub.listen():
+                    self._dispatch(message)
+
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+
+                logging.warning(f"Job notifications unavailable, polling for job status: {e}.")
+
+            self.available = False
+
+            self._stopped.wait(RECONNECT_DELAY)
+
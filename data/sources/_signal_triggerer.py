@@ -1,10 +1,21 @@
+import asyncio
 import logging
 import os
 import time
 
 import django
+import redis
+from asgiref.sync import sync_to_async
 
-from data.service.external_requests import generate_signal, check_job_status
+from data.service.external_requests import (
+    generate_signal,
+    check_job_status,
+    generate_signal_async,
+    generate_signals_async,
+    check_job_status_async,
+)
+from shared.utils.job_notifications import get_job_result
+from shared.utils.message_bus import USE_MESSAGE_BUS, CANDLES_STREAM, publish, get_connection
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
@@ -12,6 +23,18 @@ django.setup()
 from database.model.models import Pipeline
 
 
+JOB_POLLING_INTERVAL = 5
+
+# Number of polls of a pending job after which waiting for it is given up.
+MAX_JOB_POLLS = 10
+
+# Time to wait for the notification of a job's conclusion before polling for its status.
+JOB_NOTIFICATION_TIMEOUT = float(os.getenv('JOB_NOTIFICATION_TIMEOUT', 60))
+
+# Time during which signal requests are gathered onto a single batched request.
+SIGNAL_BATCH_WINDOW = float(os.getenv('SIGNAL_BATCH_WINDOW', 0.25))
+SIGNAL_BATCH_SIZE = int(os.getenv('SIGNAL_BATCH_SIZE', 200))
+
 RESPONSES = {
     "PIPELINE_NOT_ACTIVE": (False, "Stopping Pipeline. Pipeline not active or does not exist."),
     "TOO_MANY_RETRIES": (False, "Stopping Pipeline. Too many retries."),
@@ -20,57 +43,334 @@ RESPONSES = {
     "SUCCESS": (True, ""),
 }
 
+JOB_WAITING = {"code": "WAITING", "status": "Job waiting."}
+
+# Statuses of a polled job which is not concluded.
+JOB_PENDING = "JOB_PENDING"
+JOB_MISSING = "JOB_MISSING"
+
+
+def publish_candle(pipeline_id, header=''):
+    """
+    Publishes the closing of a pipeline's candle onto the message bus, for a model
+    worker to generate its signal. The id of the entry is the id of the job.
+
+    Returns
+    -------
+    Response in the format of generate_signal.
+
+    """
+    try:
+        job_id = publish(CANDLES_STREAM, pipeline_id=pipeline_id)
+    except redis.RedisError as e:
+        logging.warning(header + f"Failed to publish candle: {e}.")
+        return {"success": False, "message": str(e)}
+
+    logging.debug(header + f"Published candle onto {CANDLES_STREAM}.")
+
+    return {"success": True, "job_id": job_id}
+
+
+def get_job_status(job_id):
+    """
+    Returns the status of a job, in the format of check_job_status. The jobs of
+    the message bus are not known to the check_job endpoint, so their stored
+    conclusion is read instead.
+    """
+    if USE_MESSAGE_BUS:
+        return get_job_result(get_connection(), job_id) or JOB_WAITING
+
+    return check_job_status(job_id)
+
+
+async def get_job_status_async(session, job_id):
+    if USE_MESSAGE_BUS:
+        return await sync_to_async(get_job_status)(job_id)
+
+    return await check_job_status_async(session, job_id)
+
 
 # TODO: Implement logic to send this request
 #  only if all data sources have updated the new row.
-def trigger_signal(pipeline_id, header='', retry=0):
-    try:
-        pipeline = Pipeline.objects.get(id=pipeline_id)
+def trigger_signal(pipeline_id, header='', retry=0, listener=None):
+
+    conclusion = check_signal_request(is_pipeline_active(pipeline_id), retry)
+
+    if conclusion is not None:
+        return conclusion
+
+    if USE_MESSAGE_BUS:
+        response = publish_candle(pipeline_id, header=header)
+    else:
+        response = generate_signal(pipeline_id, header=header)
 
-        if not pipeline.active:
-            raise Pipeline.DoesNotExist
+    job_id, conclusion = get_signal_response_conclusion(response, header)
 
-    except Pipeline.DoesNotExist:
+    if job_id is None:
+        return conclusion
+
+    return wait_for_job_conclusion(job_id, pipeline_id, header=header, retry=retry, listener=listener)
+
+
+def check_signal_request(is_active, retry):
+    """
+    Returns the conclusion of a signal request which is not to be sent, or None.
+    """
+    if not is_active:
         return RESPONSES["PIPELINE_NOT_ACTIVE"]
 
     if retry > 2:
         return RESPONSES["JOB_NOT_FOUND"]
 
-    response = generate_signal(pipeline_id, header=header)
+    return None
 
-    if "success" in response and response["success"]:
-        return wait_for_job_conclusion(response["job_id"], pipeline_id, header=header, retry=retry)
-    else:
-        logging.info(response)
-        return False, (response["message"] if "message" in response else response)
 
+def get_signal_response_conclusion(response, header=''):
+    """
+    Interprets the response of a signal request, as returned by generate_signal.
+
+    Returns
+    -------
+    Tuple with the id of the job whose conclusion is to be waited for, and the conclusion
+    of the request if there is no job to wait for.
+
+    """
+    if response.get("code") == "SIGNAL_GENERATED":
+        return None, get_signal_conclusion(response, header)
+
+    if response.get("success"):
+        return response["job_id"], None
+
+    logging.info(response)
+    return None, (False, response["message"] if "message" in response else response)
+
+
+def get_signal_conclusion(response, header=''):
+    """
+    Interprets the response of a signal generated synchronously, which carries the
+    outcome of its order, so that there is no job to wait for.
+    """
+    if response["success"]:
+        logging.debug(header + "Signal generated and order executed successfully.")
+        return RESPONSES["SUCCESS"]
+
+    logging.debug(header + f"Signal generation failed: {response.get('message')}")
+    return RESPONSES["JOB_FAILED"]
+
+
+def get_job_conclusion(job_id, response, header=''):
+    """
+    Interprets the notification of a job's conclusion.
+    """
+    if response["code"] == "FINISHED" and response["success"]:
+        logging.debug(header + f"Job {job_id} finished successfully.")
+        return RESPONSES["SUCCESS"]
+
+    logging.debug(header + f"{job_id}: Job failed.")
+    return RESPONSES["JOB_FAILED"]
+
+
+def get_job_status_conclusion(job_id, response, header=''):
+    """
+    Interprets the status of a job which is polled for.
+
+    Returns
+    -------
+    Conclusion of the job, JOB_PENDING while it is queued or running, JOB_MISSING if it
+    was not found and the signal is to be requested again, or None if the status is unknown.
+
+    """
+    if "status" not in response:
+        return None
+
+    if response["code"] == "JOB_NOT_FOUND":
+        return JOB_MISSING
+
+    elif response["code"] == "FINISHED":
+        logging.debug(header + f"Job {job_id} finished successfully.")
+
+        return RESPONSES["SUCCESS"] if response["success"] else RESPONSES["JOB_FAILED"]
+
+    elif response["code"] in ["IN_QUEUE", "WAITING"]:
+        logging.debug(header + f"{job_id}: Waiting for job conclusion.")
+        return JOB_PENDING
+
+    elif response["code"] == "FAILED":
+        logging.debug(header + f"{job_id}: Job failed.")
+        return RESPONSES["JOB_FAILED"]
 
-def wait_for_job_conclusion(job_id, pipeline_id, retry, header=''):
+    return None
 
-    retries = 0
+
+def wait_for_job_conclusion(job_id, pipeline_id, retry, header='', listener=None):
+
+    if listener is not None:
+        response = listener.wait(job_id, JOB_NOTIFICATION_TIMEOUT)
+
+        if response is not None:
+            return get_job_conclusion(job_id, response, header)
+
+        logging.debug(header + f"{job_id}: No notification of job conclusion, polling for it.")
+
+    polls = 0
     while True:
 
-        response = check_job_status(job_id)
+        conclusion = get_job_status_conclusion(job_id, get_job_status(job_id), header)
+
+        if conclusion is JOB_MISSING:
+            return trigger_signal(pipeline_id, header=header, retry=retry+1, listener=listener)
+        elif conclusion is JOB_PENDING:
+            polls += 1
+        elif conclusion is not None:
+            return conclusion
+
+        if polls > MAX_JOB_POLLS:
+            return RESPONSES["TOO_MANY_RETRIES"]
+
+        time.sleep(JOB_POLLING_INTERVAL)
+
+
+def is_pipeline_active(pipeline_id):
+    return Pipeline.objects.filter(id=pipeline_id, active=True).exists()
+
+
+class SignalBatcher:
+    """
+    Gathers the signal requests of the pipelines whose candles closed at the same
+    time onto a single request to the model app, which returns a job per pipeline.
+    A batch is sent once the batching window elapses, or once it is full.
+    """
+
+    def __init__(self, window=SIGNAL_BATCH_WINDOW, max_size=SIGNAL_BATCH_SIZE):
+        self.window = window
+        self.max_size = max_size
+
+        self._pending = {}
+        self._flush_handle = None
+
+    async def generate_signal(self, session, pipeline_id, header=''):
+        """
+        Requests a signal for a pipeline as part of the current batch.
+
+        Returns
+        -------
+        Response of the pipeline, in the format of generate_signal.
+
+        """
+        loop = asyncio.get_running_loop()
+
+        future = loop.create_future()
+
+        self._pending.setdefault(pipeline_id, []).append(future)
+
+        logging.debug(header + "Queued signal generation.")
+
+        if len(self._pending) >= self.max_size:
+            self._flush(session)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush, session)
+
+        return await future
+
+    def _flush(self, session):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
 
-        if "status" in response:
-            if response["code"] == "JOB_NOT_FOUND":
-                return trigger_signal(pipeline_id, header=header, retry=retry+1)
-            elif response["code"] == "FINISHED":
-                logging.debug(header + f"Job {job_id} finished successfully.")
+        pending, self._pending = self._pending, {}
+
+        if pending:
+            asyncio.ensure_future(self._send(session, pending))
+
+    @staticmethod
+    async def _send(session, pending):
+        try:
+            response = await generate_signals_async(session, list(pending))
+        except Exception as e:
+            logging.exception(e)
+            response = {"success": False, "message": str(e)}
+
+        jobs = response.get("jobs", {}) if response.get("success") else {}
+
+        for pipeline_id, futures in pending.items():
+            if response.get("success"):
+                result = jobs.get(str(pipeline_id), {"success": False, "message": f"No job for pipeline {pipeline_id}."})
+            else:
+                result = response
+
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+
+
+async def trigger_signal_async(pipeline_id, session, header='', retry=0, batcher=None, listener=None):
+    """
+    Asynchronous counterpart of trigger_signal, which waits for the job to
+    conclude without holding a thread.
+
+    Parameters
+    ----------
+    pipeline_id: int - required. Id of the pipeline for which to generate a signal.
+    session: aiohttp.ClientSession - required. Session with which to send the requests.
+    header: Header for logging line.
+    retry: int - optional. Number of times the signal generation has been retried.
+    batcher: SignalBatcher - optional. Batcher through which to request the signal.
+             If not specified, the signal is requested on its own.
+    listener: JobListener - optional. Listener through which to be notified of the conclusion of the job.
+              If not specified, or while it is unavailable, the status of the job is polled for.
+
+    Returns
+    -------
+    Tuple with whether the signal was generated and a message.
+
+    """
+    conclusion = check_signal_request(await sync_to_async(is_pipeline_active)(pipeline_id), retry)
+
+    if conclusion is not None:
+        return conclusion
+
+    if USE_MESSAGE_BUS:
+        response = await sync_to_async(publish_candle)(pipeline_id, header=header)
+    elif batcher is not None:
+        response = await batcher.generate_signal(session, pipeline_id, header=header)
+    else:
+        response = await generate_signal_async(session, pipeline_id, header=header)
+
+    job_id, conclusion = get_signal_response_conclusion(response, header)
+
+    if job_id is None:
+        return conclusion
+
+    return await wait_for_job_conclusion_async(
+        session, job_id, pipeline_id, header=header, retry=retry, batcher=batcher, listener=listener
+    )
+
+
+async def wait_for_job_conclusion_async(session, job_id, pipeline_id, retry, header='', batcher=None, listener=None):
+
+    if listener is not None:
+        response = await listener.wait_async(job_id, JOB_NOTIFICATION_TIMEOUT)
+
+        if response is not None:
+            return get_job_conclusion(job_id, response, header)
+
+        logging.debug(header + f"{job_id}: No notification of job conclusion, polling for it.")
+
+    polls = 0
+    while True:
 
-                if response["success"]:
-                    return RESPONSES["SUCCESS"]
-                else:
-                    return RESPONSES["JOB_FAILED"]
+        conclusion = get_job_status_conclusion(job_id, await get_job_status_async(session, job_id), header)
 
-            elif response["code"] in ["IN_QUEUE", "WAITING"]:
-                logging.debug(header + f"{job_id}: Waiting for job conclusion.")
-                retries += 1
-            elif response["code"] == "FAILED":
-                logging.debug(header + f"{job_id}: Job failed.")
-                return RESPONSES["JOB_FAILED"]
+        if conclusion is JOB_MISSING:
+            return await trigger_signal_async(
+                pipeline_id, session, header=header, retry=retry+1, batcher=batcher, listener=listener
+            )
+        elif conclusion is JOB_PENDING:
+            polls += 1
+        elif conclusion is not None:
+            return conclusion
 
-        if retries > 10:
+        if polls > MAX_JOB_POLLS:
             return RESPONSES["TOO_MANY_RETRIES"]
 
-        time.sleep(5)
+        await asyncio.sleep(JOB_POLLING_INTERVAL)
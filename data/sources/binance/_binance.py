@@ -1,18 +1,18 @@
 import logging
 import os
 
-import pandas as pd
 import django
 import redis
-from binance import ThreadedWebsocketManager
 
 import shared.exchanges.binance.constants as const
 from data.service.external_requests import start_stop_symbol_trading, get_open_positions
 from data.service.helpers.exceptions import CandleSizeInvalid, DataPipelineCouldNotBeStopped
 from data.sources import trigger_signal
+from data.sources.binance.backfill import backfill_data, RequestWeightBudget
+from data.sources.binance.candle_store import get_candle_store
 from data.sources.binance.extract import extract_data, extract_data_db
 from data.sources.binance.load import load_data
-from data.sources.binance.transform import resample_data, transform_data
+from data.sources.binance.transform import transform_data
 from shared.exchanges.binance import BinanceHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
@@ -24,18 +24,24 @@ os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
 
 cache = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', 1))
 
-class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
+backfill_budget = RequestWeightBudget(
+    int(os.getenv('BACKFILL_WEIGHT_PER_MINUTE', const.BINANCE_REQUEST_WEIGHT_PER_MINUTE))
+)
+
+
+class BinanceDataHandler(BinanceHandler):
     """
     Class that handles realtime / incoming data from the Binance API, and
     triggers signal generation whenever a new step has been surpassed (currently
-    only time based steps).
+    only time based steps). Streamed candles are saved by the process wide candle
+    store, which is shared by all pipelines trading the same market.
     """
 
     def __init__(self, symbol, candle_size, pipeline_id=None, base_candle_size='5m'):
 
         BinanceHandler.__init__(self, base_candle_size=base_candle_size)
-        ThreadedWebsocketManager.__init__(self, self.binance_api_key, self.binance_api_secret)
 
         self._validate_input(symbol, candle_size)
 
@@ -43,15 +49,11 @@ class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
         self.pipeline_id = pipeline_id
         self.exchange = 'binance'
 
-        self.conn_key = ''
         self.streams = []
 
-        self.raw_data = pd.DataFrame()
-        self.data = pd.DataFrame()
-        self.raw_data_length = 1
-        self.data_length = 1
+        # Ingestion engine driving the pipeline, if it was started through one.
+        self.engine = None
 
-        self.start()
         self.started = True
 
     def __str__(self):
@@ -90,6 +92,39 @@ class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
 
         """
 
+        self.load_history(header=header)
+
+        start_pipeline = self.generate_new_signal(header)
+
+        if start_pipeline:
+            self.start_streams(header=header)
+
+    def load_history(self, header=''):
+        """
+        Fetches and saves the data missing since the last saved entry.
+
+        Returns
+        -------
+        None
+
+        """
+
+        # Backfill large gaps of raw data concurrently
+        is_backfilling = BACKFILL_WORKERS > 1
+
+        if is_backfilling:
+            backfill_data(
+                ExchangeData,
+                self.get_klines,
+                self.symbol,
+                self.base_candle_size,
+                max_workers=BACKFILL_WORKERS,
+                budget=backfill_budget,
+                pipeline_id=self.pipeline_id,
+                exchange=self.exchange,
+                header=header
+            )
+
         # Get missing raw data
         data, _ = self._etl_pipeline(ExchangeData, self.base_candle_size, count_updates=False, header=header)
 
@@ -98,19 +133,16 @@ class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
             StructuredData,
             self.candle_size,
             data=data,
-            use_db=self.candle_size != self.base_candle_size,
+            use_db=self.candle_size != self.base_candle_size or is_backfilling,
             remove_zeros=True,
             remove_rows=True,
             count_updates=False,
             header=header
         )
 
-        start_pipeline = self.generate_new_signal(header)
-
-        if start_pipeline:
-            self._start_kline_websockets(self.symbol, self._websocket_callback, header=header)
+    def start_streams(self, header=''):
+        self._start_kline_websockets(self.symbol, self._new_candle_callback, header=header)
 
-    # TODO: Refactor to allow for more than one conn_key
     def stop_data_ingestion(self, header=''):
         """
         Public method which stops the data pipeline for the symbol.
@@ -191,19 +223,21 @@ class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
 
     def _start_kline_websockets(self, symbol, callback, header=''):
 
-        streams = [
-            f"{symbol.lower()}@kline_{self.base_candle_size}",
-            f"{symbol.lower()}@kline_{self.candle_size}"
-        ]
-
-        logging.info(header + f"Starting {', '.join(streams)} data stream(s).")
-
-        self.streams = streams
+        self.streams = get_candle_store().subscribe(
+            id(self),
+            symbol,
+            self.candle_size,
+            lambda new_entry: callback(new_entry, header),
+            base_candle_size=self.base_candle_size,
+            pipeline_id=self.pipeline_id,
+            exchange=self.exchange,
+            header=header
+        )
 
-        self.conn_key = self.start_multiplex_socket(lambda row: callback(row, header), streams)
+        logging.info(header + f"Started {', '.join(self.streams)} data stream(s).")
 
     def _stop_websocket(self):
-        self.stop_socket(self.conn_key)
+        get_candle_store().unsubscribe(id(self))
 
     def generate_new_signal(self, header, retries=0):
 
@@ -221,92 +255,12 @@ class BinanceDataHandler(BinanceHandler, ThreadedWebsocketManager):
 
         return success
 
-    def _websocket_callback(self, row, header=''):
-
-        kline_size = row["stream"].split('_')[-1]
+    def _new_candle_callback(self, new_entry, header=''):
 
-        if kline_size == self.base_candle_size:
-            self.raw_data, self.raw_data_length, _ = self._process_stream(
-                ExchangeData,
-                row["data"]["k"],
-                self.raw_data,
-                self.raw_data_length,
-                self.base_candle_size
-            )
-
-        if kline_size == self.candle_size:
-            self.data, self.data_length, new_entry = self._process_stream(
-                StructuredData,
-                row["data"]["k"],
-                self.data,
-                self.data_length,
-                self.candle_size,
-                remove_zeros=True,
-                remove_rows=True,
-            )
-
-            if new_entry:
-                self.generate_new_signal(header)
-
-    def _process_stream(
-        self,
-        model_class,
-        row,
-        data,
-        data_length,
-        candle_size,
-        remove_zeros=False,
-        remove_rows=False,
-    ):
-
-        new_data = pd.DataFrame(
-            {
-                const.NAME_MAPPER[key]: [const.FUNCTION_MAPPER[key](value)]
-                for key, value in row.items()
-                if key in const.NAME_MAPPER
-            }
-        ).set_index('open_time')
-
-        data = data.append(new_data)
-
-        data = resample_data(
-            data,
-            candle_size,
-            const.COLUMNS_AGGREGATION_WEBSOCKET
-        )
-
-        return self._process_new_data(
-            model_class,
-            data,
-            data_length,
-            candle_size,
-            remove_zeros=remove_zeros,
-            remove_rows=remove_rows
-        )
-
-    def _process_new_data(
-        self,
-        model_class,
-        data,
-        data_length,
-        candle_size,
-        remove_zeros=False,
-        remove_rows=False
-    ):
-        new_entries = False
-        if len(data) != data_length:
-            rows = data.iloc[data_length - 1:-1].reset_index()
-
-            data_length = len(data)
-
-            _, new_entries = self._etl_pipeline(
-                model_class,
-                candle_size,
-                reference_candle_size=candle_size,
-                data=rows,
-                remove_zeros=remove_zeros,
-                remove_rows=remove_rows,
-                columns_aggregation=const.COLUMNS_AGGREGATION
-            )
+        if not new_entry:
+            return
 
-        return data, data_length, new_entries
+        if self.engine is not None:
+            self.engine.submit(self.engine.generate_new_signal(self, header))
+        else:
+            self.generate_new_signal(header)
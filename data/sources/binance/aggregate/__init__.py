@@ -0,0 +1 @@
+from data.sources.binance.aggregate._aggregate import CandleAggregator
@@ -0,0 +1,166 @@
+import logging
+
+import pandas as pd
+
+import shared.exchanges.binance.constants as const
+
+
+def is_missing(value):
+    return pd.isnull(value)
+
+
+def aggregate_first(accumulated, value):
+    return value if is_missing(accumulated) else accumulated
+
+
+def aggregate_last(accumulated, value):
+    return accumulated if is_missing(value) else value
+
+
+def aggregate_max(accumulated, value):
+    return value if is_missing(accumulated) else accumulated if is_missing(value) else max(accumulated, value)
+
+
+def aggregate_min(accumulated, value):
+    return value if is_missing(accumulated) else accumulated if is_missing(value) else min(accumulated, value)
+
+
+def aggregate_sum(accumulated, value):
+    return (0 if is_missing(accumulated) else accumulated) + (0 if is_missing(value) else value)
+
+
+AGGREGATION_FUNCTIONS = {
+    "first": aggregate_first,
+    "last": aggregate_last,
+    "max": aggregate_max,
+    "min": aggregate_min,
+    "sum": aggregate_sum,
+}
+
+
+class AggregatedCandle:
+    """
+    Candle of a derived interval which is being built from its constituent base candles.
+    """
+
+    def __init__(self, candle_size, expected_count, aggregation_method):
+        self.candle_size = candle_size
+        self.expected_count = expected_count
+        self.aggregation_method = aggregation_method
+
+        self.candle_ms = int(pd.Timedelta(const.CANDLE_SIZES_MAPPER[candle_size]).total_seconds() * 1000)
+
+        self.open_time = None
+        self.count = 0
+        self.values = {}
+
+    def update(self, open_time, candle, header=''):
+        """
+        Folds a base candle into the derived candle.
+
+        Returns
+        -------
+        The derived candle as a dict, if the base candle was its last constituent, None otherwise.
+
+        """
+
+        bucket = open_time // self.candle_ms * self.candle_ms
+
+        if self.open_time is not None and bucket < self.open_time:
+            return None
+
+        if bucket != self.open_time:
+            if self.count > 0:
+                logging.debug(
+                    header + f"Discarded incomplete {self.candle_size} candle with "
+                             f"{self.count} of {self.expected_count} candles."
+                )
+
+            self.open_time = bucket
+            self.count = 0
+            self.values = {column: None for column in self.aggregation_method}
+
+        self.count += 1
+
+        for column, method in self.aggregation_method.items():
+            self.values[column] = AGGREGATION_FUNCTIONS[method](self.values[column], candle.get(column))
+
+        if self.count == self.expected_count:
+            return dict(open_time=self.open_time, **self.values)
+
+        return None
+
+
+class CandleAggregator:
+    """
+    Incrementally aggregates closed base candles into candles of larger intervals.
+    Each derived candle is handed out as soon as the last of its constituent base
+    candles arrives, while incomplete ones are discarded.
+    """
+
+    def __init__(self, base_candle_size='5m', candle_sizes=None, aggregation_method=const.COLUMNS_AGGREGATION):
+        if candle_sizes is None:
+            candle_sizes = [
+                candle_size for candle_size in const.CANDLE_SIZES_MAPPER
+                if base_candle_size in const.COUNT_MAPPER.get(candle_size, {})
+            ]
+
+        self.base_candle_size = base_candle_size
+        self.columns = ["open_time", *aggregation_method]
+        self.last_open_time = None
+
+        self.candles = {
+            candle_size: AggregatedCandle(
+                candle_size,
+                const.COUNT_MAPPER[candle_size][base_candle_size],
+                aggregation_method
+            )
+            for candle_size in candle_sizes
+        }
+
+    def update(self, data, header=''):
+        """
+        Folds closed base candles into all derived intervals.
+
+        Parameters
+        ----------
+        data: DataFrame - required. Closed base candles, with an open_time column or index.
+        header: Header for logging line.
+
+        Returns
+        -------
+        Dictionary with a DataFrame of the completed candles for each derived interval.
+
+        """
+
+        if data.index.name == 'open_time':
+            data = data.reset_index()
+
+        completed_candles = {candle_size: [] for candle_size in self.candles}
+
+        for candle in data.to_dict(orient='records'):
+            open_time = int(pd.Timestamp(candle["open_time"]).value // 10 ** 6)
+
+            # Base candles are folded only once, and in order.
+            if self.last_open_time is not None and open_time <= self.last_open_time:
+                continue
+
+            self.last_open_time = open_time
+
+            for candle_size, aggregated_candle in self.candles.items():
+                completed_candle = aggregated_candle.update(open_time, candle, header=header)
+
+                if completed_candle is not None:
+                    completed_candles[candle_size].append(completed_candle)
+
+        return {
+            candle_size: self._to_frame(candles)
+            for candle_size, candles in completed_candles.items()
+        }
+
+    def _to_frame(self, candles):
+        data = pd.DataFrame(candles, columns=self.columns)
+
+        data["open_time"] = pd.to_datetime(data["open_time"], unit='ms', utc=True)
+
+        return data
@@ -0,0 +1 @@
+from data.sources.binance.backfill._backfill import backfill_data, RequestWeightBudget
@@ -0,0 +1,321 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import django
+import pandas as pd
+import pytz
+from binance.exceptions import BinanceAPIException
+
+import shared.exchanges.binance.constants as const
+from data.sources.binance.extract import decode_klines, get_start_date
+from data.sources.binance.load import load_data
+from data.sources.binance.transform import transform_data
+from shared.utils.decorators.failed_connection import retry_failed_connection
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import BackfillWindow
+
+# Status codes of the responses of Binance to requests past its limits, 429, or made after a ban, 418.
+RATE_LIMIT_STATUS_CODES = (418, 429)
+
+# Seconds requests are held back when Binance rejects one without a Retry-After header.
+DEFAULT_RETRY_AFTER = 60
+
+
+class RequestWeightBudget:
+    """
+    Thread safe sliding window budget of Binance request weight. Callers block
+    on acquire until the requested weight fits in the budget of the current period.
+    """
+
+    def __init__(self, weight_per_period=const.BINANCE_REQUEST_WEIGHT_PER_MINUTE, period=60):
+        self.weight_per_period = weight_per_period
+        self.period = period
+
+        self._requests = deque()
+        self._used_weight = 0
+        self._blocked_until = 0
+        self._condition = threading.Condition()
+
+    def _release_expired(self, now):
+        while self._requests and now - self._requests[0][0] >= self.period:
+            _, weight = self._requests.popleft()
+            self._used_weight -= weight
+
+    def acquire(self, weight):
+        weight = min(weight, self.weight_per_period)
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+
+                self._release_expired(now)
+
+                if now < self._blocked_until:
+                    self._condition.wait(self._blocked_until - now)
+                    continue
+
+                if self._used_weight + weight <= self.weight_per_period:
+                    self._requests.append((now, weight))
+                    self._used_weight += weight
+                    return
+
+                self._condition.wait(self.period - (now - self._requests[0][0]))
+
+    def back_off(self, seconds):
+        """
+        Holds back all requests for a number of seconds, eg. after Binance rejected
+        requests for exceeding its limits.
+        """
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+def get_klines_weight(limit):
+    for max_limit, weight in const.BINANCE_KLINES_WEIGHT:
+        if limit < max_limit:
+            return weight
+
+    return const.BINANCE_KLINES_WEIGHT[-1][1]
+
+
+def get_windows(start_date, end_date, candle_size, window_size):
+    """
+    Splits [start_date, end_date) into windows of window_size candles. Windows are
+    aligned on a fixed grid, so that the same windows are generated across runs.
+    """
+    candle_ms = int(pd.Timedelta(const.CANDLE_SIZES_MAPPER[candle_size]).total_seconds() * 1000)
+    window_ms = candle_ms * window_size
+
+    start_ms = int(start_date.timestamp() * 1000) // candle_ms * candle_ms
+    end_ms = int(end_date.timestamp() * 1000) // candle_ms * candle_ms
+
+    windows = []
+    window_start = start_ms
+    while window_start < end_ms:
+        window_end = min((window_start // window_ms + 1) * window_ms, end_ms)
+        windows.append((window_start, window_end))
+        window_start = window_end
+
+    return windows
+
+
+def get_completed_windows(symbol, candle_size, exchange='binance'):
+    return [
+        (int(start_time.timestamp() * 1000), int(end_time.timestamp() * 1000))
+        for start_time, end_time in BackfillWindow.objects
+        .filter(exchange_id=exchange, symbol_id=symbol, interval=candle_size, complete=True)
+        .values_list('start_time', 'end_time')
+    ]
+
+
+def is_window_complete(window, completed_windows):
+    return any(start <= window[0] and end >= window[1] for start, end in completed_windows)
+
+
+def get_backfill_start_date(model_class, symbol, candle_size, exchange='binance'):
+    """
+    Resumes from the first incomplete window if there is one, so that windows left
+    incomplete by an interrupted backfill are picked up again. Otherwise, resumes from
+    the last completed window, which is extended if it was cut short by the end date
+    of its backfill, or starts from the last saved entry if there are no windows.
+    """
+    windows = BackfillWindow.objects \
+        .filter(exchange_id=exchange, symbol_id=symbol, interval=candle_size)
+
+    first_incomplete_window = windows.filter(complete=False).order_by('start_time').first()
+
+    if first_incomplete_window is not None:
+        return first_incomplete_window.start_time
+
+    last_window = windows.order_by('start_time').last()
+
+    if last_window is not None:
+        return last_window.start_time
+
+    return get_start_date(model_class, symbol, candle_size)
+
+
+def get_retry_after(exception):
+    headers = getattr(exception.response, 'headers', None) or {}
+
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+@retry_failed_connection(num_times=3)
+def fetch_window(klines_fetcher, budget, symbol, candle_size, window, limit):
+
+    while True:
+        budget.acquire(get_klines_weight(limit))
+
+        try:
+            klines = klines_fetcher(
+                symbol=symbol,
+                interval=candle_size,
+                startTime=window[0],
+                endTime=window[1] - 1,
+                limit=limit
+            )
+        except BinanceAPIException as e:
+            if e.status_code not in RATE_LIMIT_STATUS_CODES:
+                raise
+
+            # Requests keep being rejected until the limits reset, so all of them are held back.
+            retry_after = get_retry_after(e)
+
+            logging.warning(f"Binance request limits exceeded ({e.status_code}), backing off for {retry_after}s.")
+
+            budget.back_off(retry_after)
+
+            continue
+
+        return decode_klines(klines)
+
+
+def convert_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp / 1000, tz=pytz.utc)
+
+
+def plan_windows(symbol, candle_size, windows, exchange='binance'):
+    BackfillWindow.objects.bulk_create(
+        [
+            BackfillWindow(
+                exchange_id=exchange,
+                symbol_id=symbol,
+                interval=candle_size,
+                start_time=convert_timestamp(window[0]),
+                end_time=convert_timestamp(window[1]),
+            )
+            for window in windows
+        ],
+        ignore_conflicts=True
+    )
+
+
+def save_checkpoint(symbol, candle_size, window, exchange='binance'):
+    BackfillWindow.objects.update_or_create(
+        exchange_id=exchange,
+        symbol_id=symbol,
+        interval=candle_size,
+        start_time=convert_timestamp(window[0]),
+        defaults=dict(end_time=convert_timestamp(window[1]), complete=True)
+    )
+
+
+def backfill_data(
+    model_class,
+    klines_fetcher,
+    symbol,
+    candle_size,
+    start_date=None,
+    end_date=None,
+    window_size=const.BINANCE_KLINES_MAX_LIMIT,
+    max_workers=4,
+    budget=None,
+    pipeline_id=None,
+    exchange='binance',
+    header=''
+):
+    """
+    Fetches missing historical data from the Binance API concurrently, in windows of
+    a fixed number of candles, and loads it onto the specified model class. Windows
+    are checkpointed as they complete, so that an interrupted backfill resumes
+    where it stopped.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class to save data on.
+    klines_fetcher: method - required. Klines fetching function, with the signature of Client.get_klines.
+    symbol: str - required. Symbol for which to retrieve data.
+    candle_size: str - required. Candle size at which data should be retrieved.
+    start_date: datetime object - optional. Start date from which to retrieve data.
+                If not specified, it is derived from the checkpoints or the last entry.
+    end_date: datetime object - optional. End date up to which to retrieve data. Defaults to now.
+    window_size: int - optional. Number of candles per window (and request).
+    max_workers: int - optional. Maximum number of concurrent requests.
+    budget: RequestWeightBudget - optional. Request weight budget shared between requests.
+    pipeline_id: int - optional. Id of the pipeline for which data is being fetched.
+    exchange: str - optional. Exchange name.
+    header: Header for logging line.
+
+    Returns
+    -------
+    Number of windows that could not be fetched.
+
+    """
+
+    if start_date is None:
+        start_date = get_backfill_start_date(model_class, symbol, candle_size, exchange=exchange)
+
+    if end_date is None:
+        end_date = datetime.now(pytz.utc)
+
+    if budget is None:
+        budget = RequestWeightBudget()
+
+    completed_windows = get_completed_windows(symbol, candle_size, exchange=exchange)
+
+    windows = [
+        window for window in get_windows(start_date, end_date, candle_size, window_size)
+        if not is_window_complete(window, completed_windows)
+    ]
+
+    logging.info(header + f"Backfilling {len(windows)} windows of historical data.")
+
+    plan_windows(symbol, candle_size, windows, exchange=exchange)
+
+    failed_windows = 0
+
+    # Requests run concurrently, while transforming and loading is done on the calling
+    # thread, which keeps a single database writer.
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending_windows = iter(windows)
+        futures = {}
+
+        while True:
+            for window in pending_windows:
+                futures[executor.submit(
+                    fetch_window, klines_fetcher, budget, symbol, candle_size, window, window_size
+                )] = window
+
+                if len(futures) >= max_workers * 2:
+                    break
+
+            if not futures:
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                window = futures.pop(future)
+
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logging.warning(header + f"Failed to fetch window starting at {window[0]}: {e}")
+                    data = None
+
+                if data is None:
+                    failed_windows += 1
+                    continue
+
+                if len(data) > 0:
+                    transformed_data = transform_data(data, candle_size, exchange, symbol, header=header)
+
+                    load_data(model_class, transformed_data, pipeline_id=pipeline_id, count_updates=False, header=header)
+
+                save_checkpoint(symbol, candle_size, window, exchange=exchange)
+
+    logging.info(header + f"Backfill finished with {failed_windows} failed windows.")
+
+    return failed_windows
@@ -0,0 +1 @@
+from data.sources.binance.candle_buffer._candle_buffer import CandleBuffer
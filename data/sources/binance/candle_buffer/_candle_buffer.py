@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import shared.exchanges.binance.constants as const
+
+CANDLE_BUFFER_SIZE = int(os.getenv('CANDLE_BUFFER_SIZE', 500))
+
+COLUMNS = [const.NAME_MAPPER[key] for key in const.NAME_MAPPER if key not in ("t", "T")]
+
+
+class CandleBuffer:
+    """
+    Fixed size, array backed buffer of the latest candles of a kline stream. The
+    open candle is updated in place, and candles are handed out once, as soon as
+    they close.
+    """
+
+    def __init__(self, candle_size, capacity=CANDLE_BUFFER_SIZE):
+        self.candle_size = candle_size
+        self.capacity = capacity
+
+        self.candle_ms = int(pd.Timedelta(const.CANDLE_SIZES_MAPPER[candle_size]).total_seconds() * 1000)
+
+        self.open_times = np.zeros(capacity, dtype=np.int64)
+        self.close_times = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, len(COLUMNS)), np.nan)
+
+        # Number of candles received so far. The latest candle sits at (count - 1) % capacity.
+        self.count = 0
+        self.closed = False
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def last_open_time(self):
+        return self.open_times[(self.count - 1) % self.capacity] if self.count else None
+
+    def update(self, kline):
+        """
+        Updates the buffer with a kline message.
+
+        Parameters
+        ----------
+        kline: dict - required. Kline payload of a websocket message (the "k" key).
+
+        Returns
+        -------
+        DataFrame with the candle that closed with this update, or an empty
+        DataFrame if none did.
+
+        """
+
+        open_time = kline["t"] // self.candle_ms * self.candle_ms
+
+        last_open_time = self.last_open_time
+
+        closed_candles = self._to_frame([])
+
+        if last_open_time is not None and open_time < last_open_time:
+            # Late message of a candle that has already been handed out.
+            return closed_candles
+
+        if last_open_time is None or open_time > last_open_time:
+            if last_open_time is not None and not self.closed:
+                closed_candles = self._to_frame([(self.count - 1) % self.capacity])
+
+            self.count += 1
+            self.closed = False
+
+        index = (self.count - 1) % self.capacity
+
+        self.open_times[index] = open_time
+        self.close_times[index] = kline.get("T", open_time + self.candle_ms - 1)
+        self.values[index] = [float(kline[key]) for key in const.NAME_MAPPER if key not in ("t", "T")]
+
+        if kline.get("x") and not self.closed:
+            # The final update of the candle arrived, so there is no need to wait for the next one.
+            self.closed = True
+
+            closed_candles = pd.concat([closed_candles, self._to_frame([index])], ignore_index=True)
+
+        return closed_candles
+
+    def to_frame(self):
+        """
+        Returns the buffered candles, from oldest to latest, as a DataFrame
+        indexed by open_time.
+        """
+        indexes = [i % self.capacity for i in range(self.count - len(self), self.count)]
+
+        return self._to_frame(indexes).set_index('open_time')
+
+    def _to_frame(self, indexes):
+        data = pd.DataFrame(self.values[indexes], columns=COLUMNS)
+
+        data.insert(0, "close_time", pd.to_datetime(self.close_times[indexes], unit='ms', utc=True))
+        data.insert(0, "open_time", pd.to_datetime(self.open_times[indexes], unit='ms', utc=True))
+
+        return data
@@ -0,0 +1 @@
+from data.sources.binance.candle_store._candle_store import CandleStore, get_candle_store
@@ -0,0 +1,277 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import django
+import pandas as pd
+import pytz
+
+import shared.exchanges.binance.constants as const
+from data.sources.binance.aggregate import CandleAggregator
+from data.sources.binance.candle_buffer import CandleBuffer
+from data.sources.binance.load import load_data
+from data.sources.binance.stream_hub import Listener, get_stream_hub
+from data.sources.binance.transform import transform_data
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import ExchangeData, StructuredData, Pipeline
+
+MAX_WORKERS = int(os.getenv('CANDLE_STORE_WORKERS', 16))
+
+
+class Subscriber:
+
+    def __init__(self, candle_size, pipeline_id, listener):
+        self.candle_size = candle_size
+        self.pipeline_id = pipeline_id
+        self.listener = listener
+
+
+class Market:
+    """
+    Candle state of a single (exchange, symbol, base candle size) market, shared
+    by all the pipelines trading it.
+    """
+
+    def __init__(self, exchange, symbol, base_candle_size):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.base_candle_size = base_candle_size
+
+        self.raw_candles = CandleBuffer(base_candle_size)
+        self.aggregator = CandleAggregator(base_candle_size)
+
+        self.subscribers = {}
+
+    @property
+    def header(self):
+        return f"{self.exchange} {self.symbol} {self.base_candle_size}: "
+
+    @property
+    def stream(self):
+        return f"{self.symbol.lower()}@kline_{self.base_candle_size}"
+
+    def get_subscribers(self, candle_size):
+        return [subscriber for subscriber in self.subscribers.values() if subscriber.candle_size == candle_size]
+
+
+class CandleStore:
+    """
+    Owns the writes of streamed candles. Each market is streamed, aggregated and
+    saved once, regardless of the number of pipelines subscribed to it, and every
+    subscribed pipeline is notified whenever a new candle of its candle size is saved.
+    """
+
+    def __init__(self, stream_hub=None, max_workers=MAX_WORKERS):
+        self._stream_hub = stream_hub
+
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='candle-store')
+        self._lock = threading.RLock()
+
+        self._markets = {}
+
+    @property
+    def stream_hub(self):
+        if self._stream_hub is None:
+            self._stream_hub = get_stream_hub()
+
+        return self._stream_hub
+
+    def subscribe(self, listener_id, symbol, candle_size, callback, base_candle_size='5m',
+                  pipeline_id=None, exchange='binance', header=''):
+        """
+        Subscribes a pipeline to the candles of a market. The market is streamed
+        from the first subscription onwards.
+
+        Parameters
+        ----------
+        listener_id: hashable - required. Unique identifier of the subscriber.
+        symbol: str - required. Symbol of the market.
+        candle_size: str - required. Candle size the subscriber is interested in.
+        callback: method - required. Function called with whether new entries were
+                  added, whenever a candle of candle_size is saved.
+        base_candle_size: str - optional. Candle size which is streamed.
+        pipeline_id: int - optional. Id of the subscribed pipeline.
+        exchange: str - optional. Exchange name.
+        header: Header for logging line.
+
+        Returns
+        -------
+        List of streams of the market.
+
+        """
+        key = (exchange, symbol, base_candle_size)
+
+        with self._lock:
+            market = self._markets.get(key)
+
+            is_new_market = market is None
+
+            if is_new_market:
+                market = Market(exchange, symbol, base_candle_size)
+
+                self._markets[key] = market
+
+            market.subscribers[listener_id] = Subscriber(
+                candle_size,
+                pipeline_id,
+                Listener(callback, self._executor)
+            )
+
+            logging.debug(header + f"{len(market.subscribers)} pipeline(s) subscribed to {market.stream}.")
+
+        if not is_new_market:
+            return [market.stream]
+
+        # The market is seeded outside the lock of the store, so that the other markets are not
+        # held up by its query. It is only streamed once seeded, so no message is processed before.
+        self._seed_market(market)
+
+        with self._lock:
+            # The market may have lost its subscribers while it was seeded.
+            if self._markets.get(key) is market:
+                self.stream_hub.subscribe(
+                    key,
+                    [market.stream],
+                    lambda row: self._process_message(market, row)
+                )
+
+        return [market.stream]
+
+    def unsubscribe(self, listener_id):
+        """
+        Unsubscribes a pipeline. Markets which are left without subscribers stop being streamed.
+
+        Parameters
+        ----------
+        listener_id: hashable - required. Unique identifier of the subscriber.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            for key, market in list(self._markets.items()):
+                if market.subscribers.pop(listener_id, None) is None:
+                    continue
+
+                if not market.subscribers:
+                    del self._markets[key]
+                    self.stream_hub.unsubscribe(key)
+
+    def stop(self):
+        """
+        Stops streaming, and waits for the pending notifications of the subscribers.
+        """
+        self.stream_hub.stop()
+
+        self._executor.shutdown(wait=True)
+
+    def _seed_market(self, market):
+        """
+        Folds the stored base candles of the current (incomplete) candles onto the
+        aggregator, so that they are handed out once the remaining ones are streamed.
+        The last stored base candle is still open, and will be received from the stream.
+        """
+        base_data = ExchangeData.objects.filter(
+            exchange_id=market.exchange,
+            symbol_id=market.symbol,
+            interval=market.base_candle_size
+        )
+
+        last_entry = base_data.order_by('open_time').last()
+
+        if last_entry is None:
+            return
+
+        start_date = min(
+            pd.Timestamp(last_entry.open_time).floor(const.CANDLE_SIZES_MAPPER[candle_size])
+            for candle_size in market.aggregator.candles
+        )
+
+        rows = base_data \
+            .filter(open_time__gte=start_date, open_time__lt=last_entry.open_time) \
+            .order_by('open_time') \
+            .values('open_time', *const.COLUMNS_AGGREGATION)
+
+        market.aggregator.update(pd.DataFrame(rows, columns=['open_time', *const.COLUMNS_AGGREGATION]))
+
+    def _process_message(self, market, row):
+
+        if row.get("stream") != market.stream:
+            return
+
+        closed_candles = market.raw_candles.update(row["data"]["k"])
+
+        if len(closed_candles) == 0:
+            return
+
+        self._save_candles(market, ExchangeData, closed_candles, market.base_candle_size, header=market.header)
+
+        aggregated_candles = market.aggregator.update(closed_candles, header=market.header)
+
+        with self._lock:
+            candle_sizes = {subscriber.candle_size for subscriber in market.subscribers.values()}
+
+        for candle_size in candle_sizes:
+            if len(aggregated_candles[candle_size]) == 0:
+                continue
+
+            new_entries = self._save_candles(
+                market,
+                StructuredData,
+                aggregated_candles[candle_size],
+                candle_size,
+                remove_zeros=True,
+                remove_rows=True,
+                header=market.header
+            )
+
+            with self._lock:
+                subscribers = market.get_subscribers(candle_size)
+
+            Pipeline.objects \
+                .filter(id__in=[subscriber.pipeline_id for subscriber in subscribers]) \
+                .update(last_entry=datetime.now(pytz.utc))
+
+            for subscriber in subscribers:
+                subscriber.listener.put(new_entries)
+
+    @staticmethod
+    def _save_candles(market, model_class, candles, candle_size, remove_zeros=False, remove_rows=False, header=''):
+
+        transformed_data = transform_data(
+            candles,
+            candle_size,
+            market.exchange,
+            market.symbol,
+            reference_candle_size=candle_size,
+            aggregation_method=const.COLUMNS_AGGREGATION,
+            is_removing_zeros=remove_zeros,
+            is_removing_rows=remove_rows,
+            header=header
+        )
+
+        return load_data(model_class, transformed_data, pipeline_id=None, header=header)
+
+
+_candle_store = None
+_candle_store_lock = threading.Lock()
+
+
+def get_candle_store():
+    """
+    Returns the process wide candle store, creating it on first use.
+    """
+    global _candle_store
+
+    with _candle_store_lock:
+        if _candle_store is None:
+            _candle_store = CandleStore()
+
+        return _candle_store
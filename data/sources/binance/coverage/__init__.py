@@ -0,0 +1,2 @@
+from data.sources.binance.coverage._coverage import add_coverage, get_coverage, get_gaps, update_coverage, \
+    get_contiguous_ranges, subtract_ranges
@@ -0,0 +1,227 @@
+import logging
+import os
+from datetime import datetime
+
+import django
+import numpy as np
+import pandas as pd
+import pytz
+from django.db import transaction
+
+import shared.exchanges.binance.constants as const
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import CandleCoverage
+
+# Date from which data is fetched when there is none yet.
+HISTORY_START_DATE = datetime(2019, 9, 1, tzinfo=pytz.utc)
+
+COVERAGE_COLUMNS = ["exchange_id", "symbol_id", "interval", "open_time", "close_time"]
+
+
+def get_candle_timedelta(candle_size):
+    return pd.Timedelta(const.CANDLE_SIZES_MAPPER[candle_size])
+
+
+def get_contiguous_ranges(open_times, candle_size):
+    """
+    Splits sorted open times into ranges of contiguous candles.
+
+    Returns
+    -------
+    List of (start, end) tuples, where end is the close of the last candle of the range.
+
+    """
+    candle_timedelta = get_candle_timedelta(candle_size)
+
+    open_times = pd.DatetimeIndex(open_times).sort_values().unique()
+
+    if len(open_times) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(open_times.asi8) != candle_timedelta.value) + 1
+
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(open_times)]]) - 1
+
+    return [(open_times[start], open_times[end] + candle_timedelta) for start, end in zip(starts, ends)]
+
+
+def merge_ranges(ranges):
+    merged_ranges = []
+
+    for start, end in sorted(ranges):
+        if merged_ranges and start <= merged_ranges[-1][1]:
+            merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], end))
+        else:
+            merged_ranges.append((start, end))
+
+    return merged_ranges
+
+
+def add_coverage(model_class, exchange, symbol, candle_size, ranges):
+
+    coverage = CandleCoverage.objects.filter(
+        table=model_class._meta.db_table,
+        exchange_id=exchange,
+        symbol_id=symbol,
+        interval=candle_size
+    )
+
+    with transaction.atomic():
+        for start, end in ranges:
+            # Ranges which overlap or are adjacent to the new one are merged onto it.
+            overlapping_ranges = list(
+                coverage.filter(start_time__lte=end, end_time__gte=start).values_list('id', 'start_time', 'end_time')
+            )
+
+            if overlapping_ranges:
+                start = min([start, *[range_start for _, range_start, _ in overlapping_ranges]])
+                end = max([end, *[range_end for _, _, range_end in overlapping_ranges]])
+
+                coverage.filter(id__in=[range_id for range_id, _, _ in overlapping_ranges]).delete()
+
+            CandleCoverage.objects.create(
+                table=model_class._meta.db_table,
+                exchange_id=exchange,
+                symbol_id=symbol,
+                interval=candle_size,
+                start_time=start,
+                end_time=end
+            )
+
+
+def update_coverage(model_class, data, now=None):
+    """
+    Adds the closed candles of a saved DataFrame to the covered ranges of the model class.
+    Candles which are still open are not covered, so that they are fetched again.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class the data was saved on.
+    data: DataFrame - required. Saved data, with open_time, close_time, exchange_id, symbol_id and interval columns.
+    now: datetime object - optional. Reference date, before which candles are closed. Defaults to now.
+
+    Returns
+    -------
+    None
+
+    """
+    if data.index.name == 'open_time':
+        data = data.reset_index()
+
+    if len(data) == 0 or not set(COVERAGE_COLUMNS).issubset(data.columns):
+        return
+
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    data = data[pd.to_datetime(data["close_time"], utc=True) < now]
+
+    for (exchange, symbol, candle_size), market_data in data.groupby(["exchange_id", "symbol_id", "interval"]):
+        if candle_size not in const.CANDLE_SIZES_MAPPER:
+            continue
+
+        ranges = get_contiguous_ranges(pd.to_datetime(market_data["open_time"], utc=True), candle_size)
+
+        add_coverage(model_class, exchange, symbol, candle_size, ranges)
+
+
+def build_coverage(model_class, symbol, candle_size, exchange='binance', now=None):
+    """
+    Builds the covered ranges from the saved rows, for data saved before coverage was tracked.
+    """
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    open_times = model_class.objects \
+        .filter(exchange_id=exchange, symbol_id=symbol, interval=candle_size, close_time__lt=now) \
+        .order_by('open_time') \
+        .values_list('open_time', flat=True)
+
+    ranges = get_contiguous_ranges(list(open_times), candle_size)
+
+    logging.debug(f"Built {len(ranges)} covered ranges of {symbol} {candle_size}.")
+
+    add_coverage(model_class, exchange, symbol, candle_size, ranges)
+
+
+def get_coverage(model_class, symbol, candle_size, exchange='binance'):
+    """
+    Returns the sorted, non overlapping ranges of saved and closed candles.
+    """
+    def query_coverage():
+        return list(
+            CandleCoverage.objects
+            .filter(table=model_class._meta.db_table, exchange_id=exchange, symbol_id=symbol, interval=candle_size)
+            .values_list('start_time', 'end_time')
+        )
+
+    coverage = query_coverage()
+
+    if not coverage and model_class.objects.filter(exchange_id=exchange, symbol_id=symbol, interval=candle_size).exists():
+        build_coverage(model_class, symbol, candle_size, exchange)
+
+        coverage = query_coverage()
+
+    return merge_ranges(coverage)
+
+
+def get_gaps(model_class, symbol, candle_size, start_date=None, end_date=None, exchange='binance'):
+    """
+    Returns the ranges of candles which are missing between start_date and end_date.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class.
+    symbol: str - required. Symbol of the data.
+    candle_size: str - required. Candle size of the data.
+    start_date: datetime object - optional. Defaults to the start of the covered
+                history, or to HISTORY_START_DATE if there is none.
+    end_date: datetime object - optional. Defaults to now.
+    exchange: str - optional. Exchange name.
+
+    Returns
+    -------
+    List of (start, end) tuples.
+
+    """
+    coverage = get_coverage(model_class, symbol, candle_size, exchange)
+
+    if start_date is None:
+        start_date = coverage[0][0] if coverage else HISTORY_START_DATE
+
+    if end_date is None:
+        end_date = datetime.now(pytz.utc)
+
+    return subtract_ranges(start_date, end_date, coverage)
+
+
+def subtract_ranges(start_date, end_date, ranges):
+    """
+    Returns the ranges between start_date and end_date which are not within the
+    sorted, non overlapping ranges.
+    """
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+
+    gaps = []
+    gap_start = start_date
+    for range_start, range_end in ranges:
+        if range_end <= gap_start:
+            continue
+
+        if range_start >= end_date:
+            break
+
+        if range_start > gap_start:
+            gaps.append((gap_start, range_start))
+
+        gap_start = range_end
+
+    if gap_start < end_date:
+        gaps.append((gap_start, end_date))
+
+    return gaps
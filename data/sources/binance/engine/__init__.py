@@ -0,0 +1 @@
+from data.sources.binance.engine._engine import IngestionEngine, get_ingestion_engine
@@ -0,0 +1,245 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from binance import AsyncClient
+
+from data.sources._job_listener import JobListener
+from data.sources._signal_triggerer import SignalBatcher, trigger_signal_async
+
+# Maximum number of pipelines loading their history at the same time.
+MAX_STARTUPS = int(os.getenv('ENGINE_MAX_STARTUPS', 16))
+
+# Maximum number of signal generation requests awaiting their job at the same time.
+MAX_SIGNALS = int(os.getenv('ENGINE_MAX_SIGNALS', 256))
+
+# Threads on which blocking work, eg. database queries, is run.
+BLOCKING_WORKERS = int(os.getenv('ENGINE_BLOCKING_WORKERS', 32))
+
+
+class IngestionEngine:
+    """
+    Process wide asyncio event loop, running on a dedicated thread, which drives
+    the data pipelines: market data streams, the startup of pipelines and the
+    triggering of signals. Waiting on the network does not hold a thread, and the
+    work of each kind is bounded by its own concurrency limit.
+
+    Work which can only be done synchronously, such as the database queries of
+    the Django ORM, is run on a bounded pool of threads.
+    """
+
+    def __init__(
+        self,
+        max_startups=MAX_STARTUPS,
+        max_signals=MAX_SIGNALS,
+        blocking_workers=BLOCKING_WORKERS,
+        job_listener=None
+    ):
+        self.max_startups = max_startups
+        self.max_signals = max_signals
+
+        self.job_listener = job_listener or JobListener()
+
+        self._executor = ThreadPoolExecutor(blocking_workers, thread_name_prefix='ingestion-engine')
+        self._lock = threading.Lock()
+
+        self._loop = None
+        self._thread = None
+
+        self._startup_slots = None
+        self._signal_slots = None
+        self._signal_batcher = None
+
+        self._client = None
+        self._session = None
+
+    @property
+    def loop(self):
+        self.start()
+
+        return self._loop
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.is_running:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._loop.set_default_executor(self._executor)
+
+            started = threading.Event()
+
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                args=(started,),
+                name='ingestion-engine-loop',
+                daemon=True
+            )
+            self._thread.start()
+
+            started.wait()
+
+            self.job_listener.start()
+
+    def stop(self):
+        with self._lock:
+            if not self.is_running:
+                return
+
+            self.job_listener.stop()
+
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+            self._loop.close()
+
+            self._loop = None
+            self._thread = None
+
+    def submit(self, coroutine):
+        """
+        Schedules a coroutine on the event loop.
+
+        Returns
+        -------
+        concurrent.futures.Future with the result of the coroutine.
+
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        future.add_done_callback(log_exception)
+
+        return future
+
+    async def run_blocking(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(func, *args, **kwargs)
+        )
+
+    async def get_client(self):
+        if self._client is None:
+            self._client = await AsyncClient.create()
+
+        return self._client
+
+    def get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        return self._session
+
+    def start_data_ingestion(self, handler_factory, header=''):
+        """
+        Starts a data pipeline on the event loop.
+
+        Parameters
+        ----------
+        handler_factory: method - required. Function which creates the data handler of the pipeline.
+                         It is run on the blocking pool, as creating a handler queries the database.
+        header: Header for logging line.
+
+        Returns
+        -------
+        concurrent.futures.Future with the data handler.
+
+        """
+        return self.submit(self._start_data_ingestion(handler_factory, header))
+
+    def stop_data_ingestion(self, handler, header=''):
+        return self.submit(self.run_blocking(handler.stop_data_ingestion, header=header))
+
+    async def generate_new_signal(self, handler, header='', retries=0):
+        """
+        Asynchronous counterpart of BinanceDataHandler.generate_new_signal.
+        The pipeline is stopped if the signal could not be generated.
+        """
+        if retries >= 2:
+            return False
+
+        async with self._signal_slots:
+            success, message = await trigger_signal_async(
+                handler.pipeline_id,
+                self.get_session(),
+                header=header,
+                batcher=self._signal_batcher,
+                listener=self.job_listener
+            )
+
+        if not success:
+            if "Too many retries" in message:
+                success = await self.generate_new_signal(handler, header, retries=retries + 1)
+            else:
+                logging.warning(header + message)
+                await self.run_blocking(handler.stop_data_ingestion, header=header)
+
+        return success
+
+    async def _start_data_ingestion(self, handler_factory, header=''):
+        async with self._startup_slots:
+            handler = await self.run_blocking(handler_factory)
+
+            await self.run_blocking(handler.load_history, header=header)
+
+        # New candles trigger signals on the event loop from now on.
+        handler.engine = self
+
+        if await self.generate_new_signal(handler, header):
+            await self.run_blocking(handler.start_streams, header=header)
+
+        return handler
+
+    def _run_loop(self, started):
+        asyncio.set_event_loop(self._loop)
+
+        # Semaphores are bound to the loop on which they are created.
+        self._loop.run_until_complete(self._setup_loop())
+
+        started.set()
+
+        self._loop.run_forever()
+
+    async def _setup_loop(self):
+        self._startup_slots = asyncio.Semaphore(self.max_startups)
+        self._signal_slots = asyncio.Semaphore(self.max_signals)
+        self._signal_batcher = SignalBatcher()
+
+    async def _close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if self._client is not None:
+            await self._client.close_connection()
+            self._client = None
+
+
+def log_exception(future):
+    if not future.cancelled() and future.exception() is not None:
+        logging.error("Ingestion engine task failed.", exc_info=future.exception())
+
+
+_ingestion_engine = None
+_ingestion_engine_lock = threading.Lock()
+
+
+def get_ingestion_engine():
+    """
+    Returns the process wide ingestion engine, creating it on first use.
+    """
+    global _ingestion_engine
+
+    with _ingestion_engine_lock:
+        if _ingestion_engine is None:
+            _ingestion_engine = IngestionEngine()
+
+        return _ingestion_engine
@@ -1 +1 @@
-from data.sources.binance.extract._extract import extract_data, extract_data_db
+from data.sources.binance.extract._extract import decode_klines, extract_data, extract_data_db, get_start_date
@@ -3,23 +3,34 @@ import os
 from datetime import datetime, timedelta
 
 import django
+import numpy as np
 import pandas as pd
 import pytz
 
 import shared.exchanges.binance.constants as const
+from data.sources.binance.coverage import get_gaps, add_coverage, get_contiguous_ranges, subtract_ranges
 from shared.data.queries import get_data
 from shared.utils.decorators.failed_connection import retry_failed_connection
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
 
+DECODING_BATCH_SIZE = 10000
+
+KLINE_LENGTH = 12
+
 
 def get_start_date(model_class, symbol, candle_size):
-    try:
-        start_date = model_class.objects \
-                         .filter(exchange='binance', symbol=symbol, interval=candle_size) \
-                         .order_by('open_time').last().open_time - timedelta(hours=6)
-    except AttributeError:
+    # Only open_time is read, so that the query is answered from the market index.
+    last_open_time = model_class.objects \
+        .filter(exchange='binance', symbol=symbol, interval=candle_size) \
+        .order_by('open_time') \
+        .values_list('open_time', flat=True) \
+        .last()
+
+    if last_open_time is not None:
+        start_date = last_open_time - timedelta(hours=6)
+    else:
         start_date = datetime(2019, 9, 1).astimezone(pytz.utc)
 
     logging.debug(start_date)
@@ -51,7 +62,7 @@ def extract_data(
     symbol: str - required. Symbol for which to retrieve data.
     candle_size: str - optional. Candle size at which data should be retrieved.
     start_date: datetime object - optional. Start date from which to retrieve data.
-                If not specified, data will be fetched from the last entry on.
+                If not specified, only the ranges which are missing are fetched.
     header: Header for logging line.
 
     Returns
@@ -61,29 +72,106 @@ def extract_data(
     """
 
     if start_date is None:
-        start_date = get_start_date(model_class, symbol, candle_size)
-        start_date = int(start_date.timestamp() * 1000)
+        end_date = datetime.now(pytz.utc)
+
+        # The gap which runs up to now is left open ended.
+        ranges = [
+            (gap_start, gap_end if gap_end < end_date else None)
+            for gap_start, gap_end in get_gaps(model_class, symbol, candle_size, end_date=end_date)
+        ]
+    else:
+        ranges = [(start_date, None)]
+
+    logging.info(header + f"Extracting missing historical data in {len(ranges)} range(s).")
+
+    data = [decode_klines([])]
+    for range_start, range_end in ranges:
+        range_data = extract_klines(
+            klines_generator(
+                symbol,
+                candle_size,
+                convert_date(range_start) if start_date is None else range_start,
+                convert_date(range_end) - 1 if range_end is not None else None
+            ),
+            header=header
+        )
+
+        if range_end is not None:
+            cover_empty_ranges(model_class, symbol, candle_size, range_start, range_end, range_data)
+
+        data.extend(range_data)
+
+    return pd.concat(data, ignore_index=True)
+
+
+def cover_empty_ranges(model_class, symbol, candle_size, range_start, range_end, data):
+    """
+    Marks the parts of a fetched range for which the exchange returned no klines, eg. while
+    it was down, as covered, so that they are not fetched again. The parts which were
+    returned are covered once they are saved.
+    """
+    open_times = pd.concat(data)["open_time"] if data else []
+
+    empty_ranges = subtract_ranges(range_start, range_end, get_contiguous_ranges(open_times, candle_size))
+
+    if empty_ranges:
+        logging.debug(f"No {symbol} {candle_size} data in {len(empty_ranges)} range(s).")
+
+        add_coverage(model_class, 'binance', symbol, candle_size, empty_ranges)
 
-    logging.info(header + f"Extracting missing historical data.")
 
-    klines = klines_generator(symbol, candle_size, start_date)
+def convert_date(date):
+    return int(date.timestamp() * 1000)
+
+
+def extract_klines(klines, header=''):
 
     data = []
-    i = 1
+    batch = []
     while True:
         try:
-            kline = yield_kline(klines)
+            batch.append(yield_kline(klines))
         except StopIteration:
             break
 
-        fields = {field: get_value(kline) for field, get_value in const.BINANCE_KEY.items()}
-        data.append(fields)
-        logging.debug(fields)
+        if len(batch) == DECODING_BATCH_SIZE:
+            data.append(decode_klines(batch))
+            batch = []
+
+            logging.debug(header + f"Processed {len(data) * DECODING_BATCH_SIZE} new rows.")
+
+    data.append(decode_klines(batch))
+
+    return data
+
+
+def decode_klines(klines):
+    """
+    Decodes a batch of raw klines, as returned by the Binance API, into a DataFrame
+    with one typed column per field. Timestamps are converted in bulk from ms epochs
+    into UTC datetimes.
 
-        if i % 1E3 == 0:
-            logging.debug(header + f"Processed {i} new rows.")
+    Parameters
+    ----------
+    klines: list - required. List of raw klines.
+
+    Returns
+    -------
+    DataFrame with decoded data.
+
+    """
 
-        i += 1
+    if len(klines) == 0:
+        array = np.empty((0, KLINE_LENGTH), dtype=object)
+    else:
+        array = np.array(klines, dtype=object)
+
+    data = {}
+    for field, (index, dtype) in const.BINANCE_KLINE_COLUMNS.items():
+        if dtype == "datetime":
+            data[field] = pd.to_datetime(array[:, index].astype(np.int64), unit='ms', utc=True)
+        else:
+            data[field] = array[:, index].astype(np.float64).astype(dtype)
 
     return pd.DataFrame(data)
 
@@ -2,61 +2,180 @@ import logging
 import os
 from datetime import datetime
 
+import pandas as pd
 import pytz
 from django.db import connection, transaction
 import django
 
+from data.sources.binance.coverage import update_coverage
+from shared.data.revisions import add_revision
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
 
 from database.model.models import Pipeline
 
-unique_fields = {"open_time", "exchange", "symbol", "interval"}
+unique_fields = ("open_time", "exchange_id", "interval", "symbol_id")
+
+BATCH_SIZE = 1000
+
+
+def load_data(model_class, data, pipeline_id, count_updates=True, batch_size=BATCH_SIZE, header=''):
+    """
+    Upserts a transformed DataFrame onto the specified model class, in batches,
+    using the (open_time, exchange, interval, symbol) unique key.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class to save data on.
+    data: DataFrame - required. Transformed data to be saved.
+    pipeline_id: int - required. Id of the pipeline whose last entry is updated.
+    count_updates: bool - optional. Whether rows which already existed count as new entries.
+    batch_size: int - optional. Maximum number of rows written per statement.
+    header: Header for logging line.
 
+    Returns
+    -------
+    True if any new entries were added, False otherwise.
 
-def load_data(model_class, data, pipeline_id, count_updates=True, header=''):
+    """
 
     logging.debug(f'Saving data with {data.shape[0]} rows and {data.shape[1]} columns.')
 
     if data.index.name == 'open_time':
         data = data.reset_index()
 
-    new_entries = 0
-    for index, row in data.iterrows():
+    fields = get_model_fields(model_class, data.columns)
+
+    records = get_records(data, fields)
 
-        new_entry = save_new_entry_db(model_class, row, count_updates)
+    revised_markets = get_revised_markets(model_class, data)
 
-        new_entries += 1 if new_entry else 0
+    new_entries = 0
+    for i in range(0, len(records), batch_size):
+        new_entries += upsert_batch(model_class, fields, records[i:i + batch_size], count_updates)
 
     logging.info(header + f"Added {new_entries} new rows into {model_class}.")
 
+    update_coverage(model_class, data)
+
+    # Recorded once the rows are written, so that the caches of the candles sync them.
+    for (exchange, symbol, interval), (start_time, end_time) in revised_markets.items():
+        add_revision(model_class, exchange, symbol, interval, start_time, end_time)
+
     Pipeline.objects.filter(id=pipeline_id).update(last_entry=datetime.now(pytz.utc))
 
     return new_entries > 0
 
 
-def save_new_entry_db(model_class, fields, count_updates=True):
+def get_revised_markets(model_class, data):
+    """
+    Returns the earliest and latest open times of the rows of each market whose earliest row
+    precedes its latest saved row, ie. which revise its history rather than extend it.
+    """
+    if len(data) == 0 or not {"open_time", *unique_fields}.issubset(data.columns):
+        return {}
+
+    revised_markets = {}
+
+    for (exchange, symbol, interval), market_data in data.groupby(["exchange_id", "symbol_id", "interval"]):
+        open_times = pd.to_datetime(market_data["open_time"], utc=True)
+        start_time = open_times.min()
+
+        is_revised = model_class.objects \
+            .filter(exchange_id=exchange, symbol_id=symbol, interval=interval, open_time__gt=start_time) \
+            .exists()
+
+        if is_revised:
+            revised_markets[(exchange, symbol, interval)] = start_time, open_times.max()
+
+    return revised_markets
+
+
+def get_model_fields(model_class, columns):
+    model_fields = {field.attname: field for field in model_class._meta.concrete_fields if not field.primary_key}
+
+    return [model_fields[column] for column in columns if column in model_fields]
+
+
+def get_records(data, fields):
+
+    data = data[[field.attname for field in fields]]
+
+    data = data.astype(object).where(pd.notnull(data), None)
+
+    # Later rows take precedence, as the same key cannot be upserted twice in one statement.
+    records = {}
+    for record in data.to_dict(orient='records'):
+        records[tuple(record.get(key) for key in unique_fields)] = record
+
+    return list(records.values())
+
+
+def get_existing_keys(model_class, records):
+
+    query = {
+        f"{key}__in": {record.get(key) for record in records}
+        for key in unique_fields
+    }
+
+    return set(model_class.objects.filter(**query).values_list(*unique_fields))
+
+
+def upsert_batch(model_class, fields, records, count_updates=True):
+    """
+    Writes a batch of records with a single INSERT ... ON CONFLICT DO UPDATE statement.
+
+    Returns
+    -------
+    Number of rows that count as new entries.
+
+    """
+
+    batch_size = connection.ops.bulk_batch_size(fields, records)
+
+    if batch_size < len(records):
+        return sum(
+            upsert_batch(model_class, fields, records[i:i + batch_size], count_updates)
+            for i in range(0, len(records), batch_size)
+        )
+
+    quote_name = connection.ops.quote_name
+
+    columns = [field.column for field in fields]
+    key_columns = [model_class._meta.get_field(key).column for key in unique_fields]
+    update_columns = [column for column in columns if column not in key_columns]
+
+    placeholders = f"({', '.join(['%s'] * len(fields))})"
+
+    sql = (
+        f"INSERT INTO {quote_name(model_class._meta.db_table)} "
+        f"({', '.join(quote_name(column) for column in columns)}) "
+        f"VALUES {', '.join([placeholders] * len(records))} "
+        f"ON CONFLICT ({', '.join(quote_name(column) for column in key_columns)}) "
+    )
+
+    if update_columns:
+        sql += "DO UPDATE SET " + ', '.join(
+            f"{quote_name(column)} = EXCLUDED.{quote_name(column)}" for column in update_columns
+        )
+    else:
+        sql += "DO NOTHING"
 
-    new_entry = True
-    try:
-        with transaction.atomic():
-            model_class.objects.create(**fields)
-    except ValueError as e:
-        logging.debug(e)
-        logging.debug(fields)
+    params = [
+        field.get_db_prep_save(record[field.attname], connection)
+        for record in records
+        for field in fields
+    ]
 
-        fields["close_time"] = None
-        with transaction.atomic():
-            model_class.objects.create(**fields)
-    except django.db.utils.IntegrityError as e:
-        logging.debug(e)
-        logging.debug(fields)
+    with transaction.atomic():
+        existing_keys = get_existing_keys(model_class, records)
 
-        fields_subset = {key: value for key, value in fields.items() if key in unique_fields}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
 
-        rows = model_class.objects.filter(**fields_subset).update(**fields)
+    keys = {tuple(record.get(key) for key in unique_fields) for record in records}
 
-        if rows == 0 or not count_updates:
-            new_entry = False
+    inserted = len(keys - existing_keys)
 
-    return new_entry
+    return len(records) if count_updates else inserted
@@ -0,0 +1,9 @@
+from data.sources.binance.replay._replay import (
+    ReplaySocketManager,
+    ReplayStats,
+    candles_to_messages,
+    load_candles,
+    read_candles_csv,
+    read_recorded_messages,
+    run_replay,
+)
@@ -0,0 +1,378 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import django
+import pandas as pd
+
+import shared.exchanges.binance.constants as const
+from data.sources import trigger_signal
+from data.sources.binance.candle_store import CandleStore
+from data.sources.binance.stream_hub import StreamHub
+from shared.data.queries import get_data
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import ExchangeData, StructuredData
+
+
+def get_stream_name(symbol, candle_size):
+    return f"{symbol.lower()}@kline_{candle_size}"
+
+
+def get_event_time(message):
+    return message["data"]["E"]
+
+
+def read_recorded_messages(path):
+    """
+    Reads recorded websocket messages from a file with one JSON message per line.
+    Messages of single streams, which are not wrapped in a multiplexed envelope,
+    are wrapped onto one.
+
+    Parameters
+    ----------
+    path: str - required. Path of the file of recorded messages.
+
+    Returns
+    -------
+    List of multiplexed kline messages.
+
+    """
+    messages = []
+
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+
+            message = json.loads(line)
+
+            if "stream" not in message:
+                message = dict(stream=get_stream_name(message["s"], message["k"]["i"]), data=message)
+
+            messages.append(message)
+
+    return messages
+
+
+def read_candles_csv(path):
+    """
+    Reads candles from a CSV file with an open_time column and the columns of the candle tables.
+    """
+    return pd.read_csv(path, index_col='open_time', parse_dates=['open_time', 'close_time'])
+
+
+def load_candles(model_class, symbol, candle_size, start_date=None, end_date=None, exchange='binance'):
+    """
+    Reads stored candles, eg. of StructuredData, to be replayed.
+    """
+    data = get_data(model_class, start_date, symbol, candle_size, exchange)
+
+    if end_date is not None:
+        data = data[data.index < end_date]
+
+    return data
+
+
+def to_milliseconds(dates):
+    return pd.DatetimeIndex(pd.to_datetime(dates, utc=True)).asi8 // 10 ** 6
+
+
+def candles_to_messages(data, symbol, candle_size, updates_per_candle=1):
+    """
+    Synthesizes the kline messages which would have been streamed for a set of candles.
+
+    Parameters
+    ----------
+    data: DataFrame - required. Candles indexed by open_time, in the format of get_data.
+    symbol: str - required. Symbol of the candles.
+    candle_size: str - required. Candle size of the candles.
+    updates_per_candle: int - optional. Number of messages per candle. The last one closes the candle.
+
+    Returns
+    -------
+    List of multiplexed kline messages, ordered by event time.
+
+    """
+    candle_ms = int(pd.Timedelta(const.CANDLE_SIZES_MAPPER[candle_size]).total_seconds() * 1000)
+
+    stream = get_stream_name(symbol, candle_size)
+
+    open_times = to_milliseconds(data.index)
+    close_times = to_milliseconds(data["close_time"]) if "close_time" in data else open_times + candle_ms - 1
+
+    values = {
+        key: data[column].fillna(0).tolist()
+        for key, column in const.NAME_MAPPER.items()
+        if key not in ("t", "T") and column in data
+    }
+
+    messages = []
+    for i, (open_time, close_time) in enumerate(zip(open_times.tolist(), close_times.tolist())):
+        kline = dict(t=open_time, T=close_time, s=symbol, i=candle_size, B="0")
+
+        for key, column_values in values.items():
+            kline[key] = int(column_values[i]) if key == "n" else str(column_values[i])
+
+        for update in range(1, updates_per_candle + 1):
+            is_final = update == updates_per_candle
+
+            messages.append(dict(
+                stream=stream,
+                data=dict(
+                    e="kline",
+                    E=close_time if is_final else open_time + candle_ms * update // updates_per_candle,
+                    s=symbol,
+                    k=dict(kline, x=is_final),
+                ),
+            ))
+
+    return messages
+
+
+class ReplayStats:
+
+    def __init__(self):
+        self.messages = 0
+        self.closed_candles = 0
+        self.elapsed = 0
+        self.rows_written = {}
+        self.signal_latencies = []
+
+        self._lock = threading.Lock()
+
+    def add_signal_latency(self, latency):
+        with self._lock:
+            self.signal_latencies.append(latency)
+
+    @property
+    def messages_per_second(self):
+        return self.messages / self.elapsed if self.elapsed else 0
+
+    @property
+    def candles_per_second(self):
+        return self.closed_candles / self.elapsed if self.elapsed else 0
+
+    @property
+    def rows_per_second(self):
+        return sum(self.rows_written.values()) / self.elapsed if self.elapsed else 0
+
+    def get_latency_percentile(self, percentile):
+        if not self.signal_latencies:
+            return None
+
+        return pd.Series(self.signal_latencies).quantile(percentile)
+
+    def to_dict(self):
+        return dict(
+            messages=self.messages,
+            closed_candles=self.closed_candles,
+            elapsed=self.elapsed,
+            messages_per_second=self.messages_per_second,
+            candles_per_second=self.candles_per_second,
+            rows_written=self.rows_written,
+            rows_per_second=self.rows_per_second,
+            signal_latency_p50=self.get_latency_percentile(0.5),
+            signal_latency_p99=self.get_latency_percentile(0.99),
+        )
+
+
+class ReplaySocketManager:
+    """
+    Stand-in for binance's ThreadedWebsocketManager which replays recorded or
+    synthesized kline messages onto the open multiplex sockets, so that the stream
+    hub and everything downstream of it run as they would with a live connection.
+
+    Messages are replayed in event time order across all streams, at a multiple
+    of real-time speed, or as fast as possible if no speed is given.
+    """
+
+    def __init__(self, messages=None, speed=None):
+        self.speed = speed
+
+        self._messages = list(messages or [])
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+        self._last_close_times = {}
+        self._stopped = threading.Event()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def add_messages(self, messages):
+        self._messages.extend(messages)
+
+    def start(self):
+        self._stopped.clear()
+
+    def stop(self):
+        self._stopped.set()
+
+        with self._lock:
+            self._sockets = {}
+
+    def start_multiplex_socket(self, callback, streams):
+        conn_key = f"streams={'/'.join(streams)}"
+
+        with self._lock:
+            self._sockets[conn_key] = (callback, set(streams))
+
+        return conn_key
+
+    def stop_socket(self, conn_key):
+        with self._lock:
+            self._sockets.pop(conn_key, None)
+
+    def get_last_close_time(self, stream):
+        """
+        Returns the wall clock time at which the last closing message of a stream was replayed.
+        """
+        return self._last_close_times.get(stream)
+
+    def replay(self, stats=None):
+        """
+        Replays the messages onto the open sockets, blocking until all of them are
+        replayed or the manager is stopped. Messages of streams which have no open
+        socket are dropped, as they would be by Binance.
+
+        Parameters
+        ----------
+        stats: ReplayStats - optional. Statistics onto which to record the replay.
+
+        Returns
+        -------
+        ReplayStats
+
+        """
+        if stats is None:
+            stats = ReplayStats()
+
+        messages = sorted(self._messages, key=get_event_time)
+
+        if not messages:
+            return stats
+
+        start_time = time.perf_counter()
+        first_event_time = get_event_time(messages[0])
+
+        for message in messages:
+            if self._stopped.is_set():
+                break
+
+            if self.speed:
+                delay = (get_event_time(message) - first_event_time) / 1000 / self.speed \
+                    - (time.perf_counter() - start_time)
+
+                if delay > 0:
+                    time.sleep(delay)
+
+            with self._lock:
+                callbacks = [
+                    callback for callback, streams in self._sockets.values()
+                    if message["stream"] in streams
+                ]
+
+            if message["data"].get("k", {}).get("x"):
+                self._last_close_times[message["stream"]] = time.perf_counter()
+                stats.closed_candles += 1
+
+            for callback in callbacks:
+                callback(message)
+
+            stats.messages += 1
+
+        stats.elapsed = time.perf_counter() - start_time
+
+        return stats
+
+
+def count_rows(symbols, exchange='binance'):
+    return {
+        model_class.__name__: model_class.objects.filter(exchange_id=exchange, symbol_id__in=symbols).count()
+        for model_class in [ExchangeData, StructuredData]
+    }
+
+
+def run_replay(
+    socket_manager,
+    pipelines,
+    base_candle_size='5m',
+    trigger_signals=False,
+    exchange='binance',
+    header=''
+):
+    """
+    Subscribes a set of pipelines to the candle store, replays the messages of a
+    socket manager through it, and measures the throughput of the data pipeline.
+
+    Parameters
+    ----------
+    socket_manager: ReplaySocketManager - required. Socket manager holding the messages to replay.
+    pipelines: list - required. Tuples of (pipeline_id, symbol, candle_size) to subscribe.
+    base_candle_size: str - optional. Candle size of the replayed streams.
+    trigger_signals: bool - optional. Whether signals are triggered for the pipelines
+                     whenever new candles are saved, as BinanceDataHandler does.
+    exchange: str - optional. Exchange name.
+    header: Header for logging line.
+
+    Returns
+    -------
+    ReplayStats. Signal latencies are measured from the replay of the closing
+    message of a base candle, so they are only meaningful for paced replays.
+
+    """
+    stats = ReplayStats()
+
+    candle_store = CandleStore(stream_hub=StreamHub(socket_manager_factory=lambda: socket_manager))
+
+    symbols = {symbol for _, symbol, _ in pipelines}
+
+    rows_before = count_rows(symbols, exchange)
+
+    def get_callback(pipeline_id, stream):
+        def callback(new_entry):
+            if new_entry and trigger_signals:
+                trigger_signal(pipeline_id, header=header)
+
+            last_close_time = socket_manager.get_last_close_time(stream)
+
+            if last_close_time is not None:
+                stats.add_signal_latency(time.perf_counter() - last_close_time)
+
+        return callback
+
+    for pipeline_id, symbol, candle_size in pipelines:
+        candle_store.subscribe(
+            ('replay', pipeline_id),
+            symbol,
+            candle_size,
+            get_callback(pipeline_id, get_stream_name(symbol, base_candle_size)),
+            base_candle_size=base_candle_size,
+            pipeline_id=pipeline_id,
+            exchange=exchange,
+            header=header
+        )
+
+    logging.info(header + f"Replaying {len(socket_manager)} messages for {len(pipelines)} pipeline(s).")
+
+    start_time = time.perf_counter()
+
+    socket_manager.replay(stats)
+
+    # Waits for the replayed messages to be processed.
+    candle_store.stop()
+
+    stats.elapsed = time.perf_counter() - start_time
+
+    rows_after = count_rows(symbols, exchange)
+
+    stats.rows_written = {name: rows_after[name] - rows_before[name] for name in rows_after}
+
+    logging.info(header + f"Replay finished: {stats.to_dict()}.")
+
+    return stats
@@ -0,0 +1 @@
+from data.sources.binance.stream_hub._stream_hub import AsyncSocketManager, Listener, StreamHub, get_stream_hub
@@ -0,0 +1,393 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from binance import BinanceSocketManager, ThreadedWebsocketManager
+
+# Binance allows up to 1024 streams per combined stream connection.
+MAX_STREAMS_PER_CONNECTION = int(os.getenv('STREAM_HUB_MAX_STREAMS', 200))
+MAX_CONNECTIONS = int(os.getenv('STREAM_HUB_MAX_CONNECTIONS', 5))
+MAX_WORKERS = int(os.getenv('STREAM_HUB_WORKERS', 32))
+
+# Time during which a replaced connection is kept open, so that no messages are lost
+# while its replacement connects.
+SWAP_GRACE_PERIOD = 5
+
+# Time to wait before reopening a multiplex socket which failed.
+RECONNECT_DELAY = 5
+
+
+class Listener:
+    """
+    Delivers messages to a callback in the order in which they were received, using
+    a shared worker pool, so that a slow callback does not block the socket nor
+    the other listeners.
+    """
+
+    def __init__(self, callback, executor):
+        self.callback = callback
+        self.executor = executor
+
+        self._messages = deque()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def put(self, message):
+        with self._lock:
+            self._messages.append(message)
+
+            if self._running:
+                return
+
+            self._running = True
+
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._messages:
+                    self._running = False
+                    return
+
+                message = self._messages.popleft()
+
+            try:
+                self.callback(message)
+            except Exception as e:
+                logging.exception(e)
+
+
+class Connection:
+
+    def __init__(self):
+        self.streams = []
+        self.conn_key = None
+
+
+class StreamHub:
+    """
+    Process wide hub of Binance market data streams. It keeps a small pool of
+    combined stream connections on a single websocket manager, subscribes to each
+    stream only once, and fans out incoming messages to all listeners of that stream.
+
+    Adding or removing streams at runtime swaps the affected connection for a new
+    one with the updated streams, while the remaining connections are left untouched.
+    """
+
+    def __init__(
+        self,
+        max_streams_per_connection=MAX_STREAMS_PER_CONNECTION,
+        max_connections=MAX_CONNECTIONS,
+        max_workers=MAX_WORKERS,
+        grace_period=SWAP_GRACE_PERIOD,
+        socket_manager_factory=ThreadedWebsocketManager
+    ):
+        self.max_streams_per_connection = max_streams_per_connection
+        self.max_connections = max_connections
+        self.grace_period = grace_period
+
+        self._socket_manager_factory = socket_manager_factory
+        self._socket_manager = None
+
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='stream-hub')
+        self._lock = threading.RLock()
+
+        self._listeners = {}
+        self._subscriptions = defaultdict(set)
+        self._connections = []
+        self._pending_stops = {}
+        self._last_event_times = {}
+
+    @property
+    def streams(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    @property
+    def connections(self):
+        with self._lock:
+            return [list(connection.streams) for connection in self._connections]
+
+    def subscribe(self, listener_id, streams, callback):
+        """
+        Subscribes a listener to the given streams. Streams which are not yet
+        being received are added to the pool of connections.
+
+        Parameters
+        ----------
+        listener_id: hashable - required. Unique identifier of the listener.
+        streams: list - required. Stream names, eg. btcusdt@kline_5m.
+        callback: method - required. Function called with each message of the streams.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._listeners[listener_id] = Listener(callback, self._executor)
+
+            new_streams = [stream for stream in streams if stream not in self._subscriptions]
+
+            for stream in streams:
+                self._subscriptions[stream].add(listener_id)
+
+            if not new_streams:
+                return
+
+            rejected_streams = self._add_streams(new_streams)
+
+            if rejected_streams:
+                logging.warning(
+                    f"Stream hub reached its limit of {self.max_connections} connections, "
+                    f"not subscribing to: {', '.join(rejected_streams)}."
+                )
+
+                for stream in rejected_streams:
+                    del self._subscriptions[stream]
+
+    def unsubscribe(self, listener_id):
+        """
+        Unsubscribes a listener from all its streams. Streams which are left with
+        no listeners are removed from the pool of connections.
+
+        Parameters
+        ----------
+        listener_id: hashable - required. Unique identifier of the listener.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._listeners.pop(listener_id, None)
+
+            removed_streams = []
+            for stream, listener_ids in list(self._subscriptions.items()):
+                listener_ids.discard(listener_id)
+
+                if not listener_ids:
+                    del self._subscriptions[stream]
+                    self._last_event_times.pop(stream, None)
+                    removed_streams.append(stream)
+
+            if removed_streams:
+                self._remove_streams(removed_streams)
+
+    def stop(self):
+        with self._lock:
+            for _, timer in self._pending_stops.values():
+                timer.cancel()
+
+            if self._socket_manager is not None:
+                self._socket_manager.stop()
+
+            self._socket_manager = None
+            self._listeners = {}
+            self._subscriptions = defaultdict(set)
+            self._connections = []
+            self._pending_stops = {}
+            self._last_event_times = {}
+
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self, message):
+
+        if message.get("e") == "error":
+            logging.warning(f"Stream hub received an error: {message.get('m')}")
+            return
+
+        stream = message.get("stream")
+        event_time = message.get("data", {}).get("E")
+
+        with self._lock:
+            if event_time is not None:
+                if event_time <= self._last_event_times.get(stream, -1):
+                    return
+
+                self._last_event_times[stream] = event_time
+
+            listeners = [
+                self._listeners[listener_id]
+                for listener_id in self._subscriptions.get(stream, ())
+                if listener_id in self._listeners
+            ]
+
+        for listener in listeners:
+            listener.put(message)
+
+    def _get_socket_manager(self):
+        if self._socket_manager is None:
+            self._socket_manager = self._socket_manager_factory()
+            self._socket_manager.start()
+
+        return self._socket_manager
+
+    def _add_streams(self, streams):
+        """
+        Adds streams to the least loaded connections with spare capacity, and opens new
+        connections only once those are full, up to max_connections.
+
+        Returns
+        -------
+        List of the streams which could not be added, as all connections are full.
+
+        """
+        while streams:
+            available_connections = [
+                connection for connection in self._connections
+                if len(connection.streams) < self.max_streams_per_connection
+            ]
+
+            if available_connections:
+                connection = min(available_connections, key=lambda conn: len(conn.streams))
+            elif len(self._connections) < self.max_connections:
+                connection = Connection()
+                self._connections.append(connection)
+            else:
+                return streams
+
+            capacity = self.max_streams_per_connection - len(connection.streams)
+
+            self._swap_connection(connection, connection.streams + streams[:capacity])
+
+            streams = streams[capacity:]
+
+        return []
+
+    def _remove_streams(self, streams):
+        for connection in list(self._connections):
+            remaining_streams = [stream for stream in connection.streams if stream not in streams]
+
+            if len(remaining_streams) != len(connection.streams):
+                self._swap_connection(connection, remaining_streams)
+
+    def _swap_connection(self, connection, streams):
+
+        old_conn_key = connection.conn_key
+        old_streams = connection.streams
+
+        connection.streams = streams
+
+        if not streams:
+            self._connections.remove(connection)
+            connection.conn_key = None
+
+            self._stop_socket(old_conn_key)
+            return
+
+        logging.debug(f"Stream hub connection now has streams: {', '.join(streams)}.")
+
+        pending_stop = self._pending_stops.pop(tuple(streams), None)
+
+        if pending_stop is not None:
+            # A connection with the exact same streams is still open, so it is reused.
+            connection.conn_key, timer = pending_stop
+            timer.cancel()
+        else:
+            connection.conn_key = self._get_socket_manager().start_multiplex_socket(self._dispatch, streams)
+
+        if old_conn_key is not None:
+            # The replaced connection keeps delivering until the new one is connected. Messages
+            # received on both connections are deduplicated on dispatch.
+            timer = threading.Timer(self.grace_period, self._stop_pending_socket, [tuple(old_streams)])
+            timer.daemon = True
+
+            replaced_stop = self._pending_stops.pop(tuple(old_streams), None)
+            if replaced_stop is not None:
+                replaced_stop[1].cancel()
+                self._stop_socket(replaced_stop[0])
+
+            self._pending_stops[tuple(old_streams)] = (old_conn_key, timer)
+
+            timer.start()
+
+    def _stop_pending_socket(self, streams):
+        with self._lock:
+            pending_stop = self._pending_stops.pop(streams, None)
+
+            if pending_stop is not None:
+                self._stop_socket(pending_stop[0])
+
+    def _stop_socket(self, conn_key):
+        if conn_key is not None and self._socket_manager is not None:
+            self._socket_manager.stop_socket(conn_key)
+
+
+class AsyncSocketManager:
+    """
+    Socket manager with the interface of binance's ThreadedWebsocketManager, whose
+    multiplex sockets run as tasks on the event loop of the ingestion engine.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+        self._tasks = {}
+        self._conn_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.engine.start()
+
+    def stop(self):
+        with self._lock:
+            tasks, self._tasks = self._tasks, {}
+
+        for task in tasks.values():
+            task.cancel()
+
+    def start_multiplex_socket(self, callback, streams):
+        conn_key = f"{next(self._conn_ids)}:streams={'/'.join(streams)}"
+
+        with self._lock:
+            self._tasks[conn_key] = self.engine.submit(self._listen(callback, streams))
+
+        return conn_key
+
+    def stop_socket(self, conn_key):
+        with self._lock:
+            task = self._tasks.pop(conn_key, None)
+
+        if task is not None:
+            task.cancel()
+
+    async def _listen(self, callback, streams):
+        socket_manager = BinanceSocketManager(await self.engine.get_client())
+
+        while True:
+            try:
+                async with socket_manager.multiplex_socket(streams) as socket:
+                    while True:
+                        callback(await socket.recv())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Multiplex socket failed, reconnecting: {e}")
+
+                await asyncio.sleep(RECONNECT_DELAY)
+
+
+_stream_hub = None
+_stream_hub_lock = threading.Lock()
+
+
+def get_stream_hub():
+    """
+    Returns the process wide stream hub, creating it on first use.
+    """
+    global _stream_hub
+
+    with _stream_hub_lock:
+        if _stream_hub is None:
+            from data.sources.binance.engine import get_ingestion_engine
+
+            _stream_hub = StreamHub(socket_manager_factory=lambda: AsyncSocketManager(get_ingestion_engine()))
+
+        return _stream_hub
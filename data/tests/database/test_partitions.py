@@ -0,0 +1,129 @@
+from shared.utils.tests.fixtures.models import *
+
+from datetime import datetime
+from io import StringIO
+
+import pandas as pd
+from django.core.management import call_command
+from django.db import connection
+
+from database.model.models import ExchangeData
+from data.service.cron_jobs.manage_partitions import manage_partitions
+from database.model.partitions import (
+    create_future_partitions,
+    detach_old_partitions,
+    get_months,
+    get_partition_name,
+    get_partitions,
+    is_partitioned,
+    parse_partition_name,
+    rebuild_table,
+)
+
+NOW = datetime(2021, 5, 10, tzinfo=pytz.utc)
+
+TABLE = "model_exchangedata"
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Partitioning is only supported on Postgres. Set DATABASE_URL to a local Postgres to run."
+)
+
+
+class TestPartitionHelpers:
+
+    def test_get_months(self):
+        months = get_months(datetime(2020, 11, 15, tzinfo=pytz.utc), datetime(2021, 2, 1, tzinfo=pytz.utc))
+
+        assert [month.strftime("%Y-%m") for month in months] == ["2020-11", "2020-12", "2021-01", "2021-02"]
+
+    @pytest.mark.parametrize(
+        "partition_name,expected_value",
+        [
+            pytest.param("model_exchangedata_p2021_04", pd.Timestamp("2021-04-01", tz=pytz.utc), id="monthly"),
+            pytest.param("model_exchangedata_default", None, id="default"),
+            pytest.param("model_structureddata_p2021_04", None, id="other_table"),
+        ],
+    )
+    def test_parse_partition_name(self, partition_name, expected_value):
+        assert parse_partition_name(TABLE, partition_name) == expected_value
+
+    def test_partition_name_round_trip(self):
+        month_start = pd.Timestamp("2021-04-01", tz=pytz.utc)
+
+        assert parse_partition_name(TABLE, get_partition_name(TABLE, month_start)) == month_start
+
+    def test_rows_without_open_time_fail_partitioning(self, mocker):
+        """
+        GIVEN a table with rows without an open time
+        WHEN it is partitioned without discarding them
+        THEN partitioning fails before the table is changed
+
+        """
+        cursor = mocker.Mock()
+        cursor.fetchone.return_value = (2,)
+
+        with pytest.raises(ValueError, match="2 rows without an open time"):
+            rebuild_table(cursor, TABLE, True, discard_null_rows=False)
+
+        assert cursor.execute.call_count == 1
+
+
+@pytest.mark.django_db
+class TestManagePartitionsCommand:
+
+    @pytest.mark.skipif(connection.vendor == "postgresql", reason="Checks the fallback of other databases.")
+    def test_command_skips_unsupported_database(self):
+        output = StringIO()
+
+        call_command("manage_partitions", stdout=output)
+
+        assert "not supported" in output.getvalue()
+
+    def test_manage_partitions_job(self, mocker):
+        command = mocker.patch("data.service.cron_jobs.manage_partitions._manage_partitions.call_command")
+
+        manage_partitions()
+
+        command.assert_called_once_with("manage_partitions", months_ahead=3)
+
+    @postgres_only
+    def test_tables_are_partitioned(self):
+        with connection.cursor() as cursor:
+            assert is_partitioned(cursor, "model_exchangedata")
+            assert is_partitioned(cursor, "model_structureddata")
+
+    @postgres_only
+    def test_create_future_partitions_moves_default_rows(self, exchange_data):
+        month_start = pd.Timestamp("2019-09-01", tz=pytz.utc)
+
+        with connection.cursor() as cursor:
+            created_partitions = create_future_partitions(cursor, TABLE, months_ahead=1, now=exchange_data.open_time)
+
+            assert created_partitions == [
+                get_partition_name(TABLE, month_start),
+                get_partition_name(TABLE, month_start + pd.offsets.MonthBegin(1)),
+            ]
+            assert month_start in get_partitions(cursor, TABLE)
+
+            cursor.execute(f'SELECT COUNT(*) FROM "{get_partition_name(TABLE, month_start)}"')
+            assert cursor.fetchone()[0] == 1
+
+            assert create_future_partitions(cursor, TABLE, months_ahead=1, now=exchange_data.open_time) == []
+
+        assert ExchangeData.objects.count() == 1
+
+    @postgres_only
+    def test_detach_old_partitions(self, exchange_data):
+        partition_name = get_partition_name(TABLE, pd.Timestamp("2019-09-01", tz=pytz.utc))
+
+        with connection.cursor() as cursor:
+            create_future_partitions(cursor, TABLE, months_ahead=0, now=exchange_data.open_time)
+
+            assert partition_name in detach_old_partitions(cursor, TABLE, 0, now=NOW, dry_run=True)
+            assert ExchangeData.objects.count() == 1
+
+            assert partition_name in detach_old_partitions(cursor, TABLE, 0, now=NOW)
+            assert partition_name not in get_partitions(cursor, TABLE).values()
+
+        assert ExchangeData.objects.count() == 0
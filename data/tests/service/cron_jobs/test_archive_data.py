@@ -0,0 +1,166 @@
+from shared.utils.tests.fixtures.models import *
+
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import shared.data.archive
+from data.service.cron_jobs.archive_data import archive_exchange_data
+from data.sources.binance.extract import extract_data_db
+from database.model.models import ExchangeData
+from shared.data.archive import archive_data
+from shared.data.queries import get_data
+from shared.data.revisions import add_revision
+
+NOW = datetime(2021, 5, 10, tzinfo=pytz.utc)
+
+
+@pytest.fixture
+def archive_path(tmp_path, mocker):
+    mocker.patch.object(shared.data.archive, "ARCHIVE_PATH", str(tmp_path))
+
+    return str(tmp_path)
+
+
+@pytest.fixture
+def exchange_data_months(create_exchange, create_symbol):
+    open_times = pd.date_range("2021-03-31 22:00", "2021-05-01 02:00", freq="1H", tz=pytz.utc)
+
+    ExchangeData.objects.bulk_create([
+        ExchangeData(
+            exchange_id="binance",
+            symbol_id="BTCUSDT",
+            interval="1h",
+            open_time=open_time,
+            close_time=open_time + pd.Timedelta(minutes=59),
+            close=float(i)
+        )
+        for i, open_time in enumerate(open_times)
+    ])
+
+    return open_times
+
+
+def get_partitions(archive_path):
+    return sorted(os.listdir(os.path.join(archive_path, "model_exchangedata", "binance", "BTCUSDT", "1h")))
+
+
+class TestArchiveData:
+
+    @pytest.mark.parametrize(
+        "prune,expected_db_rows",
+        [
+            pytest.param(False, 2 + 24 * 30 + 3, id="prune=False"),
+            pytest.param(True, 3, id="prune=True"),
+        ],
+    )
+    def test_archive_data(self, prune, expected_db_rows, archive_path, exchange_data_months):
+
+        assert archive_data(ExchangeData, prune=prune, now=NOW) == 2
+
+        assert get_partitions(archive_path) == ["2021-03.parquet", "2021-04.parquet"]
+        assert ExchangeData.objects.count() == expected_db_rows
+
+        data = get_data(ExchangeData, None, "BTCUSDT", "1h")
+
+        assert list(data.index) == list(exchange_data_months)
+        assert list(data["close"]) == list(range(len(exchange_data_months)))
+
+        start_date = datetime(2021, 4, 30, 23, tzinfo=pytz.utc)
+
+        assert list(get_data(ExchangeData, start_date, "BTCUSDT", "1h").index) == list(exchange_data_months[-4:])
+
+    def test_archive_data_merges_late_rows(self, archive_path, exchange_data_months):
+
+        archive_data(ExchangeData, prune=True, now=NOW)
+
+        # Row that is missing from the archive, eg. recovered by a backfill.
+        ExchangeData.objects.create(
+            exchange_id="binance",
+            symbol_id="BTCUSDT",
+            interval="1h",
+            open_time=exchange_data_months[0],
+            close=-1
+        )
+
+        assert archive_data(ExchangeData, prune=True, now=NOW) == 1
+
+        data = get_data(ExchangeData, None, "BTCUSDT", "1h")
+
+        assert len(data) == len(exchange_data_months)
+        assert data["close"].iloc[0] == -1
+
+    def test_archive_data_skips_archived_months(self, archive_path, exchange_data_months, mocker):
+        """
+        GIVEN archived months whose rows are still in the database
+        WHEN the data is archived again, without changes
+        THEN no rows are read, neither from the database nor from the archive
+
+        """
+        archive_data(ExchangeData, now=NOW)
+
+        read_parquet = mocker.spy(shared.data.archive.pd, "read_parquet")
+
+        assert archive_data(ExchangeData, now=NOW) == 0
+        assert read_parquet.call_count == 0
+
+    def test_archive_data_rewrites_revised_months(self, archive_path, exchange_data_months):
+        """
+        GIVEN archived months whose rows are still in the database
+        WHEN a row of one of them is revised in place
+        THEN only that month is archived again, with the revised row
+
+        """
+        archive_data(ExchangeData, now=NOW)
+
+        open_time = exchange_data_months[10]
+
+        ExchangeData.objects.filter(open_time=open_time).update(close=-1)
+        add_revision(ExchangeData, "binance", "BTCUSDT", "1h", open_time, open_time)
+
+        assert archive_data(ExchangeData, now=NOW) == 1
+        assert archive_data(ExchangeData, now=NOW) == 0
+
+        partition = pd.read_parquet(os.path.join(
+            archive_path, "model_exchangedata", "binance", "BTCUSDT", "1h", "2021-04.parquet"
+        ))
+
+        assert partition.loc[partition["open_time"] == open_time, "close"].tolist() == [-1]
+
+    @pytest.mark.parametrize(
+        "prune_env,expected_prune",
+        [
+            pytest.param("true", True, id="true"),
+            pytest.param("1", True, id="1"),
+            pytest.param("false", False, id="false"),
+            pytest.param("0", False, id="0"),
+            pytest.param("", False, id="unset"),
+        ],
+    )
+    def test_archive_exchange_data_prune_flag(self, prune_env, expected_prune, mocker, monkeypatch):
+        """
+        GIVEN DATA_ARCHIVE_PRUNE
+        WHEN the exchange data is archived
+        THEN the archived rows are pruned only if it is set to 1 or true
+
+        """
+        monkeypatch.setenv("DATA_ARCHIVE_PRUNE", prune_env)
+        archive = mocker.patch("data.service.cron_jobs.archive_data._archive_data.archive_data")
+
+        archive_exchange_data()
+
+        assert archive.call_args[1]["prune"] is expected_prune
+
+    def test_archive_data_disabled(self, exchange_data_months):
+
+        assert archive_data(ExchangeData, now=NOW) == 0
+
+    def test_extract_data_db_reads_archive(self, archive_path, exchange_data_months):
+
+        archive_data(ExchangeData, prune=True, now=NOW)
+
+        data = extract_data_db(ExchangeData, ExchangeData, "BTCUSDT", "1h")
+
+        # Starts 6 hours before the last entry, partly from the archive.
+        assert list(data["open_time"]) == list(exchange_data_months[-7:])
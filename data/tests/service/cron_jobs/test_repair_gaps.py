@@ -0,0 +1,58 @@
+from shared.utils.tests.fixtures.models import *
+
+import pandas as pd
+
+from data.service.cron_jobs.repair_gaps import repair_symbol_gaps
+from data.sources.binance.coverage import get_coverage, update_coverage
+from data.sources.binance.transform import transform_data
+from data.tests.setup.fixtures.external_modules import FakeKlineServer
+from database.model.models import ExchangeData, StructuredData
+
+START = pd.Timestamp("2021-04-21 00:00", tz=pytz.utc)
+
+
+def save_candles(server, start, end):
+    klines = server.get_klines(
+        symbol="BTCUSDT",
+        interval="5m",
+        startTime=int(start.timestamp() * 1000),
+        endTime=int(end.timestamp() * 1000) - 1,
+        limit=1000
+    )
+
+    data = pd.DataFrame([
+        dict(
+            open_time=pd.Timestamp(kline[0], unit='ms', tz=pytz.utc),
+            close_time=pd.Timestamp(kline[6], unit='ms', tz=pytz.utc),
+            open=float(kline[1]), high=float(kline[2]), low=float(kline[3]), close=float(kline[4]),
+            volume=1.0, quote_volume=1.0, trades=1, taker_buy_asset_volume=1.0, taker_buy_quote_volume=1.0,
+        )
+        for kline in klines
+    ])
+
+    data = transform_data(data, "5m", "binance", "BTCUSDT")
+
+    ExchangeData.objects.bulk_create([ExchangeData(**row) for row in data.reset_index().to_dict(orient='records')])
+
+    update_coverage(ExchangeData, data)
+
+
+class TestRepairGaps:
+
+    def test_repair_symbol_gaps(self, create_pipeline):
+
+        server = FakeKlineServer()
+
+        save_candles(server, START, START + pd.Timedelta(hours=1))
+        save_candles(server, START + pd.Timedelta(hours=2), START + pd.Timedelta(hours=3))
+
+        assert repair_symbol_gaps("BTCUSDT", klines_fetcher=server.get_klines) == 1
+
+        assert ExchangeData.objects.count() == 36
+        assert get_coverage(ExchangeData, "BTCUSDT", "5m") == [(START, START + pd.Timedelta(hours=3))]
+
+        # The structured data of the pipeline is rebuilt around the gap.
+        assert list(StructuredData.objects.filter(interval="1h").values_list("open_time", flat=True)) \
+            == [START + pd.Timedelta(hours=1)]
+
+        assert repair_symbol_gaps("BTCUSDT", klines_fetcher=server.get_klines) == 0
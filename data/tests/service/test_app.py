@@ -1,6 +1,8 @@
 import json
 import pytest
 
+import data.service.app
+
 from django.db import InterfaceError
 
 with pytest.MonkeyPatch().context() as ctx:
@@ -344,8 +346,6 @@ class TestDataService:
         client,
         mock_start_stop_symbol_trading_success_true,
         mock_binance_handler_start_data_ingestion,
-        mock_binance_threaded_websocket,
-        mock_binance_websocket_start,
         mock_binance_websocket_stop,
         mock_executor_submit,
         binance_handler_instances_spy_start_bot,
@@ -411,8 +411,6 @@ class TestDataService:
         response,
         client,
         mock_binance_handler_stop_data_ingestion,
-        mock_binance_threaded_websocket,
-        mock_binance_websocket_start,
         mock_binance_websocket_stop,
         binance_handler_stop_data_ingestion_spy,
         mock_start_stop_symbol_trading_success_true,
@@ -484,13 +482,26 @@ class TestDataService:
         client_with_open_position,
         spy_start_symbol_trading
     ):
+        assert data.service.app.pipeline_resumption.wait(timeout=5)
+
         assert spy_start_symbol_trading.call_count == 2
 
+    def test_startup_status(self, client_with_open_position):
+        assert data.service.app.pipeline_resumption.wait(timeout=5)
+
+        res = client_with_open_position.get(f'{API_PREFIX}/startup_status')
+
+        assert res.json["done"]
+        assert res.json["total"] == res.json["resumed"] == 2
+        assert res.json["pending"] == 0
+
     def test_startup_task_no_positions(
         self,
         client,
         spy_start_symbol_trading
     ):
+        assert data.service.app.pipeline_resumption.wait(timeout=5)
+
         spy_start_symbol_trading.assert_not_called()
 
     @pytest.mark.parametrize(
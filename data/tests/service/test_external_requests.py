@@ -35,6 +35,26 @@ class TestDataExternalRequests:
             headers={"Authorization": "mock bearer_token"}
         )
 
+    def test_generate_signal_synchronously(
+        self,
+        mocker,
+        mock_settings_env_vars,
+        mock_requests_post,
+        mock_redis_connection_external_requests,
+        requests_post_spy
+    ):
+        """
+        GIVEN signals are requested synchronously
+        WHEN the method generate_signal is called
+        THEN the model app is asked to generate the signal within the request
+
+        """
+        mocker.patch("data.service.external_requests.SYNCHRONOUS_SIGNALS", True)
+
+        generate_signal(pipeline_id=1)
+
+        assert requests_post_spy.call_args[1]["json"] == {"pipeline_id": 1, "synchronous": True}
+
     @pytest.mark.parametrize(
         "params,start_or_stop",
         [
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from shared.utils.pipeline_resumption import PipelineResumption
+
+FakePipeline = namedtuple("FakePipeline", ["id", "candle_size"])
+
+
+class TestPipelineResumption:
+
+    def test_shorter_candle_sizes_are_resumed_first(self):
+        resumed = []
+
+        pipelines = [FakePipeline(1, "1d"), FakePipeline(2, "5m"), FakePipeline(3, "1h"), FakePipeline(4, "1m")]
+
+        resumption = PipelineResumption(lambda pipeline: resumed.append(pipeline.id), max_workers=1).start(pipelines)
+
+        assert resumption.wait(timeout=5)
+        assert resumed == [4, 2, 3, 1]
+
+    def test_resumption_is_bounded(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def resume(pipeline):
+            with lock:
+                running.append(pipeline.id)
+                max_running.append(len(running))
+
+            time.sleep(0.05)
+
+            with lock:
+                running.remove(pipeline.id)
+
+        pipelines = [FakePipeline(i, "1h") for i in range(8)]
+
+        resumption = PipelineResumption(resume, max_workers=3).start(pipelines)
+
+        assert resumption.wait(timeout=5)
+        assert max(max_running) <= 3
+        assert len(resumption.resumed) == 8
+
+    def test_failures_are_reported(self):
+
+        def resume(pipeline):
+            if pipeline.id == 2:
+                raise ValueError("Exchange unavailable.")
+
+        pipelines = [FakePipeline(1, "1h"), FakePipeline(2, "1h")]
+
+        resumption = PipelineResumption(resume).start(pipelines)
+
+        assert resumption.wait(timeout=5)
+
+        status = resumption.to_dict()
+
+        assert status["done"]
+        assert status["total"] == 2
+        assert status["resumed"] == 1
+        assert status["failed"] == {2: "Exchange unavailable."}
+        assert status["pending"] == 0
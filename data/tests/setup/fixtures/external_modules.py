@@ -1,16 +1,22 @@
+import threading
+from types import SimpleNamespace
+
 import flask_jwt_extended
+import pandas as pd
 import pytest
 import redis
-from binance import ThreadedWebsocketManager
 from binance.client import Client
+from binance.exceptions import BinanceAPIException
 from django import db
+from requests import ConnectionError
 
 from data.tests.setup.test_data.binance_api_responses import exchange_info
 from data.tests.setup.test_data.sample_data import binance_api_historical_data
 from shared.exchanges import BinanceHandler
+from shared.exchanges.binance.constants import CANDLE_SIZES_MAPPER
 
 
-def mock_get_historical_klines_generator(symbol, candle_size, start_date):
+def mock_get_historical_klines_generator(symbol, candle_size, start_date, end_date=None):
     for kline in binance_api_historical_data:
         yield kline
 
@@ -24,7 +30,8 @@ def mock_binance_handler_klines(mocker):
     mocker.patch.object(
         BinanceHandler,
         "get_historical_klines_generator",
-        lambda self, symbol, candle_size, start_date: mock_get_historical_klines_generator(symbol, candle_size, start_date)
+        lambda self, symbol, candle_size, start_date, end_date=None:
+            mock_get_historical_klines_generator(symbol, candle_size, start_date, end_date)
     )
 
 
@@ -43,11 +50,6 @@ def mock_binance_client_ping(mocker):
     mocker.patch.object(Client, "ping", lambda self: None)
 
 
-@pytest.fixture
-def mock_binance_threaded_websocket(mocker):
-    mocker.patch.object(ThreadedWebsocketManager, "__init__", lambda self, api_key, api_secret: None)
-
-
 @pytest.fixture
 def mock_binance_client_exchange_info(mocker):
     mocker.patch.object(Client, "futures_exchange_info", lambda self: exchange_info)
@@ -65,3 +67,82 @@ def mock_create_access_token(mocker):
 @pytest.fixture
 def spy_db_connection(mocker):
     return mocker.spy(db.connections, 'all')
+
+
+class FakeKlineServer:
+    """
+    Stand-in for the Binance klines endpoint, which generates deterministic klines
+    for any requested range and records the requests it receives.
+    """
+
+    def __init__(self, failing_start_times=None, rate_limited_start_times=None, retry_after=0.1):
+        self.failing_start_times = set(failing_start_times or [])
+        self.rate_limited_start_times = set(rate_limited_start_times or [])
+        self.retry_after = retry_after
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_klines(self, symbol, interval, startTime, endTime, limit=500):
+
+        with self._lock:
+            self.requests.append(dict(symbol=symbol, interval=interval, startTime=startTime, endTime=endTime))
+
+            # Rejected once, as after exceeding the request weight limit.
+            is_rate_limited = startTime in self.rate_limited_start_times
+            self.rate_limited_start_times.discard(startTime)
+
+        if startTime in self.failing_start_times:
+            raise ConnectionError("Connection refused.")
+
+        if is_rate_limited:
+            raise BinanceAPIException(
+                SimpleNamespace(headers={"Retry-After": str(self.retry_after)}),
+                429,
+                '{"msg": "Too many requests.", "code": -1003}'
+            )
+
+        candle_ms = int(pd.Timedelta(CANDLE_SIZES_MAPPER[interval]).total_seconds() * 1000)
+
+        open_time = -(-startTime // candle_ms) * candle_ms
+
+        klines = []
+        while open_time <= endTime and len(klines) < limit:
+            price = str(float(open_time // candle_ms % 1000 + 1))
+            klines.append([
+                open_time, price, price, price, price, "1.0", open_time + candle_ms - 1, "1.0", 1, "1.0", "1.0", "0"
+            ])
+            open_time += candle_ms
+
+        return klines
+
+
+class FakeSocketManager:
+    """
+    Stand-in for binance's ThreadedWebsocketManager, which records the opened
+    multiplex sockets and allows pushing messages onto them.
+    """
+
+    def __init__(self):
+        self.sockets = {}
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.sockets = {}
+
+    def start_multiplex_socket(self, callback, streams):
+        conn_key = f"streams={'/'.join(streams)}"
+        self.sockets[conn_key] = callback
+        return conn_key
+
+    def stop_socket(self, conn_key):
+        self.sockets.pop(conn_key, None)
+
+    def push(self, stream, event_time):
+        message = {"stream": stream, "data": {"E": event_time}}
+
+        for conn_key, callback in list(self.sockets.items()):
+            if stream in conn_key.split('=')[1].split('/'):
+                callback(message)
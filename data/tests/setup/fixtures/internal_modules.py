@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import Future
 
 import pytest
 from django.db import InterfaceError
@@ -6,6 +7,8 @@ from django.db import InterfaceError
 import data
 from data.service.helpers.exceptions import PipelineStartFail, DataPipelineCouldNotBeStopped
 from data.sources.binance import BinanceDataHandler
+from data.sources.binance.engine import IngestionEngine
+from data.sources.binance.stream_hub import Listener, StreamHub
 from data.tests.setup.test_data.sample_data import mock_websocket_raw_data_5m, mock_websocket_raw_data_1h, STRATEGIES
 from database.model.models import Pipeline
 
@@ -49,21 +52,16 @@ def double_callback(callback, mock_row):
     callback(mock_row[1])
 
 
-def mock_start_multiplex_socket(self, callback, streams):
+def mock_stream_hub_subscribe(self, listener_id, streams, callback):
     double_callback(callback, mock_websocket_raw_data_5m)
     double_callback(callback, mock_websocket_raw_data_1h)
 
-    return f"streams={'/'.join(streams)}"
-
 
 @pytest.fixture
 def mock_binance_handler_websocket(mocker):
-    mocker.patch.object(BinanceDataHandler, "start_multiplex_socket", mock_start_multiplex_socket)
-
-
-@pytest.fixture
-def mock_binance_websocket_start(mocker):
-    mocker.patch.object(BinanceDataHandler, "start", lambda self: None)
+    mocker.patch.object(data.sources.binance.candle_store._candle_store, "_candle_store", None)
+    mocker.patch.object(Listener, "put", lambda self, message: self.callback(message))
+    mocker.patch.object(StreamHub, "subscribe", mock_stream_hub_subscribe)
 
 
 @pytest.fixture
@@ -103,15 +101,25 @@ def binance_handler_instances_spy_start_bot(mocker):
     return mocker.patch('data.service.blueprints.bots_api.binance_instances', new_callable=list)
 
 
-def immediate_execution(initialize_data_collection, pipeline_id, header=''):
-    return initialize_data_collection(pipeline_id, header)
+def completed_future(result):
+    future = Future()
+    future.set_result(result)
+
+    return future
+
+
+def immediate_execution(self, handler_factory, header=''):
+    handler = handler_factory()
+    handler.start_data_ingestion(header=header)
+
+    return completed_future(handler)
 
 
 @pytest.fixture
 def mock_executor_submit(mocker):
     mocker.patch.object(
-        data.service.blueprints.bots_api.executor,
-        "submit",
+        IngestionEngine,
+        "start_data_ingestion",
         immediate_execution
     )
 
@@ -119,9 +127,9 @@ def mock_executor_submit(mocker):
 @pytest.fixture
 def fake_executor_submit(mocker):
     mocker.patch.object(
-        data.service.blueprints.bots_api.executor,
-        "submit",
-        lambda x, y, z=None: None
+        IngestionEngine,
+        "start_data_ingestion",
+        lambda self, handler_factory, header='': completed_future(None)
     )
 
 
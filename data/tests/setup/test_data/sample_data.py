@@ -688,11 +688,11 @@ mock_websocket_raw_data_5m = [
         "stream": "btcusdt@kline_5m",
         "data": {
             "e": "kline",
-            "E": 1618569347477,
+            "E": 1619017547477,
             "s": "BTCUSDT",
             "k": {
-                "t": 1618569300000,
-                "T": 1618569599999,
+                "t": 1619017500000,
+                "T": 1619017799999,
                 "s": "BTCUSDT",
                 "i": "5m",
                 "f": 769635350,
@@ -715,11 +715,11 @@ mock_websocket_raw_data_5m = [
         "stream": "btcusdt@kline_5m",
         "data": {
             "e": "kline",
-            "E": 1618569347477,
+            "E": 1619017547477,
             "s": "BTCUSDT",
             "k": {
-                "t": 1618569600000,
-                "T": 1618569899999,
+                "t": 1619017800000,
+                "T": 1619018099999,
                 "s": "BTCUSDT",
                 "i": "5m",
                 "f": 769635350,
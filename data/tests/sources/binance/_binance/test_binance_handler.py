@@ -17,9 +17,7 @@ def common_fixture(
     mock_binance_client_ping,
     mock_binance_client_exchange_info,
     mock_binance_handler_websocket,
-    mock_binance_websocket_start,
     mock_binance_websocket_stop,
-    mock_binance_threaded_websocket,
     exchange_data,
     mock_redis_connection_binance,
     mock_settings_env_vars,
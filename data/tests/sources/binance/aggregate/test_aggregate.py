@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared.exchanges.binance.constants as const
+from data.sources.binance.aggregate import CandleAggregator
+from data.sources.binance.transform import resample_data
+
+START = pd.Timestamp("2021-04-21 14:00", tz="utc")
+
+
+def base_candles(start, periods):
+    open_times = pd.date_range(start, periods=periods, freq="5T")
+
+    values = np.arange(1, periods + 1, dtype=float)
+
+    return pd.DataFrame({
+        "open_time": open_times,
+        "close_time": open_times + pd.Timedelta(minutes=5) - pd.Timedelta(milliseconds=1),
+        "open": values,
+        "high": values + 1,
+        "low": values - 1,
+        "close": values + 0.5,
+        "volume": values,
+        "quote_volume": values,
+        "trades": values,
+        "taker_buy_asset_volume": values,
+        "taker_buy_quote_volume": values,
+    })
+
+
+class TestCandleAggregator:
+
+    @pytest.mark.parametrize(
+        "candle_size",
+        [
+            pytest.param("10m", id="10m"),
+            pytest.param("15m", id="15m"),
+            pytest.param("30m", id="30m"),
+            pytest.param("1h", id="1h"),
+        ],
+    )
+    def test_matches_resampled_data(self, candle_size):
+        data = base_candles(START, 24)
+
+        aggregator = CandleAggregator('5m')
+
+        # Candles are streamed one at a time.
+        aggregated_data = pd.concat(
+            [aggregator.update(data.iloc[[i]])[candle_size] for i in range(len(data))]
+        ).set_index("open_time")
+
+        expected_data = resample_data(data.set_index("open_time"), candle_size, const.COLUMNS_AGGREGATION)
+
+        pd.testing.assert_frame_equal(aggregated_data, expected_data, check_freq=False, check_index_type=False)
+
+    def test_candle_is_handed_out_on_last_constituent(self):
+        aggregator = CandleAggregator('5m', ['1h'])
+
+        assert len(aggregator.update(base_candles(START, 11))["1h"]) == 0
+
+        aggregated_data = aggregator.update(base_candles(START + pd.Timedelta(minutes=55), 1))["1h"]
+
+        assert len(aggregated_data) == 1
+        assert aggregated_data["open_time"].iloc[0] == START
+        assert aggregated_data["volume"].iloc[0] == 11 * 12 / 2 + 1
+
+    def test_incomplete_candles_are_discarded(self):
+        aggregator = CandleAggregator('5m', ['30m'])
+
+        data = base_candles(START, 12).drop(index=2)
+
+        assert list(aggregator.update(data)["30m"]["open_time"]) == [START + pd.Timedelta(minutes=30)]
+
+    def test_repeated_candles_are_ignored(self):
+        aggregator = CandleAggregator('5m', ['10m'])
+
+        data = base_candles(START, 2)
+
+        aggregator.update(data.iloc[[0]])
+        aggregator.update(data.iloc[[0]])
+
+        assert aggregator.update(data.iloc[[1]])["10m"]["volume"].iloc[0] == 3
@@ -0,0 +1,168 @@
+from shared.utils.tests.fixtures.models import *
+
+import time
+from datetime import datetime, timedelta
+
+from data.sources.binance.backfill import backfill_data, RequestWeightBudget
+from data.sources.binance.backfill._backfill import get_backfill_start_date
+from data.tests.setup.fixtures.external_modules import FakeKlineServer
+from database.model.models import BackfillWindow
+
+START_DATE = datetime(2021, 4, 1, tzinfo=pytz.utc)
+END_DATE = datetime(2021, 4, 2, 1, tzinfo=pytz.utc)
+
+WINDOW_MS = 100 * 5 * 60 * 1000
+
+
+class TestBinanceBackfill:
+
+    @pytest.mark.parametrize(
+        "max_workers",
+        [
+            pytest.param(1, id="max_workers=1"),
+            pytest.param(4, id="max_workers=4"),
+        ],
+    )
+    def test_backfill_data(self, max_workers, create_exchange, create_symbol):
+
+        server = FakeKlineServer()
+
+        failed_windows = backfill_data(
+            ExchangeData,
+            server.get_klines,
+            "BTCUSDT",
+            "5m",
+            start_date=START_DATE,
+            end_date=END_DATE,
+            window_size=100,
+            max_workers=max_workers,
+            budget=RequestWeightBudget(1000)
+        )
+
+        assert failed_windows == 0
+        assert ExchangeData.objects.count() == 25 * 12
+
+        open_times = list(ExchangeData.objects.order_by('open_time').values_list('open_time', flat=True))
+
+        assert open_times[0] == START_DATE
+        assert open_times[-1] == END_DATE - timedelta(minutes=5)
+
+        assert BackfillWindow.objects.filter(complete=True).count() == 4
+
+    def test_backfill_data_resume(self, create_exchange, create_symbol):
+
+        start_date = datetime.fromtimestamp(WINDOW_MS * 3000 / 1000, tz=pytz.utc)
+        end_date = start_date + timedelta(minutes=5 * 100 * 4 + 30)
+
+        failing_start_time = WINDOW_MS * 3001
+
+        server = FakeKlineServer(failing_start_times=[failing_start_time])
+
+        failed_windows = backfill_data(
+            ExchangeData,
+            server.get_klines,
+            "BTCUSDT",
+            "5m",
+            start_date=start_date,
+            end_date=end_date,
+            window_size=100,
+            max_workers=2,
+        )
+
+        assert failed_windows == 1
+        assert ExchangeData.objects.count() == 100 * 3 + 6
+        assert BackfillWindow.objects.count() == 5
+        assert BackfillWindow.objects.filter(complete=True).count() == 4
+
+        server = FakeKlineServer()
+
+        failed_windows = backfill_data(
+            ExchangeData,
+            server.get_klines,
+            "BTCUSDT",
+            "5m",
+            end_date=end_date,
+            window_size=100,
+            max_workers=2,
+        )
+
+        assert failed_windows == 0
+        assert ExchangeData.objects.count() == 100 * 4 + 6
+        assert BackfillWindow.objects.filter(complete=True).count() == 5
+
+        # Only the failed window is requested again
+        assert [request["startTime"] for request in server.requests] == [failing_start_time]
+
+    def test_backfill_data_resumes_from_first_incomplete_window(self, create_exchange, create_symbol):
+        """
+        GIVEN a backfill whose first windows completed, and one of whose later windows failed
+        WHEN the backfill is resumed
+        THEN it starts from the failed window, rather than from the first window
+
+        """
+        failing_start_time = WINDOW_MS * 3002
+
+        start_date = datetime.fromtimestamp(WINDOW_MS * 3000 / 1000, tz=pytz.utc)
+        end_date = start_date + timedelta(minutes=5 * 100 * 4)
+
+        backfill_data(ExchangeData, FakeKlineServer(failing_start_times=[failing_start_time]).get_klines,
+                      "BTCUSDT", "5m", start_date=start_date, end_date=end_date, window_size=100)
+
+        start_date = get_backfill_start_date(ExchangeData, "BTCUSDT", "5m")
+
+        assert int(start_date.timestamp() * 1000) == failing_start_time
+
+    def test_backfill_data_backs_off_rate_limits(self, create_exchange, create_symbol):
+        """
+        GIVEN a Binance API which rejects a request for exceeding its request weight limit
+        WHEN the data is backfilled
+        THEN all requests are held back for the time given by Binance, and the rejected window is fetched again
+
+        """
+        start_time = int(START_DATE.timestamp() * 1000)
+
+        server = FakeKlineServer(rate_limited_start_times=[start_time], retry_after=0.2)
+
+        start = time.monotonic()
+
+        failed_windows = backfill_data(
+            ExchangeData,
+            server.get_klines,
+            "BTCUSDT",
+            "5m",
+            start_date=START_DATE,
+            end_date=START_DATE + timedelta(minutes=5 * 10),
+            window_size=100
+        )
+
+        assert failed_windows == 0
+        assert ExchangeData.objects.count() == 10
+        assert [request["startTime"] for request in server.requests] == [start_time, start_time]
+        assert time.monotonic() - start >= 0.2
+
+    def test_backfill_data_extends_last_window(self, create_exchange, create_symbol):
+
+        end_date = START_DATE + timedelta(minutes=5 * 10)
+
+        backfill_data(ExchangeData, FakeKlineServer().get_klines, "BTCUSDT", "5m",
+                      start_date=START_DATE, end_date=end_date, window_size=100)
+
+        server = FakeKlineServer()
+
+        backfill_data(ExchangeData, server.get_klines, "BTCUSDT", "5m",
+                      end_date=end_date + timedelta(minutes=5 * 5), window_size=100)
+
+        assert ExchangeData.objects.count() == 15
+        assert BackfillWindow.objects.filter(complete=True).count() == 1
+        assert [request["startTime"] for request in server.requests] == [int(START_DATE.timestamp() * 1000)]
+
+    def test_request_weight_budget(self):
+
+        budget = RequestWeightBudget(10, period=0.2)
+
+        start = time.monotonic()
+
+        for _ in range(4):
+            budget.acquire(5)
+
+        assert time.monotonic() - start >= 0.2
@@ -0,0 +1,82 @@
+import pytest
+
+from data.sources.binance.candle_buffer import CandleBuffer
+
+CANDLE_MS = 5 * 60 * 1000
+
+START = 1618569300000
+
+
+def kline(candle, close, closed=False):
+    open_time = START + candle * CANDLE_MS
+
+    return {
+        "t": open_time,
+        "T": open_time + CANDLE_MS - 1,
+        "o": "1.0",
+        "c": str(close),
+        "h": "2.0",
+        "l": "0.5",
+        "v": "10.0",
+        "n": 5,
+        "x": closed,
+        "q": "10.0",
+        "V": "5.0",
+        "Q": "5.0",
+    }
+
+
+class TestCandleBuffer:
+
+    def test_candle_is_handed_out_on_rollover(self):
+        buffer = CandleBuffer('5m')
+
+        assert len(buffer.update(kline(0, 1))) == 0
+        assert len(buffer.update(kline(0, 2))) == 0
+
+        closed_candles = buffer.update(kline(1, 3))
+
+        assert len(closed_candles) == 1
+        assert closed_candles["close"].iloc[0] == 2
+        assert closed_candles["open_time"].iloc[0].value // 10 ** 6 == START
+
+    def test_candle_is_handed_out_once_when_final(self):
+        buffer = CandleBuffer('5m')
+
+        buffer.update(kline(0, 1))
+
+        assert len(buffer.update(kline(0, 2, closed=True))) == 1
+        assert len(buffer.update(kline(0, 2, closed=True))) == 0
+        assert len(buffer.update(kline(1, 3))) == 0
+
+    def test_late_messages_are_ignored(self):
+        buffer = CandleBuffer('5m')
+
+        buffer.update(kline(0, 1))
+        buffer.update(kline(1, 2))
+
+        assert len(buffer.update(kline(0, 5))) == 0
+        assert list(buffer.to_frame()["close"]) == [1, 2]
+
+    @pytest.mark.parametrize(
+        "capacity",
+        [
+            pytest.param(1, id="capacity=1"),
+            pytest.param(3, id="capacity=3"),
+        ],
+    )
+    def test_buffer_is_bounded(self, capacity):
+        buffer = CandleBuffer('5m', capacity=capacity)
+
+        for candle in range(10):
+            buffer.update(kline(candle, candle))
+
+        assert len(buffer) == capacity
+        assert list(buffer.to_frame()["close"]) == list(range(10 - capacity, 10))
+
+    def test_closed_candle_is_not_overwritten(self):
+        buffer = CandleBuffer('5m', capacity=1)
+
+        buffer.update(kline(0, 1))
+
+        assert list(buffer.update(kline(1, 2, closed=True))["close"]) == [1, 2]
@@ -0,0 +1,126 @@
+import threading
+
+from shared.utils.tests.fixtures.models import *
+
+from data.sources.binance.candle_store import CandleStore
+from data.sources.binance.stream_hub import Listener
+from database.model.models import ExchangeData, StructuredData
+
+START = 1619013600000
+
+CANDLE_MS = 5 * 60 * 1000
+
+
+class FakeStreamHub:
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def subscribe(self, listener_id, streams, callback):
+        self.callbacks[listener_id] = callback
+
+    def unsubscribe(self, listener_id):
+        self.callbacks.pop(listener_id)
+
+    def push(self, candle):
+        open_time = START + candle * CANDLE_MS
+
+        for callback in list(self.callbacks.values()):
+            callback({
+                "stream": "btcusdt@kline_5m",
+                "data": {
+                    "k": {
+                        "t": open_time,
+                        "T": open_time + CANDLE_MS - 1,
+                        "o": "1.0", "c": "1.0", "h": "1.0", "l": "1.0", "v": "1.0", "n": 1,
+                        "q": "1.0", "V": "1.0", "Q": "1.0", "x": False,
+                    }
+                }
+            })
+
+
+@pytest.fixture
+def stream_hub(mocker):
+    mocker.patch.object(Listener, "put", lambda self, message: self.callback(message))
+
+    return FakeStreamHub()
+
+
+class TestCandleStore:
+
+    def test_market_is_saved_once(self, stream_hub, create_exchange, create_symbol):
+
+        store = CandleStore(stream_hub=stream_hub)
+
+        notifications = {1: [], 2: [], 3: []}
+
+        store.subscribe(1, "BTCUSDT", "5m", notifications[1].append)
+        store.subscribe(2, "BTCUSDT", "5m", notifications[2].append)
+        store.subscribe(3, "BTCUSDT", "10m", notifications[3].append)
+
+        assert len(stream_hub.callbacks) == 1
+
+        for candle in range(4):
+            stream_hub.push(candle)
+
+        assert ExchangeData.objects.count() == 3
+        assert StructuredData.objects.filter(interval="5m").count() == 3
+        assert StructuredData.objects.filter(interval="10m").count() == 1
+
+        assert notifications[1] == notifications[2] == [True, True, True]
+        assert notifications[3] == [True]
+
+    def test_market_is_released_with_last_subscriber(self, stream_hub, create_exchange, create_symbol):
+
+        store = CandleStore(stream_hub=stream_hub)
+
+        store.subscribe(1, "BTCUSDT", "5m", lambda new_entry: None)
+        store.subscribe(2, "BTCUSDT", "1h", lambda new_entry: None)
+
+        store.unsubscribe(1)
+
+        assert len(stream_hub.callbacks) == 1
+
+        store.unsubscribe(2)
+
+        assert len(stream_hub.callbacks) == 0
+
+    def test_seeding_does_not_block_other_markets(self, stream_hub, mocker, create_exchange, create_symbol):
+        """
+        GIVEN a market whose seeding query is slow
+        WHEN another market is subscribed to and streamed meanwhile
+        THEN its candles are saved and notified without waiting for the seeding
+
+        """
+        store = CandleStore(stream_hub=stream_hub)
+
+        seeding, release = threading.Event(), threading.Event()
+        seed_market = store._seed_market
+
+        def slow_seed_market(market):
+            if market.symbol == "ETHUSDT":
+                seeding.set()
+                release.wait(5)
+            else:
+                seed_market(market)
+
+        mocker.patch.object(store, "_seed_market", slow_seed_market)
+
+        thread = threading.Thread(target=store.subscribe, args=(1, "ETHUSDT", "5m", lambda new_entry: None))
+        thread.start()
+        seeding.wait(5)
+
+        notifications = []
+
+        store.subscribe(2, "BTCUSDT", "5m", notifications.append)
+
+        for candle in range(2):
+            stream_hub.push(candle)
+
+        assert notifications == [True]
+        assert list(stream_hub.callbacks) == [("binance", "BTCUSDT", "5m")]
+
+        release.set()
+        thread.join(5)
+
+        assert len(stream_hub.callbacks) == 2
@@ -0,0 +1,119 @@
+from shared.utils.tests.fixtures.models import *
+
+from datetime import datetime
+
+import pandas as pd
+
+from data.sources.binance.coverage import get_coverage, get_gaps, update_coverage
+from data.sources.binance.extract import extract_data
+from database.model.models import ExchangeData
+
+START = pd.Timestamp("2021-04-21 14:00", tz=pytz.utc)
+
+NOW = datetime(2021, 4, 22, tzinfo=pytz.utc)
+
+
+def candles(hours):
+    open_times = [START + pd.Timedelta(hours=hour) for hour in hours]
+
+    return pd.DataFrame({
+        "open_time": open_times,
+        "close_time": [open_time + pd.Timedelta(minutes=59) for open_time in open_times],
+        "exchange_id": "binance",
+        "symbol_id": "BTCUSDT",
+        "interval": "1h",
+        "close": 1.0,
+    })
+
+
+def hours(*ranges):
+    return [(START + pd.Timedelta(hours=start), START + pd.Timedelta(hours=end)) for start, end in ranges]
+
+
+class TestCoverage:
+
+    def test_update_coverage(self, create_exchange, create_symbol):
+
+        update_coverage(ExchangeData, candles([0, 1, 2, 5, 6]), now=NOW)
+
+        assert get_coverage(ExchangeData, "BTCUSDT", "1h") == hours((0, 3), (5, 7))
+
+        update_coverage(ExchangeData, candles([3, 4]), now=NOW)
+
+        assert get_coverage(ExchangeData, "BTCUSDT", "1h") == hours((0, 7))
+
+    def test_open_candles_are_not_covered(self, create_exchange, create_symbol):
+
+        update_coverage(ExchangeData, candles([0, 1, 2]), now=START + pd.Timedelta(hours=2, minutes=30))
+
+        assert get_coverage(ExchangeData, "BTCUSDT", "1h") == hours((0, 2))
+
+    def test_coverage_is_built_from_saved_rows(self, create_exchange, create_symbol):
+
+        ExchangeData.objects.bulk_create([ExchangeData(**row) for row in candles([0, 1, 3]).to_dict(orient='records')])
+
+        assert get_coverage(ExchangeData, "BTCUSDT", "1h") == hours((0, 2), (3, 4))
+
+    def test_get_gaps(self, create_exchange, create_symbol):
+
+        update_coverage(ExchangeData, candles([0, 1, 4, 8]), now=NOW)
+
+        assert get_gaps(ExchangeData, "BTCUSDT", "1h", end_date=START + pd.Timedelta(hours=12)) \
+            == hours((2, 4), (5, 8), (9, 12))
+
+        assert get_gaps(ExchangeData, "BTCUSDT", "1h", start_date=START + pd.Timedelta(hours=6), end_date=NOW)[0] \
+            == hours((6, 8))[0]
+
+    def test_extract_data_fetches_gaps(self, create_exchange, create_symbol):
+
+        update_coverage(ExchangeData, candles([0, 1, 4]), now=NOW)
+
+        requested_ranges = []
+
+        def klines_generator(symbol, candle_size, start_date, end_date=None):
+            requested_ranges.append((start_date, end_date))
+            return iter([])
+
+        extract_data(ExchangeData, klines_generator, "BTCUSDT", "1h")
+
+        gap_start, gap_end = hours((2, 4))[0]
+
+        assert requested_ranges == [
+            (int(gap_start.timestamp() * 1000), int(gap_end.timestamp() * 1000) - 1),
+            (int((START + pd.Timedelta(hours=5)).timestamp() * 1000), None),
+        ]
+
+    def test_extract_data_covers_empty_gaps(self, create_exchange, create_symbol):
+        """
+        GIVEN gaps for which the exchange has no klines, entirely or in part
+        WHEN their data is extracted
+        THEN the parts without klines are covered, and are not requested again
+
+        """
+        update_coverage(ExchangeData, candles([0, 1, 4, 8]), now=NOW)
+
+        requested_ranges = []
+
+        def klines_generator(symbol, candle_size, start_date, end_date=None):
+            requested_ranges.append((start_date, end_date))
+
+            # Only the candle of hour 6 is returned, within the gap of hours 5 to 8.
+            if start_date == int((START + pd.Timedelta(hours=5)).timestamp() * 1000):
+                open_time = int((START + pd.Timedelta(hours=6)).timestamp() * 1000)
+                return iter([[open_time, 1, 1, 1, 1, 1, open_time + 3599999, 1, 1, 1, 1, 0]])
+
+            return iter([])
+
+        extract_data(ExchangeData, klines_generator, "BTCUSDT", "1h")
+
+        assert get_coverage(ExchangeData, "BTCUSDT", "1h") == hours((0, 6), (7, 9))
+
+        requested_ranges.clear()
+
+        extract_data(ExchangeData, klines_generator, "BTCUSDT", "1h")
+
+        assert requested_ranges[0] == (
+            int((START + pd.Timedelta(hours=6)).timestamp() * 1000),
+            int((START + pd.Timedelta(hours=7)).timestamp() * 1000) - 1,
+        )
+        assert requested_ranges[1][1] is None
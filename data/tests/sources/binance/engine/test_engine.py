@@ -0,0 +1,156 @@
+from shared.utils.tests.fixtures.models import *
+
+import asyncio
+import threading
+import time
+
+import data.sources.binance.engine._engine
+import data.sources.binance.stream_hub._stream_hub
+from data.sources._signal_triggerer import RESPONSES
+from data.sources.binance.engine import IngestionEngine
+from data.sources.binance.stream_hub import AsyncSocketManager
+
+
+class FakeHandler:
+
+    def __init__(self, pipeline_id, load_time=0):
+        self.pipeline_id = pipeline_id
+        self.load_time = load_time
+
+        self.engine = None
+        self.streaming = False
+        self.stopped = False
+
+    def load_history(self, header=''):
+        time.sleep(self.load_time)
+
+    def start_streams(self, header=''):
+        self.streaming = True
+
+    def stop_data_ingestion(self, header=''):
+        self.stopped = True
+
+
+class FakeMultiplexSocket:
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def recv(self):
+        if self.messages:
+            return self.messages.pop(0)
+
+        await asyncio.sleep(3600)
+
+
+class FakeBinanceSocketManager:
+
+    def __init__(self, client):
+        pass
+
+    def multiplex_socket(self, streams):
+        return FakeMultiplexSocket([{"stream": stream, "data": {"E": 1}} for stream in streams])
+
+
+@pytest.fixture
+def engine(mocker):
+    engine = IngestionEngine(max_startups=2, max_signals=2, blocking_workers=8, job_listener=mocker.Mock())
+
+    yield engine
+
+    engine.stop()
+
+
+@pytest.fixture
+def mock_trigger_signal_async(mocker):
+
+    def mock(response):
+        async def trigger_signal_async(pipeline_id, session, header='', retry=0, batcher=None, listener=None):
+            return response
+
+        return mocker.patch.object(data.sources.binance.engine._engine, "trigger_signal_async", trigger_signal_async)
+
+    return mock
+
+
+class TestIngestionEngine:
+
+    def test_start_data_ingestion(self, engine, mock_trigger_signal_async):
+        mock_trigger_signal_async(RESPONSES["SUCCESS"])
+
+        handler = engine.start_data_ingestion(lambda: FakeHandler(1)).result(timeout=5)
+
+        assert handler.engine is engine
+        assert handler.streaming
+        assert not handler.stopped
+
+    def test_failed_signal_stops_pipeline(self, engine, mock_trigger_signal_async):
+        mock_trigger_signal_async(RESPONSES["JOB_FAILED"])
+
+        handler = engine.start_data_ingestion(lambda: FakeHandler(1)).result(timeout=5)
+
+        assert not handler.streaming
+        assert handler.stopped
+
+    def test_startups_are_bounded(self, engine, mock_trigger_signal_async, mocker):
+        mock_trigger_signal_async(RESPONSES["SUCCESS"])
+
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def load_history(self, header=''):
+            with lock:
+                running.append(self.pipeline_id)
+                max_running.append(len(running))
+
+            time.sleep(0.05)
+
+            with lock:
+                running.remove(self.pipeline_id)
+
+        mocker.patch.object(FakeHandler, "load_history", load_history)
+
+        futures = [
+            engine.start_data_ingestion(lambda pipeline_id=pipeline_id: FakeHandler(pipeline_id))
+            for pipeline_id in range(6)
+        ]
+
+        handlers = [future.result(timeout=5) for future in futures]
+
+        assert all(handler.streaming for handler in handlers)
+        assert max(max_running) <= engine.max_startups
+
+
+class TestAsyncSocketManager:
+
+    def test_multiplex_socket(self, engine, mocker):
+        mocker.patch.object(data.sources.binance.stream_hub._stream_hub, "BinanceSocketManager", FakeBinanceSocketManager)
+        mocker.patch.object(IngestionEngine, "get_client", mocker.AsyncMock())
+
+        received = []
+        socket_received = threading.Event()
+
+        def callback(message):
+            received.append(message)
+            socket_received.set()
+
+        socket_manager = AsyncSocketManager(engine)
+        socket_manager.start()
+
+        conn_key = socket_manager.start_multiplex_socket(callback, ["btcusdt@kline_5m"])
+
+        assert socket_received.wait(timeout=5)
+        assert received == [{"stream": "btcusdt@kline_5m", "data": {"E": 1}}]
+
+        task = socket_manager._tasks[conn_key]
+
+        socket_manager.stop_socket(conn_key)
+
+        assert task.cancelled()
@@ -2,7 +2,8 @@ import os
 
 from shared.utils.tests.fixtures.models import *
 from shared.utils.tests.test_setup import get_fixtures
-from data.sources.binance.extract import extract_data
+import shared.exchanges.binance.constants as const
+from data.sources.binance.extract import decode_klines, extract_data
 from data.tests.setup.fixtures.external_modules import mock_get_historical_klines_generator
 
 current_path = os.path.dirname(os.path.realpath(__file__))
@@ -33,3 +34,33 @@ class TestBinanceExtract:
         )
 
         assert extract_data(**params_dict).equals(fixture["out"]["expected_value"])
+
+    @pytest.mark.parametrize(
+        "batch_size",
+        [
+            pytest.param(1, id="batch_size=1"),
+            pytest.param(4, id="batch_size=4"),
+        ],
+    )
+    def test_extract_data_batches(self, batch_size, exchange_data, mocker):
+
+        mocker.patch("data.sources.binance.extract._extract.DECODING_BATCH_SIZE", batch_size)
+
+        fixture = fixtures["btcusdt_5m"]
+
+        params_dict = dict(
+            model_class=fixture["in"]["model_class"],
+            klines_generator=mock_get_historical_klines_generator,
+            symbol=fixture["in"]["symbol"],
+            candle_size=fixture["in"]["candle_size"]
+        )
+
+        assert extract_data(**params_dict).equals(fixture["out"]["expected_value"])
+
+    def test_decode_klines_empty(self):
+
+        data = decode_klines([])
+
+        assert len(data) == 0
+        assert list(data.columns) == list(const.BINANCE_KLINE_COLUMNS)
+        assert str(data["open_time"].dtype) == "datetime64[ns, UTC]"
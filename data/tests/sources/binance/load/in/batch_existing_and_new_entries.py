@@ -0,0 +1,13 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from data.tests.setup.test_data.sample_data import exchange_data_1
+from database.model.models import ExchangeData
+
+model_class = ExchangeData
+data = pd.DataFrame([
+    {**exchange_data_1, "open_time": exchange_data_1["open_time"] + timedelta(hours=i), "close": i}
+    for i in range(5)
+])
+count_updates = False
@@ -0,0 +1 @@
+expected_value = 1
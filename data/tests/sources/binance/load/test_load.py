@@ -1,6 +1,7 @@
 import os
 
 from data.sources.binance.load import load_data
+from database.model.models import CandleRevision
 from shared.utils.tests.fixtures.models import *
 from shared.utils.tests.test_setup import get_fixtures
 
@@ -28,3 +29,51 @@ class TestBinanceLoad:
         )
 
         assert load_data(**params_dict) == fixture["out"]["expected_value"]
+
+    @pytest.mark.parametrize(
+        "batch_size",
+        [
+            pytest.param(1, id="batch_size=1"),
+            pytest.param(2, id="batch_size=2"),
+            pytest.param(1000, id="batch_size=1000"),
+        ],
+    )
+    def test_load_data_batches(self, batch_size, exchange_data, create_pipeline):
+
+        fixture = fixtures["batch_existing_and_new_entries"]
+
+        new_entries = load_data(
+            model_class=fixture["in"]["model_class"],
+            data=fixture["in"]["data"],
+            count_updates=fixture["in"]["count_updates"],
+            pipeline_id=1,
+            batch_size=batch_size
+        )
+
+        assert new_entries == fixture["out"]["expected_value"]
+
+        rows = ExchangeData.objects.order_by('open_time')
+
+        assert rows.count() == len(fixture["in"]["data"])
+        assert list(rows.values_list('close', flat=True)) == list(fixture["in"]["data"]["close"])
+
+    def test_load_data_records_revisions(self, exchange_data, create_pipeline):
+        """
+        GIVEN saved rows of a market
+        WHEN rows are saved after them, and then an older row is saved again
+        THEN only the latter is recorded as a revision of the market, from the older row
+
+        """
+        data = fixtures["batch_existing_and_new_entries"]["in"]["data"]
+
+        load_data(ExchangeData, data.iloc[1:], pipeline_id=1)
+
+        assert CandleRevision.objects.count() == 0
+
+        load_data(ExchangeData, data.iloc[:2], pipeline_id=1)
+
+        revision = CandleRevision.objects.get()
+
+        assert (revision.table, revision.symbol_id, revision.interval) == ("model_exchangedata", "BTCUSDT", "1h")
+        assert revision.start_time == data["open_time"].iloc[0]
+        assert revision.end_time == data["open_time"].iloc[1]
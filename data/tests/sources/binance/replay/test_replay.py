@@ -0,0 +1,129 @@
+from shared.utils.tests.fixtures.models import *
+
+import json
+
+import pandas as pd
+
+from data.sources.binance.candle_buffer import CandleBuffer
+from data.sources.binance.replay import (
+    ReplaySocketManager,
+    candles_to_messages,
+    read_recorded_messages,
+    run_replay,
+)
+from data.sources.binance.stream_hub import Listener
+from data.tests.setup.test_data.sample_data import mock_websocket_raw_data_5m
+from database.model.models import ExchangeData, StructuredData
+
+START = pd.Timestamp(1619013600000, unit='ms', tz=pytz.utc)
+
+
+def get_candles(periods):
+    open_times = pd.date_range(START, periods=periods, freq='5min', name='open_time')
+
+    return pd.DataFrame(
+        {
+            "close_time": open_times + pd.Timedelta(minutes=5) - pd.Timedelta(milliseconds=1),
+            "open": 1.0,
+            "high": 2.0,
+            "low": 0.5,
+            "close": 1.5,
+            "volume": 10.0,
+            "quote_volume": 15.0,
+            "trades": 3,
+            "taker_buy_asset_volume": 5.0,
+            "taker_buy_quote_volume": 7.5,
+        },
+        index=open_times,
+    )
+
+
+@pytest.fixture
+def synchronous_listeners(mocker):
+    mocker.patch.object(Listener, "put", lambda self, message: self.callback(message))
+
+
+class TestReplaySources:
+
+    def test_candles_to_messages(self):
+        candles = get_candles(3)
+
+        messages = candles_to_messages(candles, "BTCUSDT", "5m", updates_per_candle=2)
+
+        assert len(messages) == 6
+        assert {message["stream"] for message in messages} == {"btcusdt@kline_5m"}
+        assert [message["data"]["k"]["x"] for message in messages] == [False, True] * 3
+
+        event_times = [message["data"]["E"] for message in messages]
+        assert event_times == sorted(event_times)
+
+        buffer = CandleBuffer("5m")
+
+        closed_candles = pd.concat([buffer.update(message["data"]["k"]) for message in messages])
+
+        assert list(pd.to_datetime(closed_candles["open_time"], utc=True)) == list(candles.index)
+        assert (closed_candles["close"] == 1.5).all()
+        assert (closed_candles["trades"] == 3).all()
+
+    def test_read_recorded_messages(self, tmp_path):
+        path = tmp_path / "messages.jsonl"
+
+        path.write_text(
+            json.dumps(mock_websocket_raw_data_5m[0]) + "\n\n" + json.dumps(mock_websocket_raw_data_5m[1]["data"]) + "\n"
+        )
+
+        messages = read_recorded_messages(str(path))
+
+        assert messages == mock_websocket_raw_data_5m
+
+
+class TestReplaySocketManager:
+
+    def test_messages_are_replayed_onto_open_sockets(self):
+        messages = candles_to_messages(get_candles(2), "BTCUSDT", "5m") \
+            + candles_to_messages(get_candles(2), "ETHUSDT", "5m")
+
+        socket_manager = ReplaySocketManager(messages)
+
+        received = []
+        socket_manager.start_multiplex_socket(received.append, ["btcusdt@kline_5m"])
+
+        stats = socket_manager.replay()
+
+        assert stats.messages == 4
+        assert stats.closed_candles == 4
+        assert [message["stream"] for message in received] == ["btcusdt@kline_5m"] * 2
+
+    def test_replay_is_paced(self):
+        messages = candles_to_messages(get_candles(2), "BTCUSDT", "5m")
+
+        # The two candles close 5 minutes apart, which takes 0.2 seconds at 1500x.
+        stats = ReplaySocketManager(messages, speed=1500).replay()
+
+        assert stats.elapsed >= 0.2
+
+
+class TestRunReplay:
+
+    def test_run_replay(self, synchronous_listeners, create_pipeline):
+        socket_manager = ReplaySocketManager(candles_to_messages(get_candles(24), "BTCUSDT", "5m"))
+
+        stats = run_replay(socket_manager, [(1, "BTCUSDT", "1h")])
+
+        assert stats.messages == 24
+        assert stats.closed_candles == 24
+        assert stats.rows_written == {"ExchangeData": 24, "StructuredData": 2}
+        assert len(stats.signal_latencies) == 2
+        assert stats.to_dict()["candles_per_second"] > 0
+
+        assert ExchangeData.objects.filter(interval="5m").count() == 24
+        assert StructuredData.objects.filter(interval="1h").count() == 2
+
+    def test_run_replay_triggers_signals(self, synchronous_listeners, create_pipeline, mocker):
+        trigger_signal = mocker.patch("data.sources.binance.replay._replay.trigger_signal")
+
+        socket_manager = ReplaySocketManager(candles_to_messages(get_candles(24), "BTCUSDT", "5m"))
+
+        run_replay(socket_manager, [(1, "BTCUSDT", "1h")], trigger_signals=True)
+
+        assert trigger_signal.call_count == 2
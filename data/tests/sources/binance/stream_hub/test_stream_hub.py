@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from data.sources.binance.stream_hub import StreamHub
+from data.tests.setup.fixtures.external_modules import FakeSocketManager
+
+
+@pytest.fixture
+def socket_manager():
+    return FakeSocketManager()
+
+
+@pytest.fixture
+def stream_hub(socket_manager):
+    hub = StreamHub(
+        max_streams_per_connection=2,
+        max_connections=2,
+        max_workers=4,
+        grace_period=60,
+        socket_manager_factory=lambda: socket_manager
+    )
+
+    yield hub
+
+    hub.stop()
+
+
+def collect(hub, received):
+    # Listeners are drained on the worker pool, so wait for all of them to settle.
+    for listener in list(hub._listeners.values()):
+        while listener._running or listener._messages:
+            threading.Event().wait(0.01)
+
+    return received
+
+
+class TestStreamHub:
+
+    def test_shared_stream_is_opened_once(self, stream_hub, socket_manager):
+
+        received = {1: [], 2: []}
+
+        stream_hub.subscribe(1, ["btcusdt@kline_5m", "btcusdt@kline_1h"], received[1].append)
+        stream_hub.subscribe(2, ["btcusdt@kline_5m"], received[2].append)
+
+        assert stream_hub.connections == [["btcusdt@kline_5m", "btcusdt@kline_1h"]]
+        assert len(socket_manager.sockets) == 1
+
+        socket_manager.push("btcusdt@kline_5m", 1)
+        socket_manager.push("btcusdt@kline_1h", 2)
+
+        collect(stream_hub, received)
+
+        assert [message["data"]["E"] for message in received[1]] == [1, 2]
+        assert [message["data"]["E"] for message in received[2]] == [1]
+
+    def test_connections_are_swapped_on_change(self, stream_hub, socket_manager):
+
+        received = []
+
+        stream_hub.subscribe(1, ["btcusdt@kline_5m"], received.append)
+        stream_hub.subscribe(2, ["ethusdt@kline_5m"], lambda message: None)
+        stream_hub.subscribe(3, ["bnbusdt@kline_5m"], lambda message: None)
+
+        # Connections are filled before new ones are opened.
+        assert stream_hub.connections == [
+            ["btcusdt@kline_5m", "ethusdt@kline_5m"],
+            ["bnbusdt@kline_5m"],
+        ]
+
+        # The replaced connection stays open during the grace period, without duplicating messages.
+        assert "streams=btcusdt@kline_5m" in socket_manager.sockets
+
+        socket_manager.push("btcusdt@kline_5m", 1)
+        socket_manager.push("btcusdt@kline_5m", 2)
+
+        assert [message["data"]["E"] for message in collect(stream_hub, received)] == [1, 2]
+
+        stream_hub.unsubscribe(2)
+
+        # The previous connection with the same streams is reused.
+        assert stream_hub.connections == [["btcusdt@kline_5m"], ["bnbusdt@kline_5m"]]
+        assert "streams=btcusdt@kline_5m" in socket_manager.sockets
+
+        stream_hub.unsubscribe(3)
+
+        assert stream_hub.streams == ["btcusdt@kline_5m"]
+        assert "streams=bnbusdt@kline_5m" not in socket_manager.sockets
+
+    def test_connections_are_capped(self, stream_hub, socket_manager):
+        """
+        GIVEN a stream hub whose connections are full
+        WHEN a listener subscribes to new streams
+        THEN no connection is opened beyond max_connections, and the streams are not subscribed to
+
+        """
+        streams = ["btcusdt@kline_5m", "ethusdt@kline_5m", "bnbusdt@kline_5m", "xrpusdt@kline_5m"]
+
+        stream_hub.subscribe(1, streams, lambda message: None)
+        stream_hub.subscribe(2, ["adausdt@kline_5m", "btcusdt@kline_5m"], lambda message: None)
+
+        assert stream_hub.connections == [streams[:2], streams[2:]]
+        assert stream_hub.streams == streams
+
+        stream_hub.unsubscribe(1)
+        stream_hub.subscribe(3, ["adausdt@kline_5m"], lambda message: None)
+
+        assert stream_hub.connections == [["btcusdt@kline_5m", "adausdt@kline_5m"]]
+
+    def test_failing_listener_does_not_affect_others(self, stream_hub, socket_manager):
+
+        received = []
+
+        def failing_callback(message):
+            raise ValueError("Invalid message.")
+
+        stream_hub.subscribe(1, ["btcusdt@kline_5m"], failing_callback)
+        stream_hub.subscribe(2, ["btcusdt@kline_5m"], received.append)
+
+        socket_manager.push("btcusdt@kline_5m", 1)
+        socket_manager.push("btcusdt@kline_5m", 2)
+
+        assert len(collect(stream_hub, received)) == 2
@@ -1,6 +1,11 @@
+import asyncio
+import json
+import threading
+
 from data.service.external_requests import generate_signal
 from data.service.helpers import MODEL_APP_ENDPOINTS
-from data.sources._signal_triggerer import wait_for_job_conclusion, RESPONSES
+from data.sources._job_listener import JobListener
+from data.sources._signal_triggerer import wait_for_job_conclusion, trigger_signal_async, SignalBatcher, RESPONSES
 from data.sources import trigger_signal
 from shared.utils.tests.fixtures.external_modules import mock_time_sleep
 from shared.utils.tests.fixtures.models import *
@@ -135,7 +140,19 @@ class TestExternalRequests:
                 (True, ""),
                 (False, "Failed"),
                 id="FAIL",
-            )
+            ),
+            pytest.param(
+                {"code": "SIGNAL_GENERATED", "success": True, "signal": 1},
+                (False, 'Stopping Pipeline. Job failed.'),
+                RESPONSES["SUCCESS"],
+                id="SIGNAL_GENERATED-SUCCESS",
+            ),
+            pytest.param(
+                {"code": "SIGNAL_GENERATED", "success": False, "signal": None},
+                (True, ""),
+                RESPONSES["JOB_FAILED"],
+                id="SIGNAL_GENERATED-FAIL",
+            ),
         ],
     )
     def test_trigger_signal(
@@ -205,3 +222,291 @@ class TestExternalRequests:
         res = trigger_signal(**params)
 
         assert res == expected_value
+
+
+@pytest.fixture
+def mock_async_external_requests(mocker):
+    mocker.patch("data.sources._signal_triggerer.JOB_POLLING_INTERVAL", 0)
+    mocker.patch("data.sources._signal_triggerer.is_pipeline_active", lambda pipeline_id: pipeline_id == 1)
+
+    return (
+        mocker.patch("data.sources._signal_triggerer.generate_signal_async", new_callable=mocker.AsyncMock),
+        mocker.patch("data.sources._signal_triggerer.check_job_status_async", new_callable=mocker.AsyncMock),
+    )
+
+
+class TestAsyncSignalTriggering:
+
+    @pytest.mark.parametrize(
+        "side_effects,expected_value",
+        [
+            pytest.param(
+                [
+                    {"code": "IN_QUEUE", "status": "in-queue"},
+                    {"code": "FINISHED", "success": True, "status": "finished"},
+                ],
+                RESPONSES["SUCCESS"],
+                id="STATUS_FINISHED-SUCCESS",
+            ),
+            pytest.param(
+                [
+                    {"code": "JOB_NOT_FOUND", "status": "job not found"},
+                    {"code": "FINISHED", "success": False, "status": "finished"},
+                ],
+                RESPONSES["JOB_FAILED"],
+                id="STATUS_NOT_FOUND_ONCE-FAIL",
+            ),
+            pytest.param(
+                [{"code": "WAITING", "status": "waiting"}] * 11,
+                RESPONSES["TOO_MANY_RETRIES"],
+                id="STATUS_TOO_MANY_RETRIES",
+            ),
+        ],
+    )
+    def test_trigger_signal_async(self, side_effects, expected_value, mock_async_external_requests):
+        mock_generate_signal_async, mock_check_job_status_async = mock_async_external_requests
+
+        mock_generate_signal_async.return_value = {"success": True, "job_id": 'abcdef'}
+        mock_check_job_status_async.side_effect = side_effects
+
+        res = asyncio.run(trigger_signal_async(1, session=None))
+
+        assert res == expected_value
+        assert mock_check_job_status_async.call_count == len(side_effects)
+
+    def test_trigger_signal_async_inactive_pipeline(self, mock_async_external_requests):
+        mock_generate_signal_async, _ = mock_async_external_requests
+
+        res = asyncio.run(trigger_signal_async(3, session=None))
+
+        assert res == RESPONSES["PIPELINE_NOT_ACTIVE"]
+        mock_generate_signal_async.assert_not_called()
+
+    def test_signal_requests_are_batched(self, mock_async_external_requests, mocker):
+        mock_generate_signals_async = mocker.patch(
+            "data.sources._signal_triggerer.generate_signals_async",
+            new_callable=mocker.AsyncMock,
+            return_value={
+                "success": True,
+                "jobs": {
+                    "1": {"success": True, "job_id": "abcdef"},
+                    "2": {"success": False, "message": "Pipeline 2 was not found."},
+                }
+            }
+        )
+
+        async def generate_signals():
+            batcher = SignalBatcher(window=0.01)
+
+            return await asyncio.gather(*[
+                batcher.generate_signal(None, pipeline_id) for pipeline_id in [1, 2, 3]
+            ])
+
+        responses = asyncio.run(generate_signals())
+
+        mock_generate_signals_async.assert_called_once_with(None, [1, 2, 3])
+
+        assert responses == [
+            {"success": True, "job_id": "abcdef"},
+            {"success": False, "message": "Pipeline 2 was not found."},
+            {"success": False, "message": "No job for pipeline 3."},
+        ]
+
+    def test_full_batch_is_sent_immediately(self, mock_async_external_requests, mocker):
+        mock_generate_signals_async = mocker.patch(
+            "data.sources._signal_triggerer.generate_signals_async",
+            new_callable=mocker.AsyncMock,
+            return_value={"success": False, "message": "Failed"}
+        )
+
+        async def generate_signals():
+            batcher = SignalBatcher(window=3600, max_size=2)
+
+            return await asyncio.gather(*[
+                batcher.generate_signal(None, pipeline_id) for pipeline_id in [1, 2]
+            ])
+
+        responses = asyncio.run(generate_signals())
+
+        assert mock_generate_signals_async.call_count == 1
+        assert responses == [{"success": False, "message": "Failed"}] * 2
+
+    def test_trigger_signal_async_with_batcher(self, mock_async_external_requests, mocker):
+        mock_generate_signal_async, mock_check_job_status_async = mock_async_external_requests
+
+        mocker.patch(
+            "data.sources._signal_triggerer.generate_signals_async",
+            new_callable=mocker.AsyncMock,
+            return_value={"success": True, "jobs": {"1": {"success": True, "job_id": "abcdef"}}}
+        )
+
+        mock_check_job_status_async.return_value = {"code": "FINISHED", "success": True, "status": "finished"}
+
+        res = asyncio.run(trigger_signal_async(1, session=None, batcher=SignalBatcher(window=0)))
+
+        assert res == RESPONSES["SUCCESS"]
+        mock_generate_signal_async.assert_not_called()
+
+
+def get_job_notification(job_id, response):
+    return {"type": "message", "data": json.dumps({"job_id": job_id, "response": response})}
+
+
+@pytest.fixture
+def job_listener(mocker):
+    connection = mocker.Mock()
+    connection.get.return_value = None
+
+    listener = JobListener(connection=connection)
+    listener.available = True
+
+    return listener
+
+
+class TestJobListener:
+
+    def test_wait_is_woken_up_by_notification(self, job_listener):
+        response = {"code": "FINISHED", "success": True, "status": "Job finished."}
+
+        def notify():
+            while not job_listener._waiters:
+                pass
+
+            job_listener._dispatch(get_job_notification("abcdef", response))
+
+        threading.Thread(target=notify).start()
+
+        assert job_listener.wait("abcdef", timeout=5) == response
+        assert job_listener._waiters == {}
+
+    def test_wait_returns_stored_result(self, job_listener):
+        response = {"code": "FAILED", "status": "Job failed."}
+
+        job_listener.connection.get.return_value = json.dumps({"job_id": "abcdef", "response": response})
+
+        assert job_listener.wait("abcdef", timeout=5) == response
+
+    def test_wait_times_out(self, job_listener):
+        job_listener._dispatch(get_job_notification("other", {"code": "FAILED"}))
+
+        assert job_listener.wait("abcdef", timeout=0.01) is None
+        assert job_listener._waiters == {}
+
+    def test_wait_when_unavailable(self, job_listener):
+        job_listener.available = False
+
+        assert job_listener.wait("abcdef", timeout=5) is None
+        job_listener.connection.get.assert_not_called()
+
+    def test_wait_async_is_woken_up_by_notification(self, job_listener):
+        response = {"code": "FINISHED", "success": False, "status": "Job finished."}
+
+        async def wait():
+            waiter = asyncio.ensure_future(job_listener.wait_async("abcdef", timeout=5))
+
+            while not job_listener._waiters:
+                await asyncio.sleep(0)
+
+            job_listener._dispatch(get_job_notification("abcdef", response))
+
+            return await waiter
+
+        assert asyncio.run(wait()) == response
+
+
+class TestPushedJobConclusion:
+
+    @pytest.mark.parametrize(
+        "notification,expected_value",
+        [
+            pytest.param(
+                {"code": "FINISHED", "success": True, "status": "Job finished."},
+                RESPONSES["SUCCESS"],
+                id="FINISHED-SUCCESS",
+            ),
+            pytest.param(
+                {"code": "FINISHED", "success": False, "status": "Job finished."},
+                RESPONSES["JOB_FAILED"],
+                id="FINISHED-FAIL",
+            ),
+            pytest.param(
+                {"code": "FAILED", "status": "Job failed."},
+                RESPONSES["JOB_FAILED"],
+                id="FAILED",
+            ),
+        ],
+    )
+    def test_wait_for_job_conclusion_with_listener(
+        self,
+        notification,
+        expected_value,
+        mock_check_job_status_response,
+        mocker
+    ):
+        listener = mocker.Mock()
+        listener.wait.return_value = notification
+
+        res = wait_for_job_conclusion("abcdef", 1, retry=0, listener=listener)
+
+        assert res == expected_value
+        mock_check_job_status_response.assert_not_called()
+
+    def test_wait_for_job_conclusion_falls_back_to_polling(
+        self,
+        mock_check_job_status_response,
+        mock_time_sleep,
+        mocker
+    ):
+        listener = mocker.Mock()
+        listener.wait.return_value = None
+
+        mock_check_job_status_response.side_effect = [
+            {"code": "WAITING", "status": "waiting"},
+            {"code": "FINISHED", "success": True, "status": "finished"},
+        ]
+
+        res = wait_for_job_conclusion("abcdef", 1, retry=0, listener=listener)
+
+        assert res == RESPONSES["SUCCESS"]
+        assert mock_check_job_status_response.call_count == 2
+
+    def test_trigger_signal_async_with_listener(self, mock_async_external_requests, mocker):
+        mock_generate_signal_async, mock_check_job_status_async = mock_async_external_requests
+
+        mock_generate_signal_async.return_value = {"success": True, "job_id": 'abcdef'}
+
+        listener = mocker.Mock()
+        listener.wait_async = mocker.AsyncMock(return_value={"code": "FINISHED", "success": True})
+
+        res = asyncio.run(trigger_signal_async(1, session=None, listener=listener))
+
+        assert res == RESPONSES["SUCCESS"]
+        listener.wait_async.assert_called_once()
+        mock_check_job_status_async.assert_not_called()
+
+
+class TestMessageBusSignals:
+
+    def test_trigger_signal_over_message_bus(
+        self,
+        mock_generate_signal,
+        mock_check_job_status_response,
+        create_pipeline,
+        mocker
+    ):
+        mocker.patch("data.sources._signal_triggerer.USE_MESSAGE_BUS", True)
+        mocker.patch("data.sources._signal_triggerer.get_connection")
+
+        publish = mocker.patch("data.sources._signal_triggerer.publish", return_value="1-0")
+        mocker.patch(
+            "data.sources._signal_triggerer.get_job_result",
+            return_value={"code": "FINISHED", "success": True, "status": "Job finished."}
+        )
+
+        res = trigger_signal(1)
+
+        assert res == RESPONSES["SUCCESS"]
+
+        publish.assert_called_once_with("candles", pipeline_id=1)
+        mock_generate_signal.assert_not_called()
+        mock_check_job_status_response.assert_not_called()
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from database.model.partitions import (
+    PARTITIONED_TABLES,
+    create_future_partitions,
+    detach_old_partitions,
+    is_partitioned,
+    is_postgres,
+)
+
+
+class Command(BaseCommand):
+    help = "Creates the monthly partitions of the candle tables ahead of time, and detaches old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Number of months after the current one for which partitions are created.",
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=None,
+            help="Number of months before the current one which are kept attached. "
+                 "Older partitions are detached. Nothing is detached if not set.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop detached partitions instead of keeping them as standalone tables.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the partitions which would be created or detached.",
+        )
+
+    def handle(self, *args, **options):
+
+        if not is_postgres(connection):
+            self.stdout.write(f"Partitioning is not supported on {connection.vendor}, skipping.")
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                if not is_partitioned(cursor, table):
+                    self.stdout.write(f"{table} is not partitioned, skipping.")
+                    continue
+
+                for partition_name in create_future_partitions(
+                    cursor, table, options["months_ahead"], dry_run=options["dry_run"]
+                ):
+                    self.stdout.write(f"Created {partition_name}.")
+
+                if options["retention_months"] is None:
+                    continue
+
+                for partition_name in detach_old_partitions(
+                    cursor, table, options["retention_months"], drop=options["drop"], dry_run=options["dry_run"]
+                ):
+                    self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {partition_name}.")
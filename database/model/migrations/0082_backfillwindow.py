@@ -0,0 +1,29 @@
+# Generated by Django 3.2.17 on 2026-10-18 06:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0081_portfoliotimeseries_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillWindow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval', models.TextField()),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('complete', models.BooleanField(default=False)),
+                ('exchange', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='model.exchange')),
+                ('symbol', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='model.symbol')),
+            ],
+            options={
+                'unique_together': {('exchange', 'symbol', 'interval', 'start_time')},
+            },
+        ),
+    ]
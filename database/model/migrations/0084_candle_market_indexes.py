@@ -0,0 +1,21 @@
+# Generated by Django 3.2.17 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0083_candlecoverage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exchangedata',
+            index=models.Index(fields=['exchange', 'symbol', 'interval', 'open_time'], include=('close_time',), name='exchangedata_market_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='structureddata',
+            index=models.Index(fields=['exchange', 'symbol', 'interval', 'open_time'], include=('close_time',), name='structureddata_market_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from database.model.partitions import partition_tables, unpartition_tables
+
+
+def partition_candle_tables(apps, schema_editor):
+    # Fails if any candles have no open time, unless PARTITION_DISCARD_NULL_ROWS is set,
+    # in which case they are deleted and their count is logged.
+    partition_tables(schema_editor.connection)
+
+
+def unpartition_candle_tables(apps, schema_editor):
+    unpartition_tables(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0084_candle_market_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_candle_tables, unpartition_candle_tables),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.17 on 2026-10-18 14:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0085_partition_candle_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandleRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.TextField()),
+                ('interval', models.TextField()),
+                ('start_time', models.DateTimeField()),
+                ('exchange', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='model.exchange')),
+                ('symbol', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='model.symbol')),
+            ],
+            options={
+                'index_together': {('table', 'exchange', 'symbol', 'interval')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.17 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0086_candlerevision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candlerevision',
+            name='end_time',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
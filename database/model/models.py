@@ -110,6 +110,13 @@ class ExchangeData(models.Model):
 
     class Meta:
         unique_together = ("open_time", "exchange", "interval", "symbol")
+        indexes = [
+            models.Index(
+                fields=["exchange", "symbol", "interval", "open_time"],
+                include=["close_time"],
+                name="exchangedata_market_idx",
+            ),
+        ]
 
     def __repr__(self):
         return self.__class__.__name__
@@ -137,6 +144,52 @@ class StructuredData(models.Model):
 
     class Meta:
         unique_together = ("open_time", "exchange", "interval", "symbol")
+        indexes = [
+            models.Index(
+                fields=["exchange", "symbol", "interval", "open_time"],
+                include=["close_time"],
+                name="structureddata_market_idx",
+            ),
+        ]
+
+
+class BackfillWindow(models.Model):
+
+    exchange = models.ForeignKey(Exchange, null=True, on_delete=models.SET_NULL)
+    symbol = models.ForeignKey(Symbol, null=True, on_delete=models.SET_NULL)
+    interval = models.TextField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    complete = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ("exchange", "symbol", "interval", "start_time")
+
+
+class CandleCoverage(models.Model):
+
+    table = models.TextField()
+    exchange = models.ForeignKey(Exchange, null=True, on_delete=models.SET_NULL)
+    symbol = models.ForeignKey(Symbol, null=True, on_delete=models.SET_NULL)
+    interval = models.TextField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+
+    class Meta:
+        index_together = ("table", "exchange", "symbol", "interval", "start_time")
+
+
+class CandleRevision(models.Model):
+
+    table = models.TextField()
+    exchange = models.ForeignKey(Exchange, null=True, on_delete=models.SET_NULL)
+    symbol = models.ForeignKey(Symbol, null=True, on_delete=models.SET_NULL)
+    interval = models.TextField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField(null=True)
+
+    class Meta:
+        index_together = ("table", "exchange", "symbol", "interval")
 
 
 class Jobs(models.Model):
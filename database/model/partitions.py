@@ -0,0 +1,374 @@
+import logging
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+# Candle tables which are range partitioned by month of open_time on Postgres.
+PARTITIONED_TABLES = ["model_exchangedata", "model_structureddata"]
+
+PARTITION_KEY = "open_time"
+
+PARTITION_NAME_PATTERN = re.compile(r"^(?P<table>.+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+# Whether rows without an open time, which cannot be routed to a partition, are discarded
+# when the candle tables are partitioned. Partitioning fails if there are any otherwise.
+DISCARD_NULL_ROWS = os.getenv('PARTITION_DISCARD_NULL_ROWS', '').lower() in ('1', 'true')
+
+
+def is_postgres(connection):
+    return connection.vendor == "postgresql"
+
+
+def get_month_start(date):
+    return pd.Timestamp(date).tz_convert(pytz.utc).normalize().replace(day=1)
+
+
+def get_months(start_date, end_date):
+    """
+    Returns the start dates of the months from the month of start_date up to,
+    and including, the month of end_date.
+    """
+    month_start = get_month_start(start_date)
+    end_month = get_month_start(end_date)
+
+    months = []
+    while month_start <= end_month:
+        months.append(month_start)
+        month_start = month_start + pd.offsets.MonthBegin(1)
+
+    return months
+
+
+def get_month_bounds(month_start):
+    return month_start.to_pydatetime(), (month_start + pd.offsets.MonthBegin(1)).to_pydatetime()
+
+
+def get_partition_name(table, month_start):
+    return f"{table}_p{month_start:%Y_%m}"
+
+
+def get_default_partition_name(table):
+    return f"{table}_default"
+
+
+def parse_partition_name(table, partition_name):
+    """
+    Returns the month start of a monthly partition, or None if the name is not one of them.
+    """
+    match = PARTITION_NAME_PATTERN.match(partition_name)
+
+    if match is None or match.group("table") != table:
+        return None
+
+    return pd.Timestamp(year=int(match.group("year")), month=int(match.group("month")), day=1, tz=pytz.utc)
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+
+    row = cursor.fetchone()
+
+    return row is not None and row[0] == "p"
+
+
+def get_partitions(cursor, table):
+    """
+    Returns the monthly partitions attached to a table, as a dictionary of month start to partition name.
+    """
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = %s
+        """,
+        [table]
+    )
+
+    partitions = {}
+    for (partition_name,) in cursor.fetchall():
+        month_start = parse_partition_name(table, partition_name)
+
+        if month_start is not None:
+            partitions[month_start] = partition_name
+
+    return dict(sorted(partitions.items()))
+
+
+def create_partition(cursor, table, month_start):
+    """
+    Creates the partition of a month. Rows of that month which were routed to the
+    default partition are moved onto it before it is attached, as Postgres refuses
+    to attach a partition whose rows are also held by the default partition.
+    """
+    partition_name = get_partition_name(table, month_start)
+    default_partition = get_default_partition_name(table)
+
+    start_date, end_date = get_month_bounds(month_start)
+
+    cursor.execute(f'CREATE TABLE "{partition_name}" (LIKE "{table}" INCLUDING DEFAULTS)')
+
+    cursor.execute(
+        f"""
+        WITH moved_rows AS (
+            DELETE FROM "{default_partition}"
+            WHERE "{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s
+            RETURNING *
+        )
+        INSERT INTO "{partition_name}" SELECT * FROM moved_rows
+        """,
+        [start_date, end_date]
+    )
+
+    cursor.execute(
+        f'ALTER TABLE "{table}" ATTACH PARTITION "{partition_name}" FOR VALUES FROM (%s) TO (%s)',
+        [start_date, end_date]
+    )
+
+    return partition_name
+
+
+def create_future_partitions(cursor, table, months_ahead=3, now=None, dry_run=False, header=''):
+    """
+    Creates the partitions of the current month and of the following months, if missing.
+
+    Parameters
+    ----------
+    cursor: database cursor - required. Cursor of a Postgres connection.
+    table: str - required. Name of the partitioned table.
+    months_ahead: int - optional. Number of months after the current one for which to create partitions.
+    now: datetime object - optional. Reference date. Defaults to now.
+    dry_run: bool - optional. Whether partitions are only logged instead of created.
+    header: Header for logging line.
+
+    Returns
+    -------
+    List with the names of the created partitions.
+
+    """
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    current_month = get_month_start(now)
+
+    existing_partitions = get_partitions(cursor, table)
+
+    created_partitions = []
+
+    for month_start in get_months(current_month, current_month + pd.offsets.MonthBegin(months_ahead)):
+        if month_start in existing_partitions:
+            continue
+
+        partition_name = get_partition_name(table, month_start)
+
+        if not dry_run:
+            create_partition(cursor, table, month_start)
+
+        logging.info(header + f"Created partition {partition_name}.")
+
+        created_partitions.append(partition_name)
+
+    return created_partitions
+
+
+def detach_old_partitions(cursor, table, retention_months, now=None, drop=False, dry_run=False, header=''):
+    """
+    Detaches the partitions of months older than the retention period. Detached
+    partitions are kept as standalone tables, unless they are dropped.
+
+    Parameters
+    ----------
+    cursor: database cursor - required. Cursor of a Postgres connection.
+    table: str - required. Name of the partitioned table.
+    retention_months: int - required. Number of months before the current one which are kept attached.
+    now: datetime object - optional. Reference date. Defaults to now.
+    drop: bool - optional. Whether detached partitions are dropped.
+    dry_run: bool - optional. Whether partitions are only logged instead of detached.
+    header: Header for logging line.
+
+    Returns
+    -------
+    List with the names of the detached partitions.
+
+    """
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    oldest_month = get_month_start(now) - pd.offsets.MonthBegin(retention_months)
+
+    detached_partitions = []
+
+    for month_start, partition_name in get_partitions(cursor, table).items():
+        if month_start >= oldest_month:
+            continue
+
+        if not dry_run:
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{partition_name}"')
+
+            if drop:
+                cursor.execute(f'DROP TABLE "{partition_name}"')
+
+        logging.info(header + f"{'Dropped' if drop else 'Detached'} partition {partition_name}.")
+
+        detached_partitions.append(partition_name)
+
+    return detached_partitions
+
+
+def get_table_definitions(cursor, table):
+    """
+    Returns the definitions of the unique and foreign key constraints, and of the
+    indexes which do not back a constraint, of a table.
+    """
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+        ORDER BY contype DESC, conname
+        """,
+        [table]
+    )
+    constraints = cursor.fetchall()
+
+    cursor.execute(
+        """
+        SELECT indexname, indexdef
+        FROM pg_indexes
+        WHERE tablename = %s
+        AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)
+        ORDER BY indexname
+        """,
+        [table, table]
+    )
+    indexes = cursor.fetchall()
+
+    return constraints, indexes
+
+
+def count_null_rows(cursor, table):
+    cursor.execute(f'SELECT COUNT(*) FROM "{table}" WHERE "{PARTITION_KEY}" IS NULL')
+
+    return cursor.fetchone()[0]
+
+
+def rebuild_table(
+    cursor,
+    table,
+    partitioned,
+    months_ahead=3,
+    now=None,
+    discard_null_rows=DISCARD_NULL_ROWS,
+    header=''
+):
+    """
+    Rebuilds a table as a table partitioned by month of open_time, or back as a
+    regular table, copying its rows and recreating its constraints and indexes.
+
+    Rows without an open time cannot be routed to a partition. Unless discard_null_rows
+    is set, partitioning a table which has any fails before the table is changed.
+    """
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    null_rows = count_null_rows(cursor, table) if partitioned else 0
+
+    if null_rows and not discard_null_rows:
+        raise ValueError(
+            f"{table} has {null_rows} rows without an open time, which cannot be partitioned. "
+            f"Delete them, or set PARTITION_DISCARD_NULL_ROWS to discard them."
+        )
+
+    old_table = f"{table}_old"
+
+    constraints, indexes = get_table_definitions(cursor, table)
+
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    sequence = cursor.fetchone()[0]
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+    cursor.execute(f'ALTER TABLE "{old_table}" RENAME CONSTRAINT "{table}_pkey" TO "{old_table}_pkey"')
+
+    if partitioned:
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{PARTITION_KEY}")'
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{PARTITION_KEY}" SET NOT NULL')
+
+        # Unique constraints of partitioned tables must include the partition key.
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("id", "{PARTITION_KEY}")')
+
+        cursor.execute(f'CREATE TABLE "{get_default_partition_name(table)}" PARTITION OF "{table}" DEFAULT')
+
+        cursor.execute(f'SELECT MIN("{PARTITION_KEY}") FROM "{old_table}"')
+        first_open_time = cursor.fetchone()[0] or now
+
+        for month_start in get_months(first_open_time, get_month_start(now) + pd.offsets.MonthBegin(months_ahead)):
+            cursor.execute(
+                f'CREATE TABLE "{get_partition_name(table, month_start)}" PARTITION OF "{table}" '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                get_month_bounds(month_start)
+            )
+
+        if null_rows:
+            cursor.execute(f'DELETE FROM "{old_table}" WHERE "{PARTITION_KEY}" IS NULL')
+
+            logging.warning(header + f"Discarded {cursor.rowcount} rows of {table} without an open time.")
+    else:
+        cursor.execute(f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS)')
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{PARTITION_KEY}" DROP NOT NULL')
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("id")')
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old_table}"')
+
+    if sequence is not None:
+        cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}"."id"')
+
+    cursor.execute(f'DROP TABLE "{old_table}"')
+
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+    # Indexes of partitioned tables are defined ON ONLY the parent table.
+    for name, definition in indexes:
+        cursor.execute(definition.replace(" ON ONLY ", " ON "))
+
+    logging.info(header + f"Rebuilt {table} as a {'partitioned' if partitioned else 'regular'} table.")
+
+
+def partition_tables(
+    connection,
+    tables=None,
+    months_ahead=3,
+    now=None,
+    discard_null_rows=DISCARD_NULL_ROWS,
+    header=''
+):
+    """
+    Converts the candle tables onto tables partitioned by month of open_time.
+    Only Postgres supports partitioning, so other databases are left untouched.
+    """
+    if not is_postgres(connection):
+        return
+
+    with connection.cursor() as cursor:
+        for table in tables or PARTITIONED_TABLES:
+            if not is_partitioned(cursor, table):
+                rebuild_table(cursor, table, True, months_ahead, now, discard_null_rows, header)
+
+
+def unpartition_tables(connection, tables=None, header=''):
+    """
+    Converts partitioned candle tables back onto regular tables.
+    """
+    if not is_postgres(connection):
+        return
+
+    with connection.cursor() as cursor:
+        for table in tables or PARTITIONED_TABLES:
+            if is_partitioned(cursor, table):
+                rebuild_table(cursor, table, False, header=header)
@@ -12,14 +12,16 @@ from execution.service.helpers.decorators import binance_error_handler, handle_a
 from execution.exchanges.binance.margin.mock import BinanceMockMarginTrader
 from execution.service.blueprints.market_data import market_data
 from execution.service.helpers import validate_signal, extract_and_validate, get_header
-from execution.service.helpers.exceptions import PipelineNotActive
+from execution.service.helpers.exceptions import PipelineNotActive, SignalRequired, SignalInvalid
 from execution.service.helpers.responses import Responses
 from execution.exchanges.binance.margin import BinanceMarginTrader
 from execution.exchanges.binance.futures import BinanceFuturesTrader
 from shared.utils.decorators import handle_db_connection_error
-from shared.utils.exceptions import EquityRequired
+from shared.utils.exceptions import EquityRequired, NoSuchPipeline
 from shared.utils.helpers import get_pipeline_data
 from shared.utils.logger import configure_logger
+from shared.utils.message_bus import USE_MESSAGE_BUS, ORDERS_STREAM, StreamConsumer
+from shared.utils.pipeline_resumption import PipelineResumption
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
@@ -35,6 +37,8 @@ configure_logger(os.getenv("LOGGER_LEVEL", "INFO"))
 
 global binance_futures_mock_trader, binance_futures_trader, binance_margin_mock_trader, binance_margin_trader
 
+pipeline_resumption = None
+
 
 def get_binance_trader_instance(binance_account_type, paper_trading):
 
@@ -55,17 +59,25 @@ def get_binance_trader_instance(binance_account_type, paper_trading):
 
 def startup_task():
 
+    global pipeline_resumption
+
     start_background_scheduler([binance_futures_mock_trader, binance_futures_trader])
 
     open_positions = Position.objects.filter(pipeline__active=True)
 
+    initial_positions = {}
+    pipelines = []
     for open_position in open_positions:
+        initial_positions[open_position.pipeline_id] = open_position.position
 
-        pipeline = get_pipeline_data(open_position.pipeline_id)
+        pipelines.append(get_pipeline_data(open_position.pipeline_id))
 
+    def resume_pipeline(pipeline):
         header = get_header(pipeline.id)
 
-        start_pipeline_trade(pipeline, 'futures', header, initial_position=open_position.position)
+        start_pipeline_trade(pipeline, 'futures', header, initial_position=initial_positions[pipeline.id])
+
+    pipeline_resumption = PipelineResumption(resume_pipeline).start(pipelines)
 
 
 def start_pipeline_trade(pipeline, binance_account_type, header, initial_position=0):
@@ -82,6 +94,54 @@ def start_pipeline_trade(pipeline, binance_account_type, header, initial_positio
     )
 
 
+def execute_pipeline_order(pipeline, parameters, signal, amount='all'):
+
+    bt = get_binance_trader_instance(parameters.binance_account_type, pipeline.paper_trading)
+
+    return handle_order_execution_errors(
+        symbol=pipeline.symbol,
+        trader_instance=bt,
+        header=parameters.header
+    )(
+        lambda: bt.trade(pipeline.symbol, signal, amount=amount, header=parameters.header, pipeline_id=pipeline.id)
+    )()
+
+
+def execute_order_entry(entry_id, fields):
+    """
+    Handler of the entries of the orders stream of the message bus, the
+    counterpart of the execute_order endpoint.
+    """
+    try:
+        pipeline, parameters = extract_and_validate(fields)
+
+        if not pipeline.active:
+            raise PipelineNotActive(pipeline.id)
+
+        signal = fields.get("signal", None)
+
+        validate_signal(signal=signal)
+
+    except (NoSuchPipeline, PipelineNotActive, SignalRequired, SignalInvalid) as e:
+        logging.info(f"Discarding order {entry_id}: {e.message}")
+        return
+
+    if pipeline.exchange.lower() == 'binance':
+
+        return_value = execute_pipeline_order(pipeline, parameters, signal, fields.get("amount", "all"))
+
+        if return_value:
+            logging.warning(parameters.header + return_value["message"])
+
+
+def start_order_consumer():
+
+    consumer = StreamConsumer(ORDERS_STREAM, 'execution', execute_order_entry)
+    consumer.start()
+
+    return consumer
+
+
 def create_app():
 
     global binance_futures_mock_trader, binance_futures_trader, binance_margin_mock_trader, binance_margin_trader
@@ -101,11 +161,19 @@ def create_app():
 
     startup_task()
 
+    if USE_MESSAGE_BUS:
+        start_order_consumer()
+
     @app.route('/')
     @jwt_required()
     def hello_world():
         return "I'm up!"
 
+    @app.route('/startup_status', methods=['GET'])
+    @jwt_required()
+    def startup_status():
+        return jsonify(pipeline_resumption.to_dict())
+
     @app.route('/start_symbol_trading', methods=['POST'])
     @handle_app_errors
     @binance_error_handler(request_obj=request)
@@ -169,15 +237,7 @@ def create_app():
 
         if pipeline.exchange.lower() == 'binance':
 
-            bt = get_binance_trader_instance(parameters.binance_account_type, pipeline.paper_trading)
-
-            return_value = handle_order_execution_errors(
-                symbol=pipeline.symbol,
-                trader_instance=bt,
-                header=parameters.header
-            )(
-                lambda: bt.trade(pipeline.symbol, signal, amount=amount, header=parameters.header, pipeline_id=pipeline.id)
-            )()
+            return_value = execute_pipeline_order(pipeline, parameters, signal, amount)
 
             if return_value:
                 return jsonify(return_value)
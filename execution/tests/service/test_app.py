@@ -1,5 +1,7 @@
 import pytest
 
+import execution.service.app
+
 with pytest.MonkeyPatch().context() as ctx:
     ctx.setenv("TEST", True)
     from execution.service.helpers.responses import Responses
@@ -366,6 +368,8 @@ class TestExecutionService:
         client_with_open_positions,
         spy_start_pipeline_trade
     ):
+        assert execution.service.app.pipeline_resumption.wait(timeout=5)
+
         assert spy_start_pipeline_trade.call_count == 2
 
     def test_startup_task_no_open_positions(
@@ -373,4 +377,27 @@ class TestExecutionService:
         client,
         spy_start_pipeline_trade
     ):
+        assert execution.service.app.pipeline_resumption.wait(timeout=5)
+
         spy_start_pipeline_trade.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "fields,executed",
+        [
+            pytest.param({"pipeline_id": 1, "signal": 1}, True, id="EXECUTED"),
+            pytest.param({"pipeline_id": 3, "signal": 1}, False, id="PIPELINE_NOT_ACTIVE"),
+            pytest.param({"pipeline_id": 10, "signal": 1}, False, id="NO_SUCH_PIPELINE"),
+            pytest.param({"pipeline_id": 1, "signal": 2}, False, id="SIGNAL_INVALID"),
+        ],
+    )
+    def test_execute_order_entry(self, fields, executed, client, mocker):
+        from execution.service.app import execute_order_entry
+
+        execute_pipeline_order = mocker.patch("execution.service.app.execute_pipeline_order", return_value=None)
+
+        execute_order_entry("1-0", fields)
+
+        assert execute_pipeline_order.called == executed
+
+        if executed:
+            assert execute_pipeline_order.call_args[0][2] == fields["signal"]
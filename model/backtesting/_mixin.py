@@ -1,3 +1,5 @@
+import os
+
 import humanfriendly
 from scipy.optimize import brute
 import plotly.io as pio
@@ -122,7 +124,10 @@ class BacktestMixin:
         except AttributeError:
             return getattr(self, attr)
 
-    def load_data(self, data=None, csv_path=None):
+    def load_data(self, data=None, csv_path=None, candle_size=None, exchange='binance'):
+        if candle_size is not None and data is None and csv_path is None:
+            data = self._load_database_data(candle_size, exchange)
+
         if data is not None:
             self.set_data(data, self.strategy)
 
@@ -130,6 +135,21 @@ class BacktestMixin:
             csv_path = csv_path if csv_path else 'model/sample_data/bitcoin.csv'
             self.set_data(pd.read_csv(csv_path, index_col='date', parse_dates=True), self.strategy)
 
+    def _load_database_data(self, candle_size, exchange='binance'):
+        """
+        Loads the stored candles of the backtested symbol, through the local
+        candle cache if it is enabled.
+        """
+        import django
+
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+        django.setup()
+
+        from database.model.models import StructuredData
+        from shared.data.queries import get_data
+
+        return get_data(StructuredData, None, self.symbol, candle_size, exchange)
+
     def run(self, params=None, print_results=True, plot_results=True):
         """Runs the trading strategy and prints and/or plots the results.
 
@@ -13,10 +13,19 @@ from rq.job import Job
 
 from model.service.helpers.decorators.handle_app_errors import handle_app_errors
 from model.service.helpers.responses import Responses
-from model.service.helpers.signal_generator import send_signal
+from model.service.helpers.worker_metrics import get_worker_metrics
+from model.service.helpers.signal_generator import (
+    send_signal_job,
+    send_market_signals_job,
+    get_pipeline_job_id,
+    split_pipeline_job_id,
+    get_pipeline_job_response,
+    trigger_order
+)
+from model.service.helpers.synchronous_signals import compute_signals, SIGNAL_TIMEOUT
 from model.strategies.properties import STRATEGIES
-from model.worker import conn
 from shared.utils.decorators import handle_db_connection_error
+from shared.utils.exceptions import NoSuchPipeline
 from shared.utils.helpers import get_pipeline_data, get_item_from_cache
 from shared.utils.logger import configure_logger
 
@@ -33,8 +42,224 @@ configure_logger(os.getenv("LOGGER_LEVEL", "INFO"))
 
 cache = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 
+# Connection of the queue of the signal jobs.
+conn = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+
 q = Queue(connection=conn)
 
+# Whether the signals of the pipelines of a market which are requested together are generated by a single job.
+# The pipelines of such jobs are reported under job ids of their own, of the form <job id>:<pipeline id>.
+BATCH_MARKET_SIGNALS = os.getenv('BATCH_MARKET_SIGNALS', 'false').lower() in ('1', 'true')
+
+
+def enqueue_signal(pipeline_id, bearer_token):
+
+    return enqueue_pipeline_signal(get_pipeline_data(pipeline_id), bearer_token)
+
+
+def get_header(pipeline_id):
+    return json.loads(get_item_from_cache(cache, pipeline_id))
+
+
+def enqueue_pipeline_signal(pipeline, bearer_token, header=None):
+
+    if header is None:
+        header = get_header(pipeline.id)
+
+    job = q.enqueue_call(
+        send_signal_job, (
+            pipeline.id,
+            pipeline.symbol,
+            pipeline.candle_size,
+            pipeline.exchange,
+            pipeline.strategy,
+            bearer_token,
+            pipeline.params,
+            header
+        )
+    )
+
+    return job.get_id()
+
+
+def enqueue_market_signals(pipelines, bearer_token, headers=None):
+    """
+    Enqueues a single job which generates the signals of pipelines of the same market.
+
+    Parameters
+    ----------
+    pipelines: list - required. Pipelines of the market.
+    bearer_token: str - required. Token with which orders are executed.
+    headers: dict - optional. Header for logging line of each pipeline, by id. Read from the cache if not specified.
+
+    Returns
+    -------
+    Dictionary with the id of the job of each pipeline.
+
+    """
+    if headers is None:
+        headers = {pipeline.id: get_header(pipeline.id) for pipeline in pipelines}
+
+    symbol, candle_size, exchange = pipelines[0].symbol, pipelines[0].candle_size, pipelines[0].exchange
+
+    job = q.enqueue_call(
+        send_market_signals_job, (
+            symbol,
+            candle_size,
+            exchange,
+            [
+                dict(
+                    id=pipeline.id,
+                    strategy=pipeline.strategy,
+                    params=pipeline.params,
+                    header=headers[pipeline.id]
+                )
+                for pipeline in pipelines
+            ],
+            bearer_token
+        )
+    )
+
+    return {str(pipeline.id): get_pipeline_job_id(job.get_id(), pipeline.id) for pipeline in pipelines}
+
+
+def get_pipelines(pipeline_ids):
+    """
+    Returns the pipelines of a request with their headers, and the responses of those
+    which were not found or whose header could not be read, so that they do not fail
+    the other pipelines of the request.
+
+    Returns
+    -------
+    Tuple with the pipelines, their headers by id, and the responses of the others by id.
+
+    """
+    pipelines = []
+    headers = {}
+    responses = {}
+
+    for pipeline_id in pipeline_ids:
+        try:
+            pipeline = get_pipeline_data(pipeline_id)
+        except NoSuchPipeline as e:
+            responses[str(pipeline_id)] = Responses.NO_SUCH_PIPELINE(e.message)
+            continue
+
+        try:
+            headers[pipeline.id] = get_header(pipeline.id)
+        except (ValueError, redis.RedisError) as e:
+            logging.warning(f"Failed to read header of pipeline {pipeline.id}: {e}.")
+            responses[str(pipeline.id)] = Responses.SIGNAL_GENERATION_FAILED(str(e))
+            continue
+
+        pipelines.append(pipeline)
+
+    return pipelines, headers, responses
+
+
+def enqueue_signals(pipeline_ids, bearer_token):
+    """
+    Enqueues the signals of pipelines whose candles closed at the same time.
+
+    Returns
+    -------
+    Dictionary with the response of each pipeline.
+
+    """
+    pipelines, headers, jobs = get_pipelines(pipeline_ids)
+
+    jobs.update(enqueue_pipeline_signals(pipelines, headers, bearer_token))
+
+    return jobs
+
+
+def enqueue_pipeline_signals(pipelines, headers, bearer_token):
+    """
+    Enqueues the signals of pipelines, with a single job for the pipelines of each
+    market if BATCH_MARKET_SIGNALS is set. A job which fails to be enqueued only fails
+    the pipelines it was for.
+
+    Returns
+    -------
+    Dictionary with the response of each pipeline.
+
+    """
+    jobs = {}
+    markets = {}
+
+    for pipeline in pipelines:
+        markets.setdefault((pipeline.symbol, pipeline.candle_size, pipeline.exchange), []).append(pipeline)
+
+    for market_pipelines in markets.values():
+        if BATCH_MARKET_SIGNALS and len(market_pipelines) > 1:
+            try:
+                job_ids = enqueue_market_signals(market_pipelines, bearer_token, headers)
+            except Exception as e:
+                logging.exception(f"Failed to enqueue market signals: {e}")
+                jobs.update({
+                    str(pipeline.id): Responses.SIGNAL_GENERATION_FAILED(str(e)) for pipeline in market_pipelines
+                })
+                continue
+
+            jobs.update({
+                pipeline_id: Responses.SIGNAL_GENERATION_INPROGRESS(job_id) for pipeline_id, job_id in job_ids.items()
+            })
+            continue
+
+        for pipeline in market_pipelines:
+            header = headers[pipeline.id]
+
+            try:
+                job_id = enqueue_pipeline_signal(pipeline, bearer_token, header)
+            except Exception as e:
+                logging.exception(header + f"Failed to enqueue signal: {e}")
+                jobs[str(pipeline.id)] = Responses.SIGNAL_GENERATION_FAILED(str(e))
+                continue
+
+            jobs[str(pipeline.id)] = Responses.SIGNAL_GENERATION_INPROGRESS(job_id)
+
+    return jobs
+
+
+def generate_signals(pipelines, headers, bearer_token, timeout=SIGNAL_TIMEOUT):
+    """
+    Generates the signals of pipelines within the request and triggers their orders,
+    without going through the queue. The pipelines whose signals are not computed
+    within the time budget are enqueued instead.
+
+    Parameters
+    ----------
+    pipelines: list - required. Pipelines whose signals to generate.
+    headers: dict - required. Header for logging line of each pipeline, by id.
+    bearer_token: str - required. Token with which orders are executed.
+    timeout: float - optional. Seconds within which the signals must be computed.
+
+    Returns
+    -------
+    Dictionary with the response of each pipeline, with its signal and whether its order
+    was executed, or with the id of its job.
+
+    """
+    signals, late = compute_signals(pipelines, headers, timeout)
+
+    # Late signals are enqueued before the orders are triggered, so that their jobs start right away.
+    responses = enqueue_pipeline_signals(late, headers, bearer_token)
+
+    for pipeline_id, signal in signals.items():
+        if signal is None:
+            responses[str(pipeline_id)] = Responses.SIGNAL_GENERATED(None, False)
+            continue
+
+        try:
+            result = trigger_order(pipeline_id, signal, bearer_token, header=headers[pipeline_id])
+        except Exception as e:
+            logging.exception(headers[pipeline_id] + f"Failed to trigger order: {e}")
+            result = False
+
+        responses[str(pipeline_id)] = Responses.SIGNAL_GENERATED(int(signal), result)
+
+    return responses
+
 
 def create_app():
 
@@ -60,26 +285,32 @@ def create_app():
 
         logging.debug(request_data)
 
+        pipeline_ids = request_data.get("pipeline_ids", None)
+
+        # Signals requested synchronously are generated within the request, unless they take too long.
+        synchronous = request_data.get("synchronous", False)
+
+        # Pipelines whose candles closed at the same time are requested together.
+        if pipeline_ids is not None:
+            if synchronous:
+                pipelines, headers, responses = get_pipelines(pipeline_ids)
+
+                responses.update(generate_signals(pipelines, headers, bearer_token))
+
+                return jsonify(Responses.SIGNAL_GENERATION_BATCH_INPROGRESS(responses))
+
+            return jsonify(Responses.SIGNAL_GENERATION_BATCH_INPROGRESS(enqueue_signals(pipeline_ids, bearer_token)))
+
         pipeline_id = request_data.get("pipeline_id", None)
 
-        pipeline = get_pipeline_data(pipeline_id)
-
-        header = json.loads(get_item_from_cache(cache, pipeline_id))
-
-        job = q.enqueue_call(
-            send_signal, (
-                pipeline_id,
-                pipeline.symbol,
-                pipeline.candle_size,
-                pipeline.exchange,
-                pipeline.strategy,
-                bearer_token,
-                pipeline.params,
-                header
-            )
-        )
+        if synchronous:
+            pipeline = get_pipeline_data(pipeline_id)
+
+            responses = generate_signals([pipeline], {pipeline.id: get_header(pipeline.id)}, bearer_token)
+
+            return jsonify(responses[str(pipeline.id)])
 
-        job_id = job.get_id()
+        job_id = enqueue_signal(pipeline_id, bearer_token)
 
         return jsonify(Responses.SIGNAL_GENERATION_INPROGRESS(job_id))
 
@@ -87,6 +318,9 @@ def create_app():
     @jwt_required()
     @handle_db_connection_error
     def check_job(job_id):
+        # Pipelines whose signals are generated by the job of their market have an id of their own.
+        job_id, pipeline_id = split_pipeline_job_id(job_id)
+
         try:
             job = Job.fetch(job_id, connection=conn)
         except NoSuchJobError:
@@ -94,6 +328,9 @@ def create_app():
             return jsonify(Responses.JOB_NOT_FOUND)
 
         if job.is_finished:
+            if pipeline_id is not None:
+                return jsonify(get_pipeline_job_response(job.result.get(pipeline_id)))
+
             return jsonify(Responses.FINISHED(job.result))
 
         elif job.is_queued:
@@ -105,6 +342,11 @@ def create_app():
         elif job.is_failed:
             return jsonify(Responses.FAILED)
 
+    @app.route('/worker_metrics', methods=['GET'])
+    @jwt_required()
+    def worker_metrics():
+        return jsonify(get_worker_metrics(conn, q))
+
     @app.route('/strategies', methods=['GET'])
     @jwt_required()
     @handle_db_connection_error
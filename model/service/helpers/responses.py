@@ -6,6 +6,9 @@ RESPONSES = namedtuple(
     [
         "STRATEGY_INVALID",
         "SIGNAL_GENERATION_INPROGRESS",
+        "SIGNAL_GENERATION_BATCH_INPROGRESS",
+        "SIGNAL_GENERATED",
+        "SIGNAL_GENERATION_FAILED",
         "NO_SUCH_PIPELINE",
         "JOB_NOT_FOUND",
         "FINISHED",
@@ -19,6 +22,9 @@ RESPONSES = namedtuple(
 ReturnCodes = RESPONSES(
     STRATEGY_INVALID="STRATEGY_INVALID",
     SIGNAL_GENERATION_INPROGRESS="SIGNAL_GENERATION_INPROGRESS",
+    SIGNAL_GENERATION_BATCH_INPROGRESS="SIGNAL_GENERATION_BATCH_INPROGRESS",
+    SIGNAL_GENERATED="SIGNAL_GENERATED",
+    SIGNAL_GENERATION_FAILED="SIGNAL_GENERATION_FAILED",
     NO_SUCH_PIPELINE="NO_SUCH_PIPELINE",
     JOB_NOT_FOUND="JOB_NOT_FOUND",
     FINISHED="FINISHED",
@@ -40,6 +46,23 @@ Responses = RESPONSES(
         "message": f"Signal generation process started.",
         "job_id": job_id
     },
+    SIGNAL_GENERATION_BATCH_INPROGRESS=lambda jobs: {
+        "code": ReturnCodes.SIGNAL_GENERATION_BATCH_INPROGRESS,
+        "success": True,
+        "message": f"Signal generation process started for {len(jobs)} pipelines.",
+        "jobs": jobs
+    },
+    SIGNAL_GENERATED=lambda signal, result: {
+        "code": ReturnCodes.SIGNAL_GENERATED,
+        "success": result,
+        "message": f"Signal generated." if signal is not None else f"Signal could not be generated.",
+        "signal": signal
+    },
+    SIGNAL_GENERATION_FAILED=lambda message: {
+        "code": ReturnCodes.SIGNAL_GENERATION_FAILED,
+        "success": False,
+        "message": message,
+    },
     NO_SUCH_PIPELINE=lambda message: {
         "code": ReturnCodes.NO_SUCH_PIPELINE,
         "success": False,
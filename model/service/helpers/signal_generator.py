@@ -3,14 +3,17 @@ import logging
 import os
 
 import django
+from rq import get_current_job
 
 from model.service.external_requests import execute_order
-from shared.utils.helpers import convert_signal_to_text
+from model.service.helpers.responses import Responses
+from model.service.helpers.strategy_cache import get_strategy_cache
+from shared.utils.job_notifications import publish_job_result
+from shared.utils.message_bus import USE_MESSAGE_BUS, ORDERS_STREAM, publish, get_connection
+from shared.utils.helpers import convert_signal_to_text, get_pipeline_data, get_item_from_cache
 from shared.utils.logger import configure_logger
-from shared.data.queries import get_data
-from model.strategies.trend import Momentum
-from model.strategies.moving_average import MovingAverageConvergenceDivergence, MovingAverageCrossover, MovingAverage
-from model.strategies.mean_reversion import BollingerBands
+from shared.data.queries import get_data, OHLCV_COLUMNS
+from model.strategies.registry import STRATEGY_REGISTRY
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
@@ -19,6 +22,9 @@ from database.model.models import StructuredData
 
 configure_logger(os.getenv("LOGGER_LEVEL", "INFO"))
 
+# Separator of the id of a market job and the id of one of its pipelines.
+PIPELINE_JOB_SEPARATOR = ':'
+
 
 def send_signal(
     pipeline_id,
@@ -31,33 +37,72 @@ def send_signal(
     header=''
 ):
 
+    signal = compute_signal(pipeline_id, symbol, candle_size, exchange, strategy, params, header)
+
+    if signal is None:
+        return False
+
+    return trigger_order(pipeline_id, signal, bearer_token, header=header)
+
+
+def compute_signal(pipeline_id, symbol, candle_size, exchange, strategy, params=None, header=''):
+    """
+    Computes the signal of a pipeline on its latest candles, without triggering its order.
+
+    Parameters
+    ----------
+    pipeline_id: int - required. Id of the pipeline.
+    symbol: str - required. Symbol of the pipeline.
+    candle_size: str - required. Candle size of the pipeline.
+    exchange: str - required. Exchange of the pipeline.
+    strategy: str - required. Name of the strategy of the pipeline.
+    params: dict - optional. Parameters of the strategy.
+    header: Header for logging line.
+
+    Returns
+    -------
+    Signal of the pipeline, or None if it could not be generated.
+
+    """
     if params is None:
         params = {}
 
-    data = get_data(StructuredData, None, symbol, candle_size, exchange)
+    strategy_cache = get_strategy_cache()
 
-    if len(data) == 0:
-        logging.debug(header + f"Empty DataFrame, aborting.")
-        return False
+    if strategy_cache is not None:
+        logging.info(header + "Generating signal.")
 
-    # TODO: Compact all this with eval
-    if strategy == 'MovingAverageConvergenceDivergence':
-        signal_gen = MovingAverageConvergenceDivergence(**params, data=data)
+        signal = strategy_cache.get_signal(
+            pipeline_id,
+            symbol,
+            candle_size,
+            exchange,
+            strategy,
+            params,
+            lambda: get_strategy(strategy, params, header),
+            header
+        )
 
-    elif strategy == 'MovingAverage':
-        signal_gen = MovingAverage(**params, data=data)
+        if signal is not None:
+            logging.debug(header + f"{convert_signal_to_text(signal)} signal generated.")
 
-    elif strategy == 'MovingAverageCrossover':
-        signal_gen = MovingAverageCrossover(**params, data=data)
+        return signal
 
-    elif strategy == 'BollingerBands':
-        signal_gen = BollingerBands(**params, data=data)
+    signal_gen = get_strategy(strategy, params, header)
 
-    elif strategy == 'Momentum':
-        signal_gen = Momentum(**params, data=data)
-    else:
-        logging.warning(header + f"Invalid strategy: %s" % strategy)
-        return False
+    if signal_gen is None:
+        return None
+
+    # Only the candles needed to warm up the strategy's indicators are loaded.
+    data = get_data(
+        StructuredData, None, symbol, candle_size, exchange, rows=signal_gen.lookback, columns=OHLCV_COLUMNS
+    )
+
+    if len(data) == 0:
+        logging.debug(header + f"Empty DataFrame, aborting.")
+        return None
+
+    signal_gen.set_data(data, signal_gen)
 
     logging.info(header + "Generating signal.")
 
@@ -65,11 +110,233 @@ def send_signal(
 
     logging.debug(header + f"{convert_signal_to_text(signal)} signal generated.")
 
-    return trigger_order(pipeline_id, signal, bearer_token, header=header)
+    return signal
+
+
+def get_strategy(strategy, params, header=''):
+
+    spec = STRATEGY_REGISTRY.get(strategy)
+
+    if spec is None:
+        logging.warning(header + f"Invalid strategy: %s" % strategy)
+        return None
+
+    try:
+        return spec.create(params)
+    except ValueError as e:
+        logging.warning(header + str(e))
+        return None
+
+
+def send_signal_job(*args, **kwargs):
+    """
+    Worker entrypoint of send_signal, which publishes the conclusion of the job
+    so that the data app is notified without having to poll for it.
+    """
+    job = get_current_job()
+
+    try:
+        result = send_signal(*args, **kwargs)
+    except Exception:
+        if job is not None:
+            publish_job_result(job.connection, job.get_id(), Responses.FAILED)
+        raise
+
+    if job is not None:
+        publish_job_result(job.connection, job.get_id(), Responses.FINISHED(result))
+
+    return result
+
+
+def get_pipeline_job_id(job_id, pipeline_id):
+    """
+    Returns the id under which the conclusion of a pipeline's signal, generated by
+    the job of its market, is reported.
+    """
+    return f"{job_id}{PIPELINE_JOB_SEPARATOR}{pipeline_id}"
+
+
+def split_pipeline_job_id(job_id):
+    """
+    Returns the id of the job and of the pipeline of an id returned by get_pipeline_job_id,
+    the id of the pipeline being None for the jobs of a single pipeline.
+    """
+    job_id, _, pipeline_id = job_id.partition(PIPELINE_JOB_SEPARATOR)
+
+    return job_id, pipeline_id or None
+
+
+def get_pipeline_job_response(result):
+    return Responses.FAILED if result is None else Responses.FINISHED(result)
+
+
+def send_market_signals(symbol, candle_size, exchange, pipelines, bearer_token):
+    """
+    Generates the signals of all the pipelines of a market in one go. The candles are
+    read once, for the longest lookback of the strategies, and the indicators which
+    the strategies have in common are computed once.
+
+    Indicators are only shared by strategies computed over the whole data, ie. when the
+    strategy cache is disabled. Cached strategies are advanced by the new candles only,
+    with a constant amount of state per indicator, so there is nothing left to share, and
+    each one keeps indicators of its own as their states differ with the age of their entries.
+
+    Parameters
+    ----------
+    symbol: str - required. Symbol of the market.
+    candle_size: str - required. Candle size of the market.
+    exchange: str - required. Exchange of the market.
+    pipelines: list - required. Pipelines of the market, as dicts with their id, strategy, params and header.
+    bearer_token: str - required. Token with which orders are executed.
+
+    Returns
+    -------
+    Dictionary with the result of each pipeline by id, which is None if generating its signal failed.
+
+    """
+    results = {}
+    strategies = {}
+
+    for pipeline in pipelines:
+        strategy = get_strategy(pipeline["strategy"], pipeline["params"] or {}, pipeline["header"])
+
+        if strategy is None:
+            results[str(pipeline["id"])] = False
+        else:
+            strategies[str(pipeline["id"])] = strategy
+
+    if not strategies:
+        return results
+
+    rows = max(strategy.lookback for strategy in strategies.values())
+
+    data = get_data(StructuredData, None, symbol, candle_size, exchange, rows=rows, columns=OHLCV_COLUMNS)
+
+    if len(data) == 0:
+        logging.debug(f"Empty DataFrame of {symbol} {candle_size}, aborting.")
+        return {**results, **{pipeline_id: False for pipeline_id in strategies}}
+
+    strategy_cache = get_strategy_cache()
+
+    # Indicators computed on the data, by type, input column and parameters.
+    shared_indicators = {}
+
+    for pipeline in pipelines:
+        pipeline_id, header = str(pipeline["id"]), pipeline["header"]
+
+        if pipeline_id not in strategies:
+            continue
+
+        strategy = strategies[pipeline_id]
+
+        logging.info(header + "Generating signal.")
+
+        try:
+            if strategy_cache is not None:
+                signal = strategy_cache.get_signal(
+                    pipeline["id"],
+                    symbol,
+                    candle_size,
+                    exchange,
+                    pipeline["strategy"],
+                    pipeline["params"] or {},
+                    lambda: strategy,
+                    header,
+                    data
+                )
+            else:
+                # Only strategies computed over the whole data share indicators.
+                strategy.share_indicators(shared_indicators)
+                strategy.set_data(data, strategy)
+
+                signal = strategy.get_signal()
+
+            if signal is None:
+                results[pipeline_id] = False
+                continue
+
+            logging.debug(header + f"{convert_signal_to_text(signal)} signal generated.")
+
+            results[pipeline_id] = trigger_order(pipeline["id"], signal, bearer_token, header=header)
+
+        except Exception as e:
+            logging.exception(header + f"Failed to generate signal: {e}")
+            results[pipeline_id] = None
+
+    return results
+
+
+def send_market_signals_job(symbol, candle_size, exchange, pipelines, bearer_token):
+    """
+    Worker entrypoint of send_market_signals, which publishes the conclusion of
+    each pipeline under its own job id, as returned by get_pipeline_job_id.
+    """
+    job = get_current_job()
+
+    try:
+        results = send_market_signals(symbol, candle_size, exchange, pipelines, bearer_token)
+    except Exception:
+        results = {str(pipeline["id"]): None for pipeline in pipelines}
+
+        if job is not None:
+            publish_pipeline_results(job, results)
+
+        raise
+
+    if job is not None:
+        publish_pipeline_results(job, results)
+
+    return results
+
+
+def publish_pipeline_results(job, results):
+    for pipeline_id, result in results.items():
+        publish_job_result(
+            job.connection, get_pipeline_job_id(job.get_id(), pipeline_id), get_pipeline_job_response(result)
+        )
+
+
+def send_signal_entry(entry_id, fields):
+    """
+    Handler of the entries of the candles stream of the message bus. The signal of
+    the pipeline whose candle closed is generated, and the conclusion of the job,
+    whose id is the id of the entry, is published as for the jobs of the queue.
+    """
+    pipeline_id = fields["pipeline_id"]
+
+    try:
+        pipeline = get_pipeline_data(pipeline_id)
+
+        header = json.loads(get_item_from_cache(get_connection(), pipeline_id))
+
+        result = send_signal(
+            pipeline_id,
+            pipeline.symbol,
+            pipeline.candle_size,
+            pipeline.exchange,
+            pipeline.strategy,
+            None,
+            pipeline.params,
+            header
+        )
+
+        response = Responses.FINISHED(result)
+
+    except Exception as e:
+        logging.exception(e)
+        response = Responses.FAILED
+
+    publish_job_result(get_connection(), entry_id, response)
 
 
 def trigger_order(pipeline_id, signal, bearer_token, header=''):
 
+    if USE_MESSAGE_BUS:
+        publish(ORDERS_STREAM, pipeline_id=pipeline_id, signal=signal)
+
+        logging.debug(header + f"Published order onto {ORDERS_STREAM}.")
+        return True
+
     response = execute_order(pipeline_id, signal, bearer_token, header=header)
 
     if response is None:
@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from shared.data.queries import get_data, OHLCV_COLUMNS
+
+# Number of pipelines whose strategies are kept warm by a worker. 0 disables the cache.
+STRATEGY_CACHE_SIZE = int(os.getenv('STRATEGY_CACHE_SIZE', 256))
+
+# Seconds between checks for cached pipelines which were stopped.
+PRUNE_INTERVAL = 60
+
+
+def is_strategy_cache_enabled():
+    return STRATEGY_CACHE_SIZE > 0
+
+
+def get_strategy_key(symbol, candle_size, exchange, strategy, params):
+    return symbol, candle_size, exchange, strategy, json.dumps(params, sort_keys=True)
+
+
+def get_update_columns(strategy):
+    return list(dict.fromkeys([strategy.close_col, strategy.price_col]))
+
+
+class CachedStrategy:
+
+    def __init__(self, key, strategy, tail, tail_values):
+        self.key = key
+        self.strategy = strategy
+        self.tail = tail
+        self.tail_values = tail_values
+
+
+class StrategyCache:
+    """
+    Least recently used cache of the strategies of the pipelines, kept in incremental
+    mode by a long-lived worker. On each signal the strategy of the pipeline is only
+    advanced by the candles which closed since the last one, so that steady-state
+    signals need a single small read of the database. The strategy is warmed up again
+    if its last candle was rewritten since, eg. because it was still open.
+
+    Entries are evicted when the parameters of their pipeline change, when their
+    pipeline is stopped, or when the cache is full.
+    """
+
+    def __init__(self, model_class, max_size=STRATEGY_CACHE_SIZE, prune_interval=PRUNE_INTERVAL):
+        """
+        Parameters
+        ----------
+        model_class: class - required. Database model class of the candles.
+        max_size: int - optional. Maximum number of pipelines kept in the cache.
+        prune_interval: int - optional. Seconds between checks for stopped pipelines.
+
+        """
+        self.model_class = model_class
+        self.max_size = max_size
+        self.prune_interval = prune_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_prune = time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pipeline_id):
+        return pipeline_id in self._entries
+
+    def get_signal(
+        self,
+        pipeline_id,
+        symbol,
+        candle_size,
+        exchange,
+        strategy,
+        params,
+        create_strategy,
+        header='',
+        data=None
+    ):
+        """
+        Returns the signal of the pipeline's strategy on the latest candle.
+
+        Parameters
+        ----------
+        pipeline_id: int - required. Id of the pipeline.
+        symbol: str - required. Symbol of the pipeline.
+        candle_size: str - required. Candle size of the pipeline.
+        exchange: str - required. Exchange of the pipeline.
+        strategy: str - required. Name of the strategy of the pipeline.
+        params: dict - required. Parameters of the strategy.
+        create_strategy: method - required. Function which returns a new instance of the strategy,
+                         or None if the strategy is not valid.
+        header: Header for logging line.
+        data: DataFrame - optional. Latest candles of the market, if they were read already,
+              eg. for all the pipelines of the market.
+
+        Returns
+        -------
+        Signal of the strategy, or None if the strategy is not valid or there is no data.
+
+        """
+        key = get_strategy_key(symbol, candle_size, exchange, strategy, params)
+
+        with self._lock:
+            self._prune_stopped(header)
+
+            entry = self._entries.get(pipeline_id)
+
+            if entry is not None and entry.key != key:
+                logging.info(header + "Parameters of the pipeline changed, evicting its cached strategy.")
+                self.evict(pipeline_id)
+                entry = None
+
+            if entry is None or not self._advance(entry, symbol, candle_size, exchange, data):
+                entry = self._warm_up(key, symbol, candle_size, exchange, create_strategy, header, data)
+
+                if entry is None:
+                    self.evict(pipeline_id)
+                    return None
+
+                self._entries[pipeline_id] = entry
+
+            self._entries.move_to_end(pipeline_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+            return entry.strategy.get_signal()
+
+    def evict(self, pipeline_id):
+        with self._lock:
+            self._entries.pop(pipeline_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _warm_up(self, key, symbol, candle_size, exchange, create_strategy, header, data=None):
+        strategy = create_strategy()
+
+        if strategy is None:
+            return None
+
+        if data is None:
+            data = get_data(
+                self.model_class, None, symbol, candle_size, exchange, rows=strategy.lookback, columns=OHLCV_COLUMNS
+            )
+        else:
+            data = data.iloc[-strategy.lookback:]
+
+        if len(data) == 0:
+            return None
+
+        logging.debug(header + f"Warming up strategy on {len(data)} candles.")
+
+        strategy.start_incremental(data)
+
+        tail_values = data[get_update_columns(strategy)].iloc[-1].to_dict()
+
+        return CachedStrategy(key, strategy, data.index[-1], tail_values)
+
+    def _advance(self, entry, symbol, candle_size, exchange, data=None):
+        """
+        Advances a cached strategy by the candles which closed after its tail.
+
+        Returns
+        -------
+        False if the candles after the tail are not contiguous with it, ie. the strategy
+        fell behind by more than its lookback, or if the tail was rewritten since it was
+        applied, in which case the strategy has to be warmed up again.
+
+        """
+        if data is None:
+            data = get_data(
+                self.model_class,
+                entry.tail,
+                symbol,
+                candle_size,
+                exchange,
+                rows=entry.strategy.lookback + 1,
+                columns=OHLCV_COLUMNS
+            )
+        else:
+            data = data[data.index >= entry.tail]
+
+        if len(data) == 0 or data.index[0] != entry.tail:
+            return False
+
+        columns = get_update_columns(entry.strategy)
+
+        if data[columns].iloc[0].to_dict() != entry.tail_values:
+            return False
+
+        new_data = data.iloc[1:]
+
+        for candle in new_data[columns].to_dict('records'):
+            entry.strategy.update(candle)
+
+        if len(new_data) > 0:
+            entry.tail = new_data.index[-1]
+            entry.tail_values = new_data[columns].iloc[-1].to_dict()
+
+        return True
+
+    def _prune_stopped(self, header):
+        if time.monotonic() - self._last_prune < self.prune_interval or not self._entries:
+            return
+
+        self._last_prune = time.monotonic()
+
+        from database.model.models import Pipeline
+
+        stopped = Pipeline.objects.filter(id__in=list(self._entries), active=False).values_list('id', flat=True)
+
+        for pipeline_id in stopped:
+            logging.debug(header + f"Pipeline {pipeline_id} was stopped, evicting its cached strategy.")
+            self.evict(pipeline_id)
+
+
+_strategy_cache = None
+
+
+def enable_strategy_cache(model_class, max_size=STRATEGY_CACHE_SIZE):
+    """
+    Enables the cache of strategies of the process. Only long-lived workers, which
+    do not fork a new process for each job, benefit from it.
+    """
+    global _strategy_cache
+
+    if _strategy_cache is None:
+        _strategy_cache = StrategyCache(model_class, max_size)
+
+    return _strategy_cache
+
+
+def get_strategy_cache():
+    return _strategy_cache
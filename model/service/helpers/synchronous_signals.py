@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.db import close_old_connections
+
+from model.service.helpers.signal_generator import compute_signal
+
+# Seconds within which the signals requested synchronously must be computed, before they are enqueued instead.
+SIGNAL_TIMEOUT = float(os.getenv('SIGNAL_TIMEOUT', 1))
+
+# Number of threads of the app computing signals synchronously.
+SIGNAL_THREADS = int(os.getenv('SIGNAL_THREADS', 4))
+
+
+class SignalExecutor:
+    """
+    Pool of threads computing signals, which takes no more signals than it has threads.
+    Signals computed past their time budget can't be stopped, so a burst of slow signals
+    would otherwise hold the threads, and make the signals of the next requests late too.
+    Signals are enqueued instead while the pool is saturated.
+    """
+
+    def __init__(self, max_workers=SIGNAL_THREADS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='signal')
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def submit(self, fn, *args):
+        """
+        Returns
+        -------
+        Future of the computation, or None if all the threads are busy.
+
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        # Released once the computation concludes, even after the request gave up on it.
+        future.add_done_callback(lambda _: self._slots.release())
+
+        return future
+
+
+executor = SignalExecutor()
+
+
+def compute_pipeline_signal(pipeline, header=''):
+    try:
+        return compute_signal(
+            pipeline.id,
+            pipeline.symbol,
+            pipeline.candle_size,
+            pipeline.exchange,
+            pipeline.strategy,
+            pipeline.params,
+            header
+        )
+    finally:
+        # The threads of the executor have database connections of their own, which
+        # are not closed at the end of the requests.
+        close_old_connections()
+
+
+def compute_signals(pipelines, headers, timeout=SIGNAL_TIMEOUT):
+    """
+    Computes the signals of pipelines in the threads of the app, within a single time budget.
+    Signals computed late are discarded, so that their orders are only triggered by the
+    jobs to which they fall back. Signals are not computed at all while all the threads
+    are busy, eg. with late signals which are still being computed.
+
+    Parameters
+    ----------
+    pipelines: list - required. Pipelines whose signals to compute.
+    headers: dict - required. Header for logging line of each pipeline, by id.
+    timeout: float - optional. Seconds within which the signals must be computed.
+
+    Returns
+    -------
+    Tuple with a dictionary of the signals computed in time by pipeline id, which are None
+    if they could not be generated, and the list of the pipelines whose signals were not.
+
+    """
+    futures = {}
+    late = []
+
+    for pipeline in pipelines:
+        future = executor.submit(compute_pipeline_signal, pipeline, headers[pipeline.id])
+
+        if future is None:
+            logging.info(headers[pipeline.id] + "All signal threads are busy, enqueueing signal.")
+            late.append(pipeline)
+        else:
+            futures[future] = pipeline
+
+    done, _ = wait(futures, timeout)
+
+    signals = {}
+
+    for future, pipeline in futures.items():
+        header = headers[pipeline.id]
+
+        if future not in done:
+            # Signals which did not start computing yet are not computed at all.
+            future.cancel()
+
+            logging.info(header + f"Signal not generated within {timeout}s, enqueueing it.")
+            late.append(pipeline)
+
+        elif future.exception() is not None:
+            logging.warning(header + f"Failed to generate signal: {future.exception()}, enqueueing it.")
+            late.append(pipeline)
+
+        else:
+            signals[pipeline.id] = future.result()
+
+    return signals, late
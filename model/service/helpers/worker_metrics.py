@@ -0,0 +1,89 @@
+import json
+import logging
+
+import numpy as np
+import redis
+from rq import Worker
+from rq.registry import StartedJobRegistry
+from rq.utils import utcnow
+
+# List of the latencies of the latest signal jobs.
+JOB_LATENCIES_KEY = 'signal_job_latencies'
+
+# Number of jobs whose latencies are kept.
+LATENCY_SAMPLES = 1000
+
+
+def record_job_latency(connection, job):
+    """
+    Records the latency of a job, ie. the time from its enqueueing to its conclusion,
+    and the time it took to run.
+
+    Parameters
+    ----------
+    connection: redis.Redis - required. Redis connection.
+    job: rq.job.Job - required. Job which concluded.
+
+    Returns
+    -------
+    None
+
+    """
+    if job.enqueued_at is None:
+        return
+
+    ended_at = job.ended_at or utcnow()
+
+    sample = dict(
+        latency=(ended_at - job.enqueued_at).total_seconds(),
+        duration=(ended_at - job.started_at).total_seconds() if job.started_at else None,
+    )
+
+    try:
+        pipeline = connection.pipeline()
+        pipeline.lpush(JOB_LATENCIES_KEY, json.dumps(sample))
+        pipeline.ltrim(JOB_LATENCIES_KEY, 0, LATENCY_SAMPLES - 1)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logging.warning(f"Failed to record latency of job {job.id}: {e}.")
+
+
+def summarize(values):
+    if len(values) == 0:
+        return dict(count=0, mean=None, p50=None, p95=None, max=None)
+
+    return dict(
+        count=len(values),
+        mean=float(np.mean(values)),
+        p50=float(np.percentile(values, 50)),
+        p95=float(np.percentile(values, 95)),
+        max=float(np.max(values)),
+    )
+
+
+def get_worker_metrics(connection, queue):
+    """
+    Returns the depth of a queue, the number of jobs being run and of workers,
+    and statistics of the latencies of the latest jobs, in seconds.
+    """
+    samples = [json.loads(sample) for sample in connection.lrange(JOB_LATENCIES_KEY, 0, -1)]
+
+    return dict(
+        queue_depth=len(queue),
+        started_jobs=StartedJobRegistry(queue=queue).count,
+        workers=Worker.count(queue=queue),
+        latency=summarize([sample["latency"] for sample in samples]),
+        duration=summarize([sample["duration"] for sample in samples if sample["duration"] is not None]),
+    )
+
+
+class JobMetricsMixin:
+    """
+    Mixin of RQ workers which records the latency of the jobs they perform.
+    """
+
+    def perform_job(self, job, queue):
+        try:
+            return super().perform_job(job, queue)
+        finally:
+            record_job_latency(self.connection, job)
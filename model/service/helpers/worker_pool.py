@@ -0,0 +1,136 @@
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+
+# Modules imported by the parent process of the pool, which its workers inherit already initialized.
+PRELOADED_MODULES = [
+    "numpy",
+    "pandas",
+    "ta",
+    "model.strategies",
+    "model.strategies.registry",
+    "model.service.helpers.signal_generator",
+]
+
+# Number of worker processes. 0 sizes the pool to the number of cores.
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', 1))
+
+# Seconds between checks of the workers of the pool.
+MONITOR_INTERVAL = 5
+
+# Seconds given to the workers to finish their current job when the pool is stopped.
+STOP_TIMEOUT = 60
+
+
+def get_pool_size(processes=WORKER_PROCESSES):
+    return processes if processes > 0 else (os.cpu_count() or 1)
+
+
+def preload(modules=PRELOADED_MODULES):
+    for module in modules:
+        importlib.import_module(module)
+
+
+class WorkerPool:
+    """
+    Pool of worker processes forked from a parent process in which the dependencies
+    of the jobs were imported, so that the workers share them and start ready to
+    run jobs. Workers which exit are replaced, until the pool is stopped.
+    """
+
+    def __init__(self, run_worker, size, monitor=None, monitor_interval=MONITOR_INTERVAL, header=''):
+        """
+        Parameters
+        ----------
+        run_worker: method - required. Function run by each worker process.
+        size: int - required. Number of worker processes.
+        monitor: method - optional. Function called by the parent process on every check, eg. to log metrics.
+        monitor_interval: float - optional. Seconds between checks of the workers.
+        header: Header for logging line.
+
+        """
+        self.run_worker = run_worker
+        self.size = size
+        self.monitor = monitor
+        self.monitor_interval = monitor_interval
+        self.header = header
+
+        self.processes = []
+
+        self._context = multiprocessing.get_context('fork')
+        self._stopped = threading.Event()
+
+    def start(self):
+        logging.info(self.header + f"Starting {self.size} worker(s).")
+
+        self._stopped.clear()
+
+        self.processes = [self._spawn(index) for index in range(self.size)]
+
+        return self
+
+    def check(self):
+        """
+        Replaces the workers which exited.
+
+        Returns
+        -------
+        Number of workers replaced.
+
+        """
+        replaced = 0
+
+        for index, process in enumerate(self.processes):
+            if process.is_alive() or self._stopped.is_set():
+                continue
+
+            logging.warning(self.header + f"{process.name} exited with code {process.exitcode}, replacing it.")
+
+            self.processes[index] = self._spawn(index)
+            replaced += 1
+
+        return replaced
+
+    def run(self):
+        self.start()
+
+        while not self._stopped.wait(self.monitor_interval):
+            self.check()
+
+            if self.monitor is not None:
+                try:
+                    self.monitor()
+                except Exception as e:
+                    logging.warning(self.header + f"Failed to monitor the workers: {e}.")
+
+        self.terminate()
+
+    def stop(self):
+        self._stopped.set()
+
+    def terminate(self, timeout=STOP_TIMEOUT):
+        """
+        Asks the workers to exit once they finish their current job, and kills those which do not in time.
+        """
+        self._stopped.set()
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+
+        for process in self.processes:
+            process.join(timeout)
+
+            if process.is_alive():
+                logging.warning(self.header + f"{process.name} did not exit in time, killing it.")
+                process.kill()
+                process.join()
+
+    def _spawn(self, index):
+        # Workers of RQ fork processes of their own, so they can't be daemonic.
+        process = self._context.Process(target=self.run_worker, name=f"worker-{index}")
+        process.start()
+
+        return process
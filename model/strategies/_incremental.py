@@ -0,0 +1,223 @@
+import math
+from collections import deque
+
+
+class IncrementalIndicator:
+    """
+    An indicator which is advanced one value at a time, in constant time, and
+    whose state can be serialized and restored.
+
+    Methods
+    -------
+    update(value) -> float
+        Advances the indicator by one value and returns its new value.
+    to_dict() -> dict
+        Returns the state of the indicator.
+    from_dict(state) -> IncrementalIndicator
+        Restores an indicator from its state.
+
+    """
+
+    def update(self, value):
+        raise NotImplementedError
+
+    def to_dict(self):
+        return {
+            key: list(value) if isinstance(value, deque) else value
+            for key, value in self.__dict__.items()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls.__new__(cls)
+        indicator.__dict__.update(state)
+
+        if "values" in state:
+            indicator.values = deque(state["values"], maxlen=state["window"])
+
+        return indicator
+
+
+class RollingMean(IncrementalIndicator):
+    """
+    Rolling mean over a window of values, equal to pandas' rolling(window, min_periods).mean().
+    Missing values are not counted towards min_periods.
+
+    Parameters
+    ----------
+    window : int
+        Number of values of the window.
+    min_periods : int, optional
+        Minimum number of values for the mean to be defined, by default the window.
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.count = 0
+        self.updates = 0
+
+    @property
+    def value(self):
+        return self.total / self.count if self.count >= max(self.min_periods, 1) else math.nan
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            removed = self.values[0]
+
+            if not math.isnan(removed):
+                self.total -= removed
+                self.count -= 1
+
+        self.values.append(value)
+
+        if not math.isnan(value):
+            self.total += value
+            self.count += 1
+
+        # The running sum is recomputed once per window, so that rounding errors do not accumulate.
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.total = math.fsum(value for value in self.values if not math.isnan(value))
+
+        return self.value
+
+
+class RollingVariance(IncrementalIndicator):
+    """
+    Rolling mean and sample standard deviation over a window of values, which are
+    kept with Welford's algorithm, values being added to and removed from it.
+
+    Parameters
+    ----------
+    window : int
+        Number of values of the window.
+    """
+
+    def __init__(self, window):
+        self.window = window
+
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    @property
+    def std(self):
+        if len(self.values) < max(self.window, 2):
+            return math.nan
+
+        return math.sqrt(max(self.m2, 0.0) / (len(self.values) - 1))
+
+    @property
+    def value(self):
+        return self.mean if len(self.values) >= self.window else math.nan
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            removed = self.values.popleft()
+            count = len(self.values)
+
+            if count == 0:
+                self.mean, self.m2 = 0.0, 0.0
+            else:
+                delta = removed - self.mean
+                self.mean -= delta / count
+                self.m2 -= delta * (removed - self.mean)
+
+        self.values.append(value)
+
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self.m2 += delta * (value - self.mean)
+
+        # The moments are recomputed once per window, so that rounding errors do not accumulate.
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.mean = math.fsum(self.values) / len(self.values)
+            self.m2 = math.fsum((value - self.mean) ** 2 for value in self.values)
+
+        return self.value
+
+
+class ExponentialMovingAverage(IncrementalIndicator):
+    """
+    Exponential moving average, equal to ta's ema_indicator, ie. pandas'
+    ewm(span=window, min_periods=window, adjust=False).mean(). Missing values
+    are skipped.
+
+    Parameters
+    ----------
+    window : int
+        Span of the moving average.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.alpha = 2 / (window + 1)
+
+        self.ema = None
+        self.count = 0
+
+    @property
+    def value(self):
+        return self.ema if self.count >= self.window else math.nan
+
+    def update(self, value):
+        if math.isnan(value):
+            return self.value
+
+        self.ema = value if self.ema is None else self.alpha * value + (1 - self.alpha) * self.ema
+        self.count += 1
+
+        return self.value
+
+
+# Weight of the history left out of an exponential moving average by its lookback.
+EMA_TOLERANCE = 1e-6
+
+
+def get_ema_lookback(window, tolerance=EMA_TOLERANCE):
+    """
+    Returns the number of values after which an exponential moving average has
+    converged, ie. the weight of the values before them is below the tolerance.
+    """
+    alpha = 2 / (window + 1)
+
+    if alpha >= 1:
+        return window
+
+    return window + math.ceil(math.log(tolerance) / math.log(1 - alpha))
+
+
+def get_moving_average_lookback(moving_av, window):
+    return get_ema_lookback(window) if moving_av == 'ema' else window
+
+
+INDICATORS = {
+    indicator.__name__: indicator
+    for indicator in [RollingMean, RollingVariance, ExponentialMovingAverage]
+}
+
+
+def moving_average(moving_av, window):
+    """
+    Returns the incremental counterpart of ta's sma_indicator or ema_indicator.
+    """
+    if moving_av == 'sma':
+        return RollingMean(window)
+    elif moving_av == 'ema':
+        return ExponentialMovingAverage(window)
+    else:
+        raise ValueError(f'Moving average {moving_av} not supported')
+
+
+def indicator_to_dict(indicator):
+    return dict(type=indicator.__class__.__name__, state=indicator.to_dict())
+
+
+def indicator_from_dict(state):
+    return INDICATORS[state["type"]].from_dict(state["state"])
@@ -1,6 +1,10 @@
+import math
+
 import numpy as np
 import pandas as pd
 
+from model.strategies._incremental import indicator_to_dict, indicator_from_dict
+
 
 class StrategyMixin:
     """
@@ -40,6 +44,18 @@ class StrategyMixin:
         Calculates the returns of the asset and updates the data DataFrame.
     update_data() -> None
         Updates the data DataFrame by calculating the returns of the asset.
+    start_incremental(data: pd.DataFrame) -> None
+        Switches the strategy to incremental mode, warming up its indicators on the data.
+    update(candle: dict) -> dict
+        Advances the indicators of the strategy by one closed candle, in incremental mode.
+    lookback -> int
+        Number of trailing candles needed to compute the signal.
+    get_state() -> dict
+        Returns the serializable state of the strategy in incremental mode.
+    set_state(state: dict) -> None
+        Restores the state of the strategy in incremental mode.
+    share_indicators(indicators: dict) -> None
+        Shares the computation of indicators with other strategies given the same data.
 
     """
 
@@ -64,6 +80,10 @@ class StrategyMixin:
         self.returns_col = returns_col
         self.symbol = None
 
+        self._indicators = None
+        self._variables = {}
+        self._shared_indicators = None
+
         if data is not None:
             self.data = self.update_data(data.copy())
 
@@ -143,7 +163,10 @@ class StrategyMixin:
         """
 
         if self.trade_on_close:
-            data[self.returns_col] = np.log(data[self.price_col] / data[self.price_col].shift(1))
+            data[self.returns_col] = self._get_indicator(
+                ("returns", self.price_col),
+                lambda: np.log(data[self.price_col] / data[self.price_col].shift(1))
+            )
         else:
             data[self.returns_col] = np.log(data[self.price_col].shift(-1) / data[self.price_col])
             data.loc[data.index[-1], self.returns_col] = \
@@ -167,3 +190,134 @@ class StrategyMixin:
         """
 
         return self._calculate_returns(data)
+
+    def share_indicators(self, indicators):
+        """
+        Shares the computation of indicators with other strategies which are given the
+        same data, so that the indicators they have in common are computed once. Strategies
+        in incremental mode keep indicators of their own, and do not share them.
+
+        Parameters
+        ----------
+        indicators : dict
+            Indicators computed on the data, by key. Only valid for a single data.
+        """
+        self._shared_indicators = indicators
+
+    def _get_indicator(self, key, compute):
+        """
+        Returns the indicator identified by its key, ie. its type, input column and parameters.
+        It is only computed if no strategy sharing indicators with this one computed it already.
+        """
+        if self._shared_indicators is None:
+            return compute()
+
+        if key not in self._shared_indicators:
+            self._shared_indicators[key] = compute()
+
+        return self._shared_indicators[key]
+
+    @property
+    def lookback(self):
+        """
+        Number of trailing candles needed for the indicators of the last candle to be
+        those of the whole history, including the previous candle for the returns.
+        """
+        return self._get_lookback() + 1
+
+    def _get_lookback(self):
+        return 1
+
+    @property
+    def is_incremental(self):
+        return self._indicators is not None
+
+    def start_incremental(self, data=None):
+        """
+        Switches the strategy to incremental mode, in which its indicators keep a
+        constant amount of rolling state and are advanced one closed candle at a
+        time, instead of being recomputed over the whole history.
+
+        Parameters
+        ----------
+        data : pd.DataFrame, optional
+            OHLCV data on which to warm up the indicators.
+        """
+        self._variables = dict(previous_price=None, row=None)
+        self._indicators = self._create_indicators()
+
+        if data is not None:
+            columns = list(dict.fromkeys([self.close_col, self.price_col]))
+
+            for candle in data[columns].to_dict('records'):
+                self.update(candle)
+
+    def update(self, candle):
+        """
+        Advances the strategy by one closed candle, in incremental mode.
+
+        Parameters
+        ----------
+        candle : dict
+            Closed candle, with at least the price columns of the strategy.
+
+        Returns
+        -------
+        dict
+            Row with the values of the indicators after the candle, as in the data
+            of the strategy. Returns are those of the candle's price over the previous one.
+        """
+        if not self.is_incremental:
+            self.start_incremental()
+
+        price = float(candle[self.price_col])
+        previous_price = self._variables["previous_price"]
+
+        row = {
+            self.close_col: float(candle[self.close_col]),
+            self.returns_col: math.log(price / previous_price) if previous_price else math.nan
+        }
+
+        row.update(self._update_indicators(row))
+
+        self._variables["previous_price"] = price
+        self._variables["row"] = row
+
+        return row
+
+    def get_state(self):
+        """
+        Returns the state of the strategy in incremental mode, which can be serialized with json.
+        """
+        return dict(
+            indicators={name: indicator_to_dict(indicator) for name, indicator in self._indicators.items()},
+            variables=self._variables,
+        )
+
+    def set_state(self, state):
+        """
+        Restores the state of the strategy in incremental mode, as returned by get_state.
+        """
+        self._indicators = {name: indicator_from_dict(indicator) for name, indicator in state["indicators"].items()}
+        self._variables = dict(state["variables"])
+
+    def _create_indicators(self):
+        """
+        Returns the incremental indicators of the strategy, by name.
+        """
+        return {}
+
+    def _update_indicators(self, row):
+        """
+        Advances the incremental indicators by one row, and returns their values.
+        """
+        return {}
+
+    def _get_last_row(self):
+        """
+        Returns the last row of the strategy's data, or its last row in incremental mode.
+        """
+        if self.is_incremental:
+            return self._variables["row"]
+
+        return self.data.iloc[-1]
@@ -1,9 +1,16 @@
 from collections import OrderedDict
 
+import math
+
 import numpy as np
 
+from model.strategies._incremental import RollingVariance
 from model.strategies._mixin import StrategyMixin
 
+# Number of moving average windows over which the last crossing of a band or of
+# the moving average, from which the position is carried forward, is looked for.
+POSITION_LOOKBACK = 10
+
 
 class BollingerBands(StrategyMixin):
     """ Bollinger Bands Strategy:
@@ -77,9 +84,18 @@ class BollingerBands(StrategyMixin):
         """
         data = super().update_data(data)
 
-        data["sma"] = data[self.close_col].rolling(self._ma).mean()
-        data["upper"] = data["sma"] + data[self.close_col].rolling(self._ma).std() * self._sd
-        data["lower"] = data["sma"] - data[self.close_col].rolling(self._ma).std() * self._sd
+        data["sma"] = self._get_indicator(
+            ("sma", self.close_col, self._ma),
+            lambda: data[self.close_col].rolling(self._ma).mean()
+        )
+
+        std = self._get_indicator(
+            ("std", self.close_col, self._ma),
+            lambda: data[self.close_col].rolling(self._ma).std()
+        )
+
+        data["upper"] = data["sma"] + std * self._sd
+        data["lower"] = data["sma"] - std * self._sd
 
         data = self._calculate_positions(data)
         return data
@@ -93,12 +109,44 @@ class BollingerBands(StrategyMixin):
 
         return data
 
+    def _get_lookback(self):
+        return self._ma * POSITION_LOOKBACK
+
+    def _create_indicators(self):
+        self._variables.update(distance=math.nan, position=0)
+
+        return dict(bands=RollingVariance(self._ma))
+
+    def _update_indicators(self, row):
+        bands = self._indicators["bands"]
+
+        close = row[self.close_col]
+
+        sma = bands.update(close)
+        upper = sma + bands.std * self._sd
+        lower = sma - bands.std * self._sd
+
+        distance = close - sma
+
+        # Same rules as _calculate_positions, the last position being carried forward.
+        position = self._variables["position"]
+        if close > upper:
+            position = -1
+        if close < lower:
+            position = 1
+        if distance * self._variables["distance"] < 0:
+            position = 0
+
+        self._variables.update(distance=distance, position=position)
+
+        return dict(sma=sma, upper=upper, lower=lower, distance=distance, position=position)
+
     def _get_position(self, symbol):
         return None
 
     def get_signal(self, row=None):
 
         if row is None:
-            row = self.data.iloc[-1]
+            row = self._get_last_row()
 
         return int(row["position"])
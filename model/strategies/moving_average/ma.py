@@ -4,6 +4,7 @@ from typing import Literal
 import numpy as np
 from ta.trend import sma_indicator, ema_indicator
 
+from model.strategies._incremental import moving_average, get_moving_average_lookback
 from model.strategies._mixin import StrategyMixin
 
 
@@ -79,14 +80,29 @@ class MovingAverage(StrategyMixin):
         data = super().update_data(data)
 
         if self._moving_av == 'sma':
-            data["SMA"] = sma_indicator(close=data[self.close_col], window=self._ma)
+            data["SMA"] = self._get_indicator(
+                ("sma", self.close_col, self._ma),
+                lambda: sma_indicator(close=data[self.close_col], window=self._ma)
+            )
         elif self._moving_av == 'ema':
-            data["SMA"] = ema_indicator(close=data[self.close_col], window=self._ma)
+            data["SMA"] = self._get_indicator(
+                ("ema", self.close_col, self._ma),
+                lambda: ema_indicator(close=data[self.close_col], window=self._ma)
+            )
         else:
             raise('Method not supported')
 
         return data
 
+    def _get_lookback(self):
+        return get_moving_average_lookback(self._moving_av, self._ma)
+
+    def _create_indicators(self):
+        return dict(SMA=moving_average(self._moving_av, self._ma))
+
+    def _update_indicators(self, row):
+        return dict(SMA=self._indicators["SMA"].update(row[self.close_col]))
+
     def _calculate_positions(self, data):
         """
         Calculates positions based on strategy rules.
@@ -120,7 +136,7 @@ class MovingAverage(StrategyMixin):
             Signal (-1 for short, 1 for long, 0 for neutral).
         """
         if row is None:
-            row = self.data.iloc[-1]
+            row = self._get_last_row()
 
         if row["SMA"] > row[self.close_col]:
             return 1
@@ -4,6 +4,7 @@ from typing import Literal
 import numpy as np
 from ta.trend import ema_indicator, sma_indicator
 
+from model.strategies._incremental import moving_average, get_moving_average_lookback
 from model.strategies._mixin import StrategyMixin
 
 
@@ -101,17 +102,44 @@ class MovingAverageCrossover(StrategyMixin):
         data = super().update_data(data)
 
         if self._moving_av == 'sma':
-            data["SMA_S"] = sma_indicator(close=data[self.close_col], window=self._sma_s)
-            data["SMA_L"] = sma_indicator(close=data[self.close_col], window=self._sma_l)
+            data["SMA_S"] = self._get_indicator(
+                ("sma", self.close_col, self._sma_s),
+                lambda: sma_indicator(close=data[self.close_col], window=self._sma_s)
+            )
+            data["SMA_L"] = self._get_indicator(
+                ("sma", self.close_col, self._sma_l),
+                lambda: sma_indicator(close=data[self.close_col], window=self._sma_l)
+            )
 
         elif self._moving_av == 'ema':
-            data["SMA_S"] = ema_indicator(close=data[self.close_col], window=self._sma_s)
-            data["SMA_L"] = ema_indicator(close=data[self.close_col], window=self._sma_l)
+            data["SMA_S"] = self._get_indicator(
+                ("ema", self.close_col, self._sma_s),
+                lambda: ema_indicator(close=data[self.close_col], window=self._sma_s)
+            )
+            data["SMA_L"] = self._get_indicator(
+                ("ema", self.close_col, self._sma_l),
+                lambda: ema_indicator(close=data[self.close_col], window=self._sma_l)
+            )
         else:
             raise ('Method not supported')
 
         return data
 
+    def _get_lookback(self):
+        return max(
+            get_moving_average_lookback(self._moving_av, self._sma_s),
+            get_moving_average_lookback(self._moving_av, self._sma_l)
+        )
+
+    def _create_indicators(self):
+        return dict(
+            SMA_S=moving_average(self._moving_av, self._sma_s),
+            SMA_L=moving_average(self._moving_av, self._sma_l),
+        )
+
+    def _update_indicators(self, row):
+        return {name: indicator.update(row[self.close_col]) for name, indicator in self._indicators.items()}
+
     def _calculate_positions(self, data):
         """
         Calculates the position values for the given data.
@@ -146,7 +174,7 @@ class MovingAverageCrossover(StrategyMixin):
             long moving average.
         """
         if row is None:
-            row = self.data.iloc[-1]
+            row = self._get_last_row()
 
         if row["SMA_S"] > row["SMA_L"]:
             return 1
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 from ta.trend import MACD
 
+from model.strategies._incremental import ExponentialMovingAverage, get_ema_lookback
 from model.strategies._mixin import StrategyMixin
 
 
@@ -100,12 +101,39 @@ class MovingAverageConvergenceDivergence(MACD, StrategyMixin):
         data = super().update_data(data)
 
         self._close = data[self.close_col]
-        self._run()
 
-        data["macd_diff"] = self.macd_diff()
+        data["macd_diff"] = self._get_indicator(
+            ("macd_diff", self.close_col, self._window_slow, self._window_fast, self._window_sign),
+            self._compute_macd_diff
+        )
 
         return data
 
+    def _compute_macd_diff(self):
+        self._run()
+
+        return self.macd_diff()
+
+    def _get_lookback(self):
+        # The signal line is an exponential moving average of the MACD line.
+        return get_ema_lookback(max(self._window_slow, self._window_fast)) + get_ema_lookback(self._window_sign)
+
+    def _create_indicators(self):
+        return dict(
+            ema_fast=ExponentialMovingAverage(self._window_fast),
+            ema_slow=ExponentialMovingAverage(self._window_slow),
+            macd_signal=ExponentialMovingAverage(self._window_sign),
+        )
+
+    def _update_indicators(self, row):
+        macd = self._indicators["ema_fast"].update(row[self.close_col]) \
+            - self._indicators["ema_slow"].update(row[self.close_col])
+
+        # The signal line starts with the first defined value of the MACD line.
+        macd_signal = self._indicators["macd_signal"].update(macd)
+
+        return dict(macd_diff=macd - macd_signal)
+
     def _calculate_positions(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Calculates positions based on MACD difference.
@@ -139,7 +167,7 @@ class MovingAverageConvergenceDivergence(MACD, StrategyMixin):
             Signal (-1 for short, 1 for long, 0 for neutral).
         """
         if row is None:
-            row = self.data.iloc[-1]
+            row = self._get_last_row()
 
         if row["macd_diff"] > 0:
             return 1
@@ -0,0 +1,214 @@
+import importlib
+import inspect
+from collections import OrderedDict
+from typing import get_args
+
+from shared.utils.helpers import get_extended_name, clean_docstring
+
+STRATEGIES_LOCATION = "model.strategies"
+
+# Parameters of the strategies' constructors which are not parameters of the strategy.
+IGNORED_PARAMETERS = ["self", "data", "kwargs"]
+
+COERCERS = {
+    int: lambda x: int(x),
+    float: lambda x: float(x),
+    str: lambda x: str(x),
+}
+
+
+def map_type(type_):
+    if type_ in ['int', 'float']:
+        return {
+            "type": "number",
+            "func": "Number"
+        }
+    elif type_ == 'str':
+        return {
+            "type": "string",
+            "func": "String"
+        }
+
+
+def get_coercer(annotation):
+    """
+    Returns the function which converts a value of a parameter to the type of its annotation,
+    and checks that it is one of its options for Literal annotations.
+    """
+    options = get_args(annotation)
+
+    if len(options) == 0:
+        return COERCERS.get(annotation, lambda x: x)
+
+    coerce = COERCERS.get(type(options[0]), lambda x: x)
+
+    def coerce_option(value):
+        value = coerce(value)
+
+        if value not in options:
+            raise ValueError(f"{value} is not one of {', '.join(map(str, options))}")
+
+        return value
+
+    return coerce_option
+
+
+class StrategySpec:
+    """
+    Parameters of a strategy, introspected once from the signature of its constructor,
+    with the functions which validate them and instantiate the strategy.
+    """
+
+    def __init__(self, name, cls):
+        """
+        Parameters
+        ----------
+        name: str - required. Name of the strategy.
+        cls: class - required. Class of the strategy.
+
+        """
+        self.name = name
+        self.cls = cls
+
+        self.coercers = OrderedDict()
+        self.required = []
+        self.properties = self._introspect()
+
+    def coerce(self, params):
+        """
+        Validates the parameters of the strategy and converts them to their types.
+        Parameters which are not in the signature of the strategy are passed on as they are.
+
+        Raises
+        ------
+        ValueError if a required parameter is missing or a parameter is not valid.
+
+        """
+        missing = [param for param in self.required if param not in params]
+
+        if missing:
+            raise ValueError(f"Missing parameters of {self.name}: {', '.join(missing)}")
+
+        coerced = dict(params)
+
+        for param, value in params.items():
+            if param not in self.coercers:
+                continue
+
+            try:
+                coerced[param] = self.coercers[param](value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid value of parameter {param} of {self.name}: {e}")
+
+        return coerced
+
+    def create(self, params=None, **kwargs):
+        """
+        Returns an instance of the strategy with the validated parameters.
+        """
+        return self.cls(**self.coerce(params or {}), **kwargs)
+
+    def _introspect(self):
+        required = {}
+        optional = {}
+        required_ordering = []
+        optional_ordering = []
+
+        for param, props in inspect.signature(self.cls.__init__).parameters.items():
+
+            if param in IGNORED_PARAMETERS:
+                continue
+
+            if len(get_args(props.annotation)) != 0:
+                param_info = {
+                    "type": map_type(type(get_args(props.annotation)[0]).__name__),
+                    "options": get_args(props.annotation),
+                }
+            else:
+                param_info = {
+                    "type": map_type(props.annotation.__name__)
+                }
+
+            self.coercers[param] = get_coercer(props.annotation)
+
+            if props.default is inspect._empty:
+                self.required.append(param)
+                required_ordering.append(param)
+                required[param] = param_info
+            else:
+                optional_ordering.append(param)
+                optional[param] = param_info
+
+        return {
+            "name": get_extended_name(self.name),
+            "info": clean_docstring(self.cls.__doc__),
+            "params": required,
+            "optionalParams": optional,
+            "paramsOrder": required_ordering,
+            "optionalParamsOrder": optional_ordering
+        }
+
+
+class StrategyRegistry:
+    """
+    Strategies available to the pipelines, by name. The registry is built once per
+    process, so that dispatching a signal job to its strategy is a dictionary lookup.
+
+    Methods
+    -------
+    register(cls, name=None) -> StrategySpec
+        Adds a strategy to the registry.
+    discover(location) -> StrategyRegistry
+        Registers all the strategies exported by a module.
+    get(name) -> StrategySpec
+        Returns the specification of a strategy, or None if it is not registered.
+    create(name, params) -> StrategyMixin
+        Returns an instance of a strategy with the validated parameters.
+    properties() -> dict
+        Returns the parameters of the strategies, in the format of the strategies endpoint.
+
+    """
+
+    def __init__(self):
+        self._specs = OrderedDict()
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def register(self, cls, name=None):
+        spec = StrategySpec(name or cls.__name__, cls)
+
+        self._specs[spec.name] = spec
+
+        return spec
+
+    def discover(self, location=STRATEGIES_LOCATION):
+        for name, cls in inspect.getmembers(importlib.import_module(location), inspect.isclass):
+            self.register(cls, name)
+
+        return self
+
+    def get(self, name):
+        return self._specs.get(name)
+
+    def create(self, name, params=None, **kwargs):
+        """
+        Raises
+        ------
+        KeyError if the strategy is not registered.
+        ValueError if the parameters are not valid.
+
+        """
+        return self._specs[name].create(params, **kwargs)
+
+    def properties(self):
+        return {name: spec.properties for name, spec in self._specs.items()}
+
+
+STRATEGY_REGISTRY = StrategyRegistry().discover()
@@ -1,5 +1,6 @@
 import numpy as np
 
+from model.strategies._incremental import RollingMean
 from model.strategies._mixin import StrategyMixin
 from collections import OrderedDict
 
@@ -68,10 +69,22 @@ class Momentum(StrategyMixin):
         """
         data = super().update_data(data)
 
-        data["rolling_returns"] = data[self.returns_col].rolling(self._window, min_periods=1).mean()
+        data["rolling_returns"] = self._get_indicator(
+            ("rolling_returns", self.price_col, self.trade_on_close, self._window),
+            lambda: data[self.returns_col].rolling(self._window, min_periods=1).mean()
+        )
 
         return data
 
+    def _get_lookback(self):
+        return self._window
+
+    def _create_indicators(self):
+        return dict(rolling_returns=RollingMean(self._window, min_periods=1))
+
+    def _update_indicators(self, row):
+        return dict(rolling_returns=self._indicators["rolling_returns"].update(row[self.returns_col]))
+
     def _calculate_positions(self, data):
         """
         Calculates the positions of the strategy.
@@ -105,7 +118,7 @@ class Momentum(StrategyMixin):
             The trading signal (-1 for sell, 1 for buy, 0 for hold).
         """
         if row is None:
-            row = self.data.iloc[-1]
+            row = self._get_last_row()
 
         if row["rolling_returns"] > 0:
             return 1
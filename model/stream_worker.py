@@ -0,0 +1,24 @@
+import os
+
+import django
+
+from model.service.helpers.signal_generator import send_signal_entry
+from model.service.helpers.strategy_cache import is_strategy_cache_enabled, enable_strategy_cache
+from shared.utils.logger import configure_logger
+from shared.utils.message_bus import CANDLES_STREAM, StreamConsumer
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+configure_logger(os.getenv("LOGGER_LEVEL", "INFO"))
+
+# Consumer group shared by all the model workers consuming the message bus.
+CONSUMER_GROUP = 'model'
+
+if __name__ == '__main__':
+    from database.model.models import StructuredData
+
+    if is_strategy_cache_enabled():
+        enable_strategy_cache(StructuredData)
+
+    StreamConsumer(CANDLES_STREAM, CONSUMER_GROUP, send_signal_entry).run()
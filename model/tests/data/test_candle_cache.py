@@ -0,0 +1,231 @@
+from shared.utils.tests.fixtures.models import *
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import shared.data.cache
+import shared.data.queries
+from database.model.models import StructuredData
+from shared.data.cache import get_candle_cache
+from shared.data.revisions import add_revision
+from shared.data.queries import get_data, query_data, read_candles, CANDLE_COLUMNS, OHLCV_COLUMNS
+
+
+@pytest.fixture
+def cache_path(tmp_path, mocker):
+    mocker.patch.object(shared.data.cache, "CACHE_PATH", str(tmp_path))
+    mocker.patch.object(shared.data.cache, "RESYNC_ROWS", 3)
+    mocker.patch.object(shared.data.cache, "_candle_caches", {})
+
+    return str(tmp_path)
+
+
+@pytest.fixture
+def create_candles(create_exchange, create_symbol):
+    def create(start, periods):
+        open_times = pd.date_range(start, periods=periods, freq="1H", tz=pytz.utc)
+
+        StructuredData.objects.bulk_create([
+            StructuredData(
+                exchange_id="binance",
+                symbol_id="BTCUSDT",
+                interval="1h",
+                open_time=open_time,
+                close_time=open_time + pd.Timedelta(minutes=59),
+                open=1,
+                close=open_time.hour,
+                trades=10
+            )
+            for open_time in open_times
+        ])
+
+        return open_times
+
+    return create
+
+
+def assert_matches_database(data):
+    expected_data = query_data(StructuredData, None, "BTCUSDT", "1h")
+
+    assert list(data.index) == list(expected_data.index)
+    assert list(data["close"]) == list(expected_data["close"])
+    assert list(data["close_time"]) == list(expected_data["close_time"])
+
+
+class TestCandleCache:
+
+    def test_cache_is_appended_incrementally(self, cache_path, create_candles, mocker):
+
+        create_candles("2021-04-21 00:00", 10)
+
+        assert_matches_database(get_data(StructuredData, None, "BTCUSDT", "1h"))
+
+        cache_file = os.path.join(cache_path, "model_structureddata", "binance", "BTCUSDT", "1h.bin")
+        inode = os.stat(cache_file).st_ino
+
+        create_candles("2021-04-21 10:00", 5)
+        StructuredData.objects.filter(open_time="2021-04-21 09:00+00:00").update(close=-1)
+
+        rebuild_spy = mocker.spy(shared.data.cache.CandleCache, "_rebuild")
+
+        data = get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        assert_matches_database(data)
+        assert len(data) == 15
+        assert rebuild_spy.call_count == 0
+        assert os.stat(cache_file).st_ino == inode
+
+    def test_cache_is_rebuilt_on_mismatch(self, cache_path, create_candles, mocker):
+
+        open_times = create_candles("2021-04-21 00:00", 10)
+
+        get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        StructuredData.objects.filter(open_time=open_times[8]).delete()
+
+        rebuild_spy = mocker.spy(shared.data.cache.CandleCache, "_rebuild")
+
+        assert_matches_database(get_data(StructuredData, None, "BTCUSDT", "1h"))
+        assert rebuild_spy.call_count == 1
+
+    def test_revised_rows_are_synced(self, cache_path, create_candles, mocker):
+        """
+        GIVEN a synced cache
+        WHEN rows before its trailing rows are updated, or a gap before them is filled,
+        and the revision of the market is recorded
+        THEN the cache serves the revised rows
+
+        """
+        open_times = create_candles("2021-04-21 00:00", 10)
+
+        StructuredData.objects.filter(open_time=open_times[2]).delete()
+
+        get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        StructuredData.objects.filter(open_time=open_times[1]).update(close=-1)
+        add_revision(StructuredData, "binance", "BTCUSDT", "1h", open_times[1])
+
+        rebuild_spy = mocker.spy(shared.data.cache.CandleCache, "_rebuild")
+
+        data = get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        assert_matches_database(data)
+        assert data["close"].iloc[1] == -1
+        assert rebuild_spy.call_count == 0
+
+        create_candles(open_times[2], 1)
+        add_revision(StructuredData, "binance", "BTCUSDT", "1h", open_times[2])
+
+        data = get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        assert_matches_database(data)
+        assert len(data) == 10
+
+        # Rows revised before are not read again.
+        query_spy = mocker.spy(shared.data.queries, "read_candles")
+
+        get_data(StructuredData, None, "BTCUSDT", "1h")
+
+        assert query_spy.call_args[0][1] == open_times[-3]
+
+    def test_cache_of_empty_market(self, cache_path, create_candles):
+        """
+        GIVEN a market without candles
+        WHEN its cache is synced, and again once candles are added
+        THEN the cache is empty, and then holds the candles
+
+        """
+        cache = get_candle_cache(StructuredData, "BTCUSDT", "1h")
+
+        assert len(cache.sync(query_data)) == 0
+
+        create_candles("2021-04-21 00:00", 5)
+
+        assert_matches_database(cache.sync(query_data).to_frame())
+
+    def test_tail_is_a_view(self, cache_path, create_candles):
+
+        create_candles("2021-04-21 00:00", 10)
+
+        cache = get_candle_cache(StructuredData, "BTCUSDT", "1h").sync(query_data)
+
+        tail = cache.tail(4)
+
+        assert isinstance(tail.base, np.memmap) or isinstance(tail, np.memmap)
+        assert list(tail["close"]) == [6, 7, 8, 9]
+
+        start_date = pd.Timestamp("2021-04-21 08:00", tz=pytz.utc)
+
+        assert list(get_data(StructuredData, start_date, "BTCUSDT", "1h")["close"]) == [8, 9]
+        assert list(cache.to_frame(rows=3)["close"]) == [7, 8, 9]
+
+
+class TestBoundedQueries:
+
+    def test_query_recent_rows(self, create_candles):
+
+        open_times = create_candles("2021-04-21 00:00", 10)
+
+        data = get_data(StructuredData, None, "BTCUSDT", "1h", rows=4)
+
+        assert list(data.index) == list(open_times[-4:])
+        assert list(data["close"]) == [6, 7, 8, 9]
+
+        assert len(get_data(StructuredData, None, "BTCUSDT", "1h", rows=20)) == 10
+
+    def test_query_recent_rows_from_cache(self, cache_path, create_candles):
+
+        create_candles("2021-04-21 00:00", 10)
+
+        assert list(get_data(StructuredData, None, "BTCUSDT", "1h", rows=3)["close"]) == [7, 8, 9]
+
+
+class TestColumnReader:
+
+    def test_read_candles_matches_queryset_values(self, create_candles):
+
+        open_times = create_candles("2021-04-21 00:00", 10)
+
+        data = read_candles(StructuredData, None, "BTCUSDT", "1h")
+
+        expected_data = pd.DataFrame(StructuredData.objects.order_by('open_time').values()).set_index('open_time')
+
+        assert list(data.columns) == CANDLE_COLUMNS[1:]
+        assert data.index.equals(pd.DatetimeIndex(open_times, name="open_time"))
+        assert str(data.index.tz) == "UTC"
+
+        for column in data.columns:
+            pd.testing.assert_series_equal(data[column], expected_data[column], check_dtype=False)
+
+        assert data["close"].dtype == np.float64
+        assert data["trades"].dtype == np.int64
+        assert data["open"].isnull().sum() == 0 and data["volume"].isnull().all()
+
+    def test_read_candles_columns_and_limit(self, create_candles):
+
+        open_times = create_candles("2021-04-21 00:00", 10)
+
+        data = read_candles(StructuredData, open_times[2], "BTCUSDT", "1h", columns=["close", "close_time"], limit=3)
+
+        assert list(data.columns) == ["close", "close_time"]
+        assert list(data.index) == list(open_times[-3:])
+        assert list(data["close"]) == [7, 8, 9]
+
+    def test_read_candles_empty(self, create_exchange, create_symbol):
+
+        data = read_candles(StructuredData, None, "BTCUSDT", "1h", columns=OHLCV_COLUMNS)
+
+        assert len(data) == 0
+        assert list(data.columns) == OHLCV_COLUMNS
+        assert isinstance(data.index, pd.DatetimeIndex)
+
+    def test_get_data_columns_from_cache(self, cache_path, create_candles):
+
+        create_candles("2021-04-21 00:00", 10)
+
+        data = get_data(StructuredData, None, "BTCUSDT", "1h", rows=2, columns=OHLCV_COLUMNS)
+
+        assert list(data.columns) == OHLCV_COLUMNS
+        assert list(data["close"]) == [8, 9]
@@ -1,3 +1,5 @@
+import redis
+
 from model.service.helpers.responses import Responses
 from model.tests.setup.fixtures.app import *
 from model.tests.setup.fixtures.internal_modules import *
@@ -144,6 +146,16 @@ class TestModelService:
                 Responses.NO_SUCH_PIPELINE('Pipeline None was not found.'),
                 id="NO_SUCH_PIPELINE",
             ),
+            pytest.param(
+                {
+                    "pipeline_ids": [1, 2]
+                },
+                Responses.SIGNAL_GENERATION_BATCH_INPROGRESS({
+                    "1": Responses.SIGNAL_GENERATION_INPROGRESS("abcde"),
+                    "2": Responses.NO_SUCH_PIPELINE('Pipeline 2 was not found.'),
+                }),
+                id="SIGNAL_GENERATION_BATCH_INPROGRESS",
+            ),
         ],
     )
     def test_generate_signal(
@@ -176,3 +188,170 @@ class TestModelService:
         res = client.get("/strategies")
 
         assert res.json == STRATEGIES
+
+    @pytest.mark.parametrize(
+        "batch_market_signals,expected_job_ids",
+        [
+            pytest.param(True, {"1": "abcde:1", "2": "abcde:2"}, id="MARKET_JOB"),
+            pytest.param(False, {"1": "abcde", "2": "abcde"}, id="PIPELINE_JOBS"),
+        ],
+    )
+    def test_generate_signal_market_job(
+        self,
+        batch_market_signals,
+        expected_job_ids,
+        client,
+        mocker,
+        mock_settings_env_vars,
+        mocked_rq_enqueue_call,
+        mock_redis_connection,
+        mock_jwt_required,
+        create_pipeline,
+        create_pipeline_2
+    ):
+        mocker.patch.object(model.service.app, "BATCH_MARKET_SIGNALS", batch_market_signals)
+
+        res = client.post("/generate_signal", json={"pipeline_ids": [1, 2]})
+
+        assert res.json == Responses.SIGNAL_GENERATION_BATCH_INPROGRESS({
+            pipeline_id: Responses.SIGNAL_GENERATION_INPROGRESS(job_id)
+            for pipeline_id, job_id in expected_job_ids.items()
+        })
+
+    @pytest.mark.parametrize(
+        "job_id,expected_value",
+        [
+            pytest.param("123:1", Responses.FINISHED(True), id="FINISHED"),
+            pytest.param("123:2", Responses.FAILED, id="FAILED"),
+            pytest.param("123:3", Responses.FAILED, id="NOT_IN_JOB"),
+        ],
+    )
+    def test_check_pipeline_job_status(self, job_id, expected_value, client, mocked_rq_job, mock_jwt_required):
+
+        mocked_rq_job.return_value = mock_rq_job(is_finished=True, result={"1": True, "2": None})
+
+        res = client.get(f"/check_job/{job_id}")
+
+        assert res.json == expected_value
+        assert mocked_rq_job.call_args[0][0] == "123"
+
+    def test_worker_metrics(self, client, mocker, mock_jwt_required):
+        metrics = {"queue_depth": 3}
+        get_worker_metrics = mocker.patch("model.service.app.get_worker_metrics", return_value=metrics)
+
+        res = client.get("/worker_metrics")
+
+        assert res.json == metrics
+        assert get_worker_metrics.call_args[0][1] is model.service.app.q
+
+    @pytest.mark.parametrize(
+        "signal,order_result,expected_value",
+        [
+            pytest.param(1, True, Responses.SIGNAL_GENERATED(1, True), id="ORDER_EXECUTED"),
+            pytest.param(-1, False, Responses.SIGNAL_GENERATED(-1, False), id="ORDER_FAILED"),
+            pytest.param(None, True, Responses.SIGNAL_GENERATED(None, False), id="NO_SIGNAL"),
+        ],
+    )
+    def test_generate_signal_synchronously(
+        self,
+        signal,
+        order_result,
+        expected_value,
+        client,
+        mocker,
+        mock_settings_env_vars,
+        mocked_rq_enqueue_call,
+        mock_redis_connection,
+        mock_jwt_required,
+        create_pipeline
+    ):
+        mocker.patch("model.service.helpers.synchronous_signals.compute_signal", return_value=signal)
+        trigger_order = mocker.patch("model.service.app.trigger_order", return_value=order_result)
+
+        res = client.post("/generate_signal", json={"pipeline_id": 1, "synchronous": True})
+
+        assert res.json == expected_value
+        assert trigger_order.call_count == (signal is not None)
+
+    def test_generate_signals_synchronously_fall_back_to_jobs(
+        self,
+        client,
+        mocker,
+        mock_settings_env_vars,
+        mocked_rq_enqueue_call,
+        mock_redis_connection,
+        mock_jwt_required,
+        create_pipeline,
+        create_pipeline_2
+    ):
+        """
+        GIVEN pipelines whose signals are requested synchronously
+        WHEN one of the signals is not computed within the time budget
+        THEN it is enqueued, and only the order of the other one is triggered
+
+        """
+        mocker.patch(
+            "model.service.app.compute_signals",
+            side_effect=lambda pipelines, headers, timeout: ({1: 1}, [p for p in pipelines if p.id == 2])
+        )
+        trigger_order = mocker.patch("model.service.app.trigger_order", return_value=True)
+
+        res = client.post("/generate_signal", json={"pipeline_ids": [1, 2, 4], "synchronous": True})
+
+        assert res.json == Responses.SIGNAL_GENERATION_BATCH_INPROGRESS({
+            "1": Responses.SIGNAL_GENERATED(1, True),
+            "2": Responses.SIGNAL_GENERATION_INPROGRESS("abcde"),
+            "4": Responses.NO_SUCH_PIPELINE('Pipeline 4 was not found.'),
+        })
+        assert trigger_order.call_args[0][:2] == (1, 1)
+        assert trigger_order.call_count == 1
+
+    @pytest.mark.parametrize(
+        "batch_market_signals,expected_code",
+        [
+            pytest.param(True, "SIGNAL_GENERATION_FAILED", id="MARKET_JOB"),
+            pytest.param(False, "SIGNAL_GENERATION_INPROGRESS", id="PIPELINE_JOBS"),
+        ],
+    )
+    def test_generate_signal_batch_isolates_failures(
+        self,
+        batch_market_signals,
+        expected_code,
+        client,
+        mocker,
+        mock_settings_env_vars,
+        mock_redis_connection,
+        mock_jwt_required,
+        create_pipeline,
+        create_pipeline_2,
+        create_inactive_pipeline
+    ):
+        """
+        GIVEN a batch of pipelines of the same market
+        WHEN the header of one of them can't be read, and the job of another can't be enqueued
+        THEN those pipelines fail on their own, along with the pipelines of the same job only,
+        and the request succeeds
+
+        """
+        mocker.patch.object(model.service.app, "BATCH_MARKET_SIGNALS", batch_market_signals)
+
+        mock_redis_connection.set("pipeline 2", "{")
+
+        def enqueue_call(func, args):
+            pipeline_ids = [pipeline["id"] for pipeline in args[3]] if isinstance(args[3], list) else [args[0]]
+
+            if 3 in pipeline_ids:
+                raise redis.ConnectionError("Connection refused.")
+
+            return mock_enqueue_call(func, args)
+
+        mocker.patch.object(model.service.app.q, "enqueue_call", enqueue_call)
+
+        res = client.post("/generate_signal", json={"pipeline_ids": [1, 2, 3]})
+
+        jobs = res.json["jobs"]
+
+        assert res.status_code == 200
+        assert jobs["1"]["code"] == expected_code
+        assert jobs["2"]["code"] == "SIGNAL_GENERATION_FAILED"
+        assert jobs["3"] == Responses.SIGNAL_GENERATION_FAILED("Connection refused.")
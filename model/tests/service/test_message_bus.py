@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from shared.utils.message_bus import StreamConsumer, MAX_DELIVERIES, encode_entry, decode_entry, publish
+
+
+def get_entries(*entries):
+    return [["candles", [(entry_id.encode(), encode_entry(fields)) for entry_id, fields in entries]]]
+
+
+@pytest.fixture
+def connection(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def handled():
+    return []
+
+
+@pytest.fixture
+def consumer(connection, handled):
+
+    def handler(entry_id, fields):
+        if fields.get("fail"):
+            raise ValueError("Failed")
+
+        handled.append((entry_id, fields))
+
+    return StreamConsumer("candles", "model", handler, consumer="worker-1", connection=connection, claim_idle_time=1000)
+
+
+class TestMessageBus:
+
+    def test_entries_are_encoded(self, connection):
+        connection.xadd.return_value = b"1-0"
+
+        entry_id = publish("candles", connection=connection, pipeline_id=1, signal=-1)
+
+        assert entry_id == "1-0"
+
+        fields = connection.xadd.call_args[0][1]
+
+        assert decode_entry({key.encode(): value.encode() for key, value in fields.items()}) == {
+            "pipeline_id": 1, "signal": -1
+        }
+
+    def test_consume_acknowledges_handled_entries(self, consumer, connection, handled):
+        connection.xreadgroup.return_value = get_entries(("1-0", {"pipeline_id": 1}), ("2-0", {"fail": True}))
+
+        assert consumer.consume() == 2
+
+        assert handled == [("1-0", {"pipeline_id": 1})]
+        connection.xack.assert_called_once_with("candles", "model", "1-0")
+
+    def test_replay_pending(self, consumer, connection, handled):
+        # The failing entry stays pending, and is returned on every read.
+        connection.xreadgroup.side_effect = [
+            get_entries(("1-0", {"pipeline_id": 1}), ("2-0", {"fail": True})),
+            get_entries(("2-0", {"fail": True})),
+        ]
+
+        consumer.replay_pending()
+
+        assert handled == [("1-0", {"pipeline_id": 1})]
+        assert connection.xreadgroup.call_args[0][2] == {"candles": "0"}
+
+    def test_trimmed_entries_are_acknowledged(self, consumer, connection, handled):
+        connection.xreadgroup.return_value = [["candles", [(b"1-0", None)]]]
+
+        consumer.consume()
+
+        assert handled == []
+        connection.xack.assert_called_once_with("candles", "model", b"1-0")
+
+    def test_claim_stale(self, consumer, connection):
+        connection.xpending_range.return_value = [
+            {"message_id": b"1-0", "consumer": b"worker-2", "time_since_delivered": 5000, "times_delivered": 1},
+            {"message_id": b"2-0", "consumer": b"worker-2", "time_since_delivered": 5000, "times_delivered": MAX_DELIVERIES},
+            {"message_id": b"3-0", "consumer": b"worker-2", "time_since_delivered": 10, "times_delivered": 1},
+        ]
+        connection.xclaim.return_value = [(b"1-0", {})]
+
+        assert consumer.claim_stale() == 1
+
+        connection.xack.assert_called_once_with("candles", "model", b"2-0")
+        connection.xclaim.assert_called_once_with("candles", "model", "worker-1", 1000, [b"1-0"])
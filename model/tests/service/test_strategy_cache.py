@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+from model.service.helpers.strategy_cache import StrategyCache
+from model.strategies import Momentum, MovingAverageCrossover
+from shared.utils.tests.fixtures.models import *
+
+
+def get_random_walk(periods=300):
+    close = 100 + np.cumsum(np.random.default_rng(2).normal(0, 1, periods))
+
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=pd.date_range("2021-01-01", periods=periods, freq="H", tz="UTC", name="open_time"),
+    )
+
+
+class FakeDatabase:
+    """
+    Candles of which only the first closed ones are visible, read as get_data does.
+    """
+
+    def __init__(self, data, closed):
+        self.data = data
+        self.closed = closed
+        self.reads = []
+
+    def get_data(self, model_class, start_date, symbol, interval, exchange='binance', rows=None, columns=None):
+        data = self.data.iloc[:self.closed]
+
+        if start_date is not None:
+            data = data[data.index >= start_date]
+
+        if rows is not None:
+            data = data.iloc[-rows:]
+
+        self.reads.append(len(data))
+
+        return data
+
+
+@pytest.fixture
+def database(mocker):
+    database = FakeDatabase(get_random_walk(), 100)
+
+    mocker.patch("model.service.helpers.strategy_cache.get_data", side_effect=database.get_data)
+
+    return database
+
+
+@pytest.fixture
+def cache():
+    return StrategyCache(None, max_size=2)
+
+
+def get_signal(cache, pipeline_id=1, strategy=MovingAverageCrossover, params=None):
+    params = params if params is not None else dict(sma_s=5, sma_l=20)
+
+    return cache.get_signal(
+        pipeline_id, "BTCUSDT", "1h", "binance", strategy.__name__, params, lambda: strategy(**params)
+    )
+
+
+class TestStrategyCache:
+
+    def test_cached_signal_matches_cold_signal(self, cache, database):
+        """
+        GIVEN a cached strategy
+        WHEN candles close, one or several at a time
+        THEN only the new candles are read, and the signal is that of a strategy computed over the whole history
+
+        """
+        get_signal(cache)
+
+        for step in [1, 1, 3, 1, 5]:
+            database.closed += step
+
+            signal = get_signal(cache)
+
+            expected = MovingAverageCrossover(sma_s=5, sma_l=20, data=database.data.iloc[:database.closed])
+
+            assert signal == expected.get_signal()
+            assert cache._entries[1].tail == database.data.index[database.closed - 1]
+
+        assert database.reads[1:] == [2, 2, 4, 2, 6]
+
+    def test_revised_tail_warms_up_strategy(self, cache, database):
+        """
+        GIVEN a strategy cached while its last candle was still open
+        WHEN that candle is rewritten with its final values, and further candles close
+        THEN the strategy is warmed up again, and the signal is that of a strategy computed over the whole history
+
+        """
+        final_close = database.data["close"].iloc[database.closed - 1]
+        database.data.iloc[database.closed - 1, database.data.columns.get_loc("close")] = final_close + 50
+
+        get_signal(cache)
+
+        database.data.iloc[database.closed - 1, database.data.columns.get_loc("close")] = final_close
+        database.closed += 2
+
+        signal = get_signal(cache)
+
+        expected = MovingAverageCrossover(sma_s=5, sma_l=20, data=database.data.iloc[:database.closed])
+
+        assert signal == expected.get_signal()
+        assert cache._entries[1].strategy._indicators["SMA_L"].value == pytest.approx(
+            database.data["close"].iloc[database.closed - 20:database.closed].mean()
+        )
+
+    def test_params_change_evicts_strategy(self, cache, database):
+        """
+        GIVEN a cached strategy
+        WHEN the parameters of its pipeline change
+        THEN the strategy is warmed up again with the new parameters
+
+        """
+        get_signal(cache)
+        get_signal(cache, params=dict(sma_s=10, sma_l=30))
+
+        assert cache._entries[1].strategy._sma_l == 30
+
+    def test_strategy_behind_lookback_is_warmed_up_again(self, cache, database):
+        """
+        GIVEN a cached strategy
+        WHEN more candles than its lookback closed since its last signal
+        THEN it is warmed up again on the latest candles
+
+        """
+        get_signal(cache, strategy=Momentum, params=dict(window=10))
+
+        database.closed += 50
+
+        signal = get_signal(cache, strategy=Momentum, params=dict(window=10))
+
+        assert signal == Momentum(window=10, data=database.data.iloc[:database.closed]).get_signal()
+        assert database.reads[-1] == Momentum(window=10).lookback
+
+    def test_least_recently_used_strategy_is_evicted(self, cache, database):
+        get_signal(cache, pipeline_id=1)
+        get_signal(cache, pipeline_id=2)
+        get_signal(cache, pipeline_id=1)
+        get_signal(cache, pipeline_id=3)
+
+        assert 1 in cache and 3 in cache and 2 not in cache
+
+    def test_invalid_strategy_is_not_cached(self, cache, database):
+        assert cache.get_signal(1, "BTCUSDT", "1h", "binance", "Invalid", {}, lambda: None) is None
+        assert 1 not in cache
+
+    def test_stopped_pipelines_are_evicted(self, database, create_pipeline, create_inactive_pipeline):
+        """
+        GIVEN cached strategies
+        WHEN one of their pipelines is stopped
+        THEN its strategy is evicted on the next check
+
+        """
+        cache = StrategyCache(None, prune_interval=0)
+
+        get_signal(cache, pipeline_id=1)
+        get_signal(cache, pipeline_id=3)
+        get_signal(cache, pipeline_id=1)
+
+        assert 1 in cache
+        assert 3 not in cache
+
+    def test_preloaded_data_is_not_read_again(self, cache, database):
+        """
+        GIVEN the candles of the market, read once for all its pipelines
+        WHEN the signal of a cached strategy is generated with them
+        THEN the database is not read
+
+        """
+        params = dict(sma_s=5, sma_l=20)
+
+        get_signal(cache)
+        reads = len(database.reads)
+
+        database.closed += 3
+        data = database.get_data(None, None, "BTCUSDT", "1h", rows=50)
+
+        signal = cache.get_signal(
+            1, "BTCUSDT", "1h", "binance", "MovingAverageCrossover", params,
+            lambda: MovingAverageCrossover(**params), data=data
+        )
+
+        assert len(database.reads) == reads + 1
+        assert signal == MovingAverageCrossover(**params, data=database.data.iloc[:database.closed]).get_signal()
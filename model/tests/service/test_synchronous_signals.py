@@ -0,0 +1,111 @@
+import threading
+
+import model.service.helpers.synchronous_signals
+from model.service.helpers.synchronous_signals import compute_signals, SignalExecutor
+from shared.utils.tests.fixtures.models import *
+
+
+class Pipeline:
+
+    def __init__(self, id):
+        self.id = id
+        self.symbol = "BTCUSDT"
+        self.candle_size = "1h"
+        self.exchange = "binance"
+        self.strategy = "MovingAverage"
+        self.params = {}
+
+
+PIPELINES = [Pipeline(1), Pipeline(2)]
+
+HEADERS = {1: '', 2: ''}
+
+
+class TestSynchronousSignals:
+
+    def test_signals_computed_in_time(self, mocker):
+        mocker.patch(
+            "model.service.helpers.synchronous_signals.compute_signal",
+            side_effect=lambda pipeline_id, *args: {1: 1, 2: None}[pipeline_id]
+        )
+
+        signals, late = compute_signals(PIPELINES, HEADERS, timeout=5)
+
+        assert signals == {1: 1, 2: None}
+        assert late == []
+
+    def test_late_signals_fall_back(self, mocker):
+        """
+        GIVEN a signal which takes longer than the time budget
+        WHEN the signals are computed
+        THEN it is returned as late, while the signals computed in time are returned
+
+        """
+        released = threading.Event()
+
+        def compute_signal(pipeline_id, *args):
+            if pipeline_id == 2:
+                released.wait(5)
+            return 1
+
+        mocker.patch("model.service.helpers.synchronous_signals.compute_signal", side_effect=compute_signal)
+
+        try:
+            signals, late = compute_signals(PIPELINES, HEADERS, timeout=0.2)
+        finally:
+            released.set()
+
+        assert signals == {1: 1}
+        assert late == [PIPELINES[1]]
+
+    def test_failed_signals_fall_back(self, mocker):
+        mocker.patch(
+            "model.service.helpers.synchronous_signals.compute_signal",
+            side_effect=lambda pipeline_id, *args: 1 / (pipeline_id - 2)
+        )
+
+        signals, late = compute_signals(PIPELINES, HEADERS, timeout=5)
+
+        assert signals == {1: -1}
+        assert late == [PIPELINES[1]]
+
+    def test_saturated_threads_fall_back(self, mocker):
+        """
+        GIVEN all the signal threads are busy with a late signal
+        WHEN signals are requested
+        THEN they are enqueued without being computed, until the late signal concludes
+
+        """
+        mocker.patch.object(model.service.helpers.synchronous_signals, "executor", SignalExecutor(max_workers=1))
+
+        released = threading.Event()
+        computed = []
+
+        def compute_signal(pipeline_id, *args):
+            computed.append(pipeline_id)
+
+            if pipeline_id == 1:
+                released.wait(5)
+            return 1
+
+        mocker.patch("model.service.helpers.synchronous_signals.compute_signal", side_effect=compute_signal)
+
+        try:
+            assert compute_signals(PIPELINES[:1], HEADERS, timeout=0.1) == ({}, [PIPELINES[0]])
+
+            assert compute_signals(PIPELINES[1:], HEADERS, timeout=5) == ({}, [PIPELINES[1]])
+            assert computed == [1]
+        finally:
+            released.set()
+
+        # The thread is released once the late signal concludes.
+        for _ in range(50):
+            signals, late = compute_signals(PIPELINES[1:], HEADERS, timeout=5)
+
+            if signals:
+                break
+
+            threading.Event().wait(0.01)
+
+        assert signals == {2: 1}
+        assert computed[-1] == 2
@@ -0,0 +1,128 @@
+import datetime
+import json
+import os
+import time
+
+import pytest
+
+from model.service.helpers.worker_metrics import (
+    JobMetricsMixin,
+    JOB_LATENCIES_KEY,
+    get_worker_metrics,
+    record_job_latency,
+)
+from model.service.helpers.worker_pool import WorkerPool, get_pool_size, preload
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+
+        time.sleep(0.05)
+
+    return True
+
+
+class TestWorkerPool:
+
+    def test_pool_size(self):
+        assert get_pool_size(3) == 3
+        assert get_pool_size(0) == (os.cpu_count() or 1)
+
+    def test_preload(self):
+        preload(["json"])
+
+        with pytest.raises(ImportError):
+            preload(["not_a_module"])
+
+    def test_workers_are_replaced_and_terminated(self, tmp_path):
+        """
+        GIVEN a pool of workers
+        WHEN one of them exits
+        THEN it is replaced, until the pool is terminated
+
+        """
+        def run_worker():
+            with open(tmp_path / str(os.getpid()), "w"):
+                pass
+
+            time.sleep(60)
+
+        pool = WorkerPool(run_worker, 2).start()
+
+        try:
+            assert wait_until(lambda: len(os.listdir(tmp_path)) == 2)
+
+            pool.processes[0].kill()
+            pool.processes[0].join()
+
+            assert pool.check() == 1
+            assert wait_until(lambda: len(os.listdir(tmp_path)) == 3)
+            assert all(process.is_alive() for process in pool.processes)
+
+        finally:
+            pool.terminate(timeout=5)
+
+        assert not any(process.is_alive() for process in pool.processes)
+        assert pool.check() == 0
+
+
+class TestWorkerMetrics:
+
+    def test_record_job_latency(self, mocker):
+        connection = mocker.Mock()
+
+        job = mocker.Mock()
+        job.enqueued_at = datetime.datetime(2021, 1, 1, 0, 0, 0)
+        job.started_at = datetime.datetime(2021, 1, 1, 0, 0, 2)
+        job.ended_at = datetime.datetime(2021, 1, 1, 0, 0, 3)
+
+        record_job_latency(connection, job)
+
+        pipeline = connection.pipeline.return_value
+
+        key, sample = pipeline.lpush.call_args[0]
+
+        assert key == JOB_LATENCIES_KEY
+        assert json.loads(sample) == {"latency": 3.0, "duration": 1.0}
+        pipeline.execute.assert_called_once()
+
+    def test_metrics_mixin_records_failed_jobs(self, mocker):
+        record_job_latency = mocker.patch("model.service.helpers.worker_metrics.record_job_latency")
+
+        class BaseWorker:
+            connection = "connection"
+
+            def perform_job(self, job, queue):
+                raise ValueError
+
+        class Worker(JobMetricsMixin, BaseWorker):
+            pass
+
+        with pytest.raises(ValueError):
+            Worker().perform_job("job", "queue")
+
+        record_job_latency.assert_called_once_with("connection", "job")
+
+    def test_get_worker_metrics(self, mocker):
+        connection = mocker.Mock()
+        connection.lrange.return_value = [
+            json.dumps({"latency": latency, "duration": 0.5}) for latency in [1, 2, 3, 4]
+        ]
+
+        queue = mocker.MagicMock()
+        queue.__len__.return_value = 7
+
+        mocker.patch("model.service.helpers.worker_metrics.StartedJobRegistry").return_value.count = 2
+        mocker.patch("model.service.helpers.worker_metrics.Worker.count", return_value=4)
+
+        metrics = get_worker_metrics(connection, queue)
+
+        assert metrics["queue_depth"] == 7
+        assert metrics["started_jobs"] == 2
+        assert metrics["workers"] == 4
+        assert metrics["latency"] == {"count": 4, "mean": 2.5, "p50": 2.5, "p95": pytest.approx(3.85), "max": 4.0}
+        assert metrics["duration"]["max"] == 0.5
@@ -3,6 +3,7 @@ import os
 import pytest
 
 import model
+from model.strategies.registry import STRATEGY_REGISTRY
 from model.tests.setup.test_data.sample_data import STRATEGIES
 
 TEST_APP_NAME = "test_app"
@@ -49,9 +50,14 @@ def mock_strategy(*args, **kwargs):
 def mock_strategy_factory(strategy):
     def mock_strategy(*args, **kwargs):
         class MockStrategy:
+            lookback = 100
+
             def __init__(self, *args1, **kwargs1):
                 pass
 
+            def set_data(self, data, strategy_obj=None):
+                pass
+
             def get_signal(self):
                 return 1
 
@@ -59,7 +65,7 @@ def mock_strategy_factory(strategy):
 
     @pytest.fixture()
     def mocked_strategy(mocker):
-        mocker.patch.object(model.service.helpers.signal_generator, strategy, mock_strategy)
+        mocker.patch.object(STRATEGY_REGISTRY.get(strategy), "create", mock_strategy)
 
     return mocked_strategy
 
@@ -0,0 +1,79 @@
+import pytest
+
+from model.service.helpers.signal_generator import get_strategy
+from model.strategies import MovingAverageCrossover, Momentum
+from model.strategies.properties import STRATEGIES
+from model.strategies.registry import STRATEGY_REGISTRY, StrategyRegistry
+from model.strategies._mixin import StrategyMixin
+
+
+class CustomStrategy(StrategyMixin):
+    """
+    Custom strategy.
+    """
+
+    def __init__(self, threshold: float, data=None, **kwargs):
+        self._threshold = threshold
+
+        StrategyMixin.__init__(self, data, **kwargs)
+
+
+class TestStrategyRegistry:
+
+    def test_registry_contains_strategies(self):
+        assert set(STRATEGIES) == set(STRATEGY_REGISTRY)
+        assert STRATEGIES["MovingAverage"] == STRATEGY_REGISTRY.get("MovingAverage").properties
+
+    @pytest.mark.parametrize(
+        "strategy,params,expected_params",
+        [
+            pytest.param("Momentum", {"window": "10"}, {"window": 10}, id="Momentum"),
+            pytest.param("MovingAverage", {"ma": 20.0, "moving_av": "ema"}, {"ma": 20, "moving_av": "ema"}, id="MovingAverage"),
+            pytest.param(
+                "MovingAverageCrossover",
+                {"sma_s": 10, "sma_l": "30", "trade_on_close": False},
+                {"sma_s": 10, "sma_l": 30, "trade_on_close": False},
+                id="MovingAverageCrossover-kwargs"
+            ),
+        ],
+    )
+    def test_coerce(self, strategy, params, expected_params):
+        assert STRATEGY_REGISTRY.get(strategy).coerce(params) == expected_params
+
+    @pytest.mark.parametrize(
+        "strategy,params",
+        [
+            pytest.param("Momentum", {}, id="missing"),
+            pytest.param("Momentum", {"window": "ten"}, id="not-a-number"),
+            pytest.param("MovingAverage", {"ma": 20, "moving_av": "wma"}, id="not-an-option"),
+        ],
+    )
+    def test_coerce_invalid_params(self, strategy, params):
+        with pytest.raises(ValueError):
+            STRATEGY_REGISTRY.get(strategy).coerce(params)
+
+    def test_create(self):
+        strategy = STRATEGY_REGISTRY.create("MovingAverageCrossover", {"sma_s": "5", "sma_l": "20"})
+
+        assert isinstance(strategy, MovingAverageCrossover)
+        assert strategy._sma_l == 20
+
+    def test_register(self):
+        registry = StrategyRegistry()
+        registry.register(CustomStrategy)
+
+        assert registry.create("CustomStrategy", {"threshold": "0.5"})._threshold == 0.5
+        assert registry.properties()["CustomStrategy"]["paramsOrder"] == ["threshold"]
+
+    @pytest.mark.parametrize(
+        "strategy,params,expected_class",
+        [
+            pytest.param("Momentum", {"window": 10}, Momentum, id="valid"),
+            pytest.param("MovingAverage", {"ma": "sma"}, None, id="invalid-params"),
+            pytest.param("InvalidStrategy", {}, None, id="invalid-strategy"),
+        ],
+    )
+    def test_get_strategy(self, strategy, params, expected_class):
+        instance = get_strategy(strategy, params)
+
+        assert (instance is None) if expected_class is None else isinstance(instance, expected_class)
@@ -1,6 +1,22 @@
-from model.service.helpers.signal_generator import send_signal, trigger_order
+import json
+
+import pandas as pd
+
+from model.service.helpers.signal_generator import (
+    send_signal,
+    send_signal_entry,
+    send_signal_job,
+    trigger_order,
+    send_market_signals,
+    send_market_signals_job,
+    get_strategy,
+    get_pipeline_job_id,
+    split_pipeline_job_id,
+)
 from model.tests.setup.fixtures.internal_modules import *
 from model.tests.setup.test_data.sample_data import sample_structured_data
+from model.service.helpers.strategy_cache import StrategyCache
+from model.strategies._mixin import StrategyMixin
 from model.strategies.properties import STRATEGIES
 from shared.utils.tests.fixtures.models import *
 
@@ -129,3 +145,210 @@ class TestSignalGeneration:
         res = trigger_order(**params)
 
         assert res == expected_value
+
+    @pytest.mark.parametrize(
+        "send_signal_effect,expected_response",
+        [
+            pytest.param(
+                {"return_value": True},
+                {"code": "FINISHED", "success": True, "status": "Job finished."},
+                id="FINISHED",
+            ),
+            pytest.param(
+                {"side_effect": Exception("Failed")},
+                {"code": "FAILED", "status": "Job failed."},
+                id="FAILED",
+            ),
+        ],
+    )
+    def test_send_signal_job_publishes_conclusion(self, send_signal_effect, expected_response, mocker):
+        mocker.patch("model.service.helpers.signal_generator.send_signal", **send_signal_effect)
+
+        job = mocker.Mock()
+        job.get_id.return_value = "abcdef"
+        mocker.patch("model.service.helpers.signal_generator.get_current_job", return_value=job)
+
+        pipeline = job.connection.pipeline.return_value
+
+        try:
+            send_signal_job(1, "BTC", "1h", "Binance", "Momentum", "abc")
+        except Exception:
+            pass
+
+        payload = pipeline.publish.call_args[0][1]
+
+        assert json.loads(payload) == {"job_id": "abcdef", "response": expected_response}
+        assert pipeline.set.call_args[0][0] == "job_result abcdef"
+        pipeline.execute.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "send_signal_effect,expected_response",
+        [
+            pytest.param(
+                {"return_value": False},
+                {"code": "FINISHED", "success": False, "status": "Job finished."},
+                id="FINISHED",
+            ),
+            pytest.param(
+                {"side_effect": Exception("Failed")},
+                {"code": "FAILED", "status": "Job failed."},
+                id="FAILED",
+            ),
+        ],
+    )
+    def test_send_signal_entry(self, send_signal_effect, expected_response, mocker, create_pipeline):
+        send_signal = mocker.patch("model.service.helpers.signal_generator.send_signal", **send_signal_effect)
+        mocker.patch("model.service.helpers.signal_generator.get_item_from_cache", return_value='"header"')
+
+        publish_job_result = mocker.patch("model.service.helpers.signal_generator.publish_job_result")
+        mocker.patch("model.service.helpers.signal_generator.get_connection")
+
+        send_signal_entry("1-0", {"pipeline_id": 1})
+
+        assert send_signal.call_args[0][:2] == (1, "BTCUSDT")
+        assert publish_job_result.call_args[0][1:] == ("1-0", expected_response)
+
+    def test_trigger_order_over_message_bus(self, mock_execute_order, mocker):
+        mocker.patch("model.service.helpers.signal_generator.USE_MESSAGE_BUS", True)
+        publish = mocker.patch("model.service.helpers.signal_generator.publish")
+
+        assert trigger_order(1, -1, None)
+
+        publish.assert_called_once_with("orders", pipeline_id=1, signal=-1)
+        mock_execute_order.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "cached_signal,expected_value",
+        [
+            pytest.param(1, True, id="SIGNAL"),
+            pytest.param(None, False, id="NO_SIGNAL"),
+        ],
+    )
+    def test_send_signal_with_strategy_cache(self, cached_signal, expected_value, mocker, mock_get_data, mock_trigger_order):
+        strategy_cache = mocker.Mock()
+        strategy_cache.get_signal.return_value = cached_signal
+        mocker.patch("model.service.helpers.signal_generator.get_strategy_cache", return_value=strategy_cache)
+
+        mock_trigger_order.return_value = True
+
+        res = send_signal(1, "BTC", "1h", "Binance", "Momentum", "abc", {"window": 10})
+
+        assert res == expected_value
+        assert strategy_cache.get_signal.call_args[0][:6] == (1, "BTC", "1h", "Binance", "Momentum", {"window": 10})
+        mock_get_data.assert_not_called()
+
+
+def get_market_pipelines(*strategies):
+    return [
+        dict(id=pipeline_id, strategy=strategy, params=params, header=f"{pipeline_id}: ")
+        for pipeline_id, (strategy, params) in enumerate(strategies, 1)
+    ]
+
+
+class TestMarketSignals:
+
+    def test_send_market_signals(self, mocker, mock_trigger_order):
+        """
+        GIVEN pipelines of the same market
+        WHEN their signals are generated by a market job
+        THEN the candles are read once and each pipeline's order is triggered with its own signal
+
+        """
+        data = pd.DataFrame(
+            {"open": range(1, 301), "close": range(1, 301), "high": 0, "low": 0, "volume": 0},
+            index=pd.date_range("2021-01-01", periods=300, freq="H", tz="UTC", name="open_time"),
+        ).astype(float)
+
+        get_data = mocker.patch("model.service.helpers.signal_generator.get_data", return_value=data)
+
+        mock_trigger_order.side_effect = lambda pipeline_id, signal, bearer_token, header: pipeline_id != 3
+
+        pipelines = get_market_pipelines(
+            ("MovingAverageCrossover", {"sma_s": 5, "sma_l": 20}),
+            ("Momentum", {"window": 10}),
+            ("BollingerBands", {"ma": 20, "sd": 2}),
+            ("InvalidStrategy", {}),
+        )
+
+        results = send_market_signals("BTCUSDT", "1h", "binance", pipelines, "abc")
+
+        assert results == {"1": True, "2": True, "3": False, "4": False}
+
+        get_data.assert_called_once()
+        assert get_data.call_args[1]["rows"] == get_strategy("BollingerBands", {"ma": 20, "sd": 2}).lookback
+
+        signals = {call[0][0]: call[0][1] for call in mock_trigger_order.call_args_list}
+
+        expected_signals = {}
+
+        for pipeline in pipelines[:3]:
+            strategy = get_strategy(pipeline["strategy"], pipeline["params"])
+            strategy.set_data(data, strategy)
+            expected_signals[pipeline["id"]] = strategy.get_signal()
+
+        assert signals == expected_signals
+
+    def test_send_market_signals_with_strategy_cache(self, mocker, mock_trigger_order):
+        """
+        GIVEN the strategy cache is enabled
+        WHEN the signals of the pipelines of a market are generated
+        THEN the strategies are kept warm instead of sharing indicators, with the same signals
+
+        """
+        data = pd.DataFrame(
+            {"open": range(1, 301), "close": range(1, 301), "high": 0, "low": 0, "volume": 0},
+            index=pd.date_range("2021-01-01", periods=300, freq="H", tz="UTC", name="open_time"),
+        ).astype(float)
+
+        get_data = mocker.patch("model.service.helpers.signal_generator.get_data", return_value=data)
+
+        strategy_cache = StrategyCache(None)
+        mocker.patch("model.service.helpers.signal_generator.get_strategy_cache", return_value=strategy_cache)
+
+        share_indicators = mocker.spy(StrategyMixin, "share_indicators")
+
+        pipelines = get_market_pipelines(
+            ("MovingAverageCrossover", {"sma_s": 5, "sma_l": 20}),
+            ("Momentum", {"window": 10}),
+        )
+
+        send_market_signals("BTCUSDT", "1h", "binance", pipelines, "abc")
+
+        get_data.assert_called_once()
+        share_indicators.assert_not_called()
+        assert len(strategy_cache) == 2
+
+        signals = {call[0][0]: call[0][1] for call in mock_trigger_order.call_args_list}
+
+        for pipeline in pipelines:
+            strategy = get_strategy(pipeline["strategy"], pipeline["params"])
+            strategy.set_data(data, strategy)
+
+            assert signals[pipeline["id"]] == strategy.get_signal()
+
+    def test_send_market_signals_job_publishes_conclusions(self, mocker):
+        mocker.patch(
+            "model.service.helpers.signal_generator.send_market_signals",
+            return_value={"1": True, "2": False, "3": None}
+        )
+
+        job = mocker.Mock()
+        job.get_id.return_value = "abcdef"
+        mocker.patch("model.service.helpers.signal_generator.get_current_job", return_value=job)
+
+        send_market_signals_job("BTCUSDT", "1h", "binance", get_market_pipelines(), "abc")
+
+        published = {
+            call[0][0]: json.loads(call[0][1])["response"]["code"]
+            for call in job.connection.pipeline.return_value.set.call_args_list
+        }
+
+        assert published == {
+            "job_result abcdef:1": "FINISHED",
+            "job_result abcdef:2": "FINISHED",
+            "job_result abcdef:3": "FAILED",
+        }
+
+    def test_pipeline_job_id(self):
+        assert split_pipeline_job_id(get_pipeline_job_id("abcdef", 1)) == ("abcdef", "1")
+        assert split_pipeline_job_id("abcdef") == ("abcdef", None)
@@ -1,9 +1,17 @@
+import json
 import os
 
 import pytest
 import numpy as np
 import pandas as pd
 
+from model.strategies import (
+    BollingerBands,
+    Momentum,
+    MovingAverage,
+    MovingAverageConvergenceDivergence,
+    MovingAverageCrossover,
+)
 from model.tests.setup.test_data.sample_data import data
 from shared.utils.tests.test_setup import get_fixtures
 
@@ -87,3 +95,140 @@ class TestStrategy:
         instance = strategy(**params, data=data)
 
         assert instance.get_signal() == fixture["out"]["expected_signal"]
+
+
+def get_random_walk(periods=1000):
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, periods))
+
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=pd.date_range("2021-01-01", periods=periods, freq="H", tz="UTC", name="open_time"),
+    )
+
+
+class TestIncrementalStrategy:
+    @pytest.mark.parametrize(
+        "strategy,params,columns",
+        [
+            pytest.param(MovingAverage, dict(ma=50), ["SMA"], id="MovingAverage-sma"),
+            pytest.param(MovingAverage, dict(ma=50, moving_av="ema"), ["SMA"], id="MovingAverage-ema"),
+            pytest.param(MovingAverageCrossover, dict(sma_s=10, sma_l=40), ["SMA_S", "SMA_L"], id="MovingAverageCrossover"),
+            pytest.param(
+                MovingAverageConvergenceDivergence,
+                dict(window_slow=26, window_fast=12, window_sign=9),
+                ["macd_diff"],
+                id="MovingAverageConvergenceDivergence"
+            ),
+            pytest.param(BollingerBands, dict(ma=20, sd=2), ["sma", "upper", "lower", "position"], id="BollingerBands"),
+            pytest.param(Momentum, dict(window=10), ["rolling_returns"], id="Momentum"),
+        ],
+    )
+    def test_incremental_mode_matches_full_computation(self, strategy, params, columns):
+        """
+        GIVEN a strategy warmed up in incremental mode, whose state is serialized and restored
+        WHEN it is advanced one candle at a time
+        THEN its indicators and signal are equal to those computed over the whole history
+
+        """
+        random_walk = get_random_walk()
+
+        instance = strategy(**params, data=random_walk)
+
+        incremental = strategy(**params)
+        incremental.start_incremental(random_walk.iloc[:100])
+
+        restored = strategy(**params)
+        restored.set_state(json.loads(json.dumps(incremental.get_state())))
+
+        rows = pd.DataFrame(
+            [restored.update(candle) for candle in random_walk.iloc[100:].to_dict("records")],
+            index=random_walk.index[100:],
+        )
+
+        for column in columns + ["returns"]:
+            np.testing.assert_allclose(
+                rows[column].astype(float), instance.data[column].iloc[100:].astype(float), rtol=1e-9, equal_nan=True
+            )
+
+        assert restored.get_signal() == instance.get_signal()
+
+    @pytest.mark.parametrize(
+        "strategy,params,expected_lookback",
+        [
+            pytest.param(MovingAverage, dict(ma=50), 51, id="MovingAverage-sma"),
+            pytest.param(MovingAverageCrossover, dict(sma_s=10, sma_l=40), 41, id="MovingAverageCrossover"),
+            pytest.param(BollingerBands, dict(ma=20, sd=2), 201, id="BollingerBands"),
+            pytest.param(Momentum, dict(window=10), 11, id="Momentum"),
+        ],
+    )
+    def test_lookback(self, strategy, params, expected_lookback):
+        assert strategy(**params).lookback == expected_lookback
+
+    @pytest.mark.parametrize(
+        "strategy,params,column",
+        [
+            pytest.param(MovingAverage, dict(ma=20, moving_av="ema"), "SMA", id="MovingAverage-ema"),
+            pytest.param(
+                MovingAverageConvergenceDivergence,
+                dict(window_slow=26, window_fast=12, window_sign=9),
+                "macd_diff",
+                id="MovingAverageConvergenceDivergence"
+            ),
+        ],
+    )
+    def test_exponential_lookback_converges(self, strategy, params, column):
+        """
+        GIVEN a strategy based on exponential moving averages
+        WHEN it is computed over its lookback only
+        THEN its last indicator value is that computed over the whole history
+
+        """
+        random_walk = get_random_walk(2000)
+
+        instance = strategy(**params, data=random_walk)
+        bounded = strategy(**params, data=random_walk.iloc[-instance.lookback:])
+
+        assert bounded.data[column].iloc[-1] == pytest.approx(instance.data[column].iloc[-1], abs=1e-3)
+
+
+class TestSharedIndicators:
+
+    def test_shared_indicators_match_separate_computation(self):
+        """
+        GIVEN strategies sharing their indicators on the same data
+        WHEN their data is set
+        THEN their indicators are those computed separately, and common indicators are computed once
+
+        """
+        random_walk = get_random_walk()
+
+        strategies = [
+            MovingAverage(ma=20),
+            MovingAverageCrossover(sma_s=20, sma_l=50),
+            BollingerBands(ma=20, sd=2),
+            Momentum(window=10),
+            MovingAverageConvergenceDivergence(),
+        ]
+
+        shared_indicators = {}
+
+        for strategy in strategies:
+            strategy.share_indicators(shared_indicators)
+            strategy.set_data(random_walk, strategy)
+
+        for strategy in strategies:
+            expected = strategy.__class__(**{
+                param: getattr(strategy, f"_{param}") for param in strategy.params
+            }, data=random_walk)
+
+            pd.testing.assert_frame_equal(strategy.data, expected.data)
+            assert strategy.get_signal() == expected.get_signal()
+
+        assert set(shared_indicators) == {
+            ("returns", "close"),
+            ("sma", "close", 20),
+            ("sma", "close", 50),
+            ("std", "close", 20),
+            ("rolling_returns", "close", True, 10),
+            ("macd_diff", "close", 26, 12, 9),
+        }
@@ -1,20 +1,81 @@
+import logging
 import os
+import signal
 import sys
 
 import redis
-from rq import Worker, Queue, Connection
+from rq import Worker, SimpleWorker, Queue, Connection
 import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
 django.setup()
 
+from django.db import close_old_connections, connections
+
+from database.model.models import StructuredData
+from model.service.helpers.strategy_cache import is_strategy_cache_enabled, enable_strategy_cache
+from model.service.helpers.worker_metrics import JobMetricsMixin, get_worker_metrics
+from model.service.helpers.worker_pool import WorkerPool, get_pool_size, preload
+# Strategies are registered once when the worker boots, instead of on each job.
+from model.strategies.registry import STRATEGY_REGISTRY
+
 listen = ['default']
 
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
 conn = redis.from_url(redis_url)
 
-if __name__ == '__main__':
-    with Connection(conn):
-        worker = Worker(list(map(Queue, listen)))
+
+class MetricsWorker(JobMetricsMixin, Worker):
+    pass
+
+
+class WarmWorker(JobMetricsMixin, SimpleWorker):
+    """
+    Worker which performs the jobs in its own process instead of forking one for
+    each of them, so that the strategies of the pipelines are kept warm across jobs.
+    """
+
+    def perform_job(self, job, queue):
+        # The database connection outlives the jobs.
+        close_old_connections()
+
+        return super().perform_job(job, queue)
+
+
+def run_worker():
+    # Workers of a pool open connections of their own.
+    connection = redis.from_url(redis_url)
+
+    with Connection(connection):
+        if is_strategy_cache_enabled():
+            enable_strategy_cache(StructuredData)
+            worker = WarmWorker(list(map(Queue, listen)))
+        else:
+            worker = MetricsWorker(list(map(Queue, listen)))
+
         worker.work()
+
+
+def log_metrics():
+    logging.info(f"Worker metrics: {get_worker_metrics(conn, Queue(listen[0], connection=conn))}.")
+
+
+if __name__ == '__main__':
+    pool_size = get_pool_size()
+
+    if pool_size == 1:
+        run_worker()
+        sys.exit()
+
+    preload()
+
+    # The workers are not to inherit the connections of the parent process.
+    connections.close_all()
+
+    pool = WorkerPool(run_worker, pool_size, monitor=log_metrics)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: pool.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: pool.stop())
+
+    pool.run()
@@ -0,0 +1,225 @@
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytz
+
+from shared.data.revisions import get_latest_revision, is_revised
+
+# Directory of the Parquet archive. Archiving is disabled if it is not set.
+ARCHIVE_PATH = os.getenv('DATA_ARCHIVE_PATH')
+
+ARCHIVE_COMPRESSION = os.getenv('DATA_ARCHIVE_COMPRESSION', 'zstd')
+
+# Key of the Parquet metadata holding the revision of the market a partition was written at.
+REVISION_KEY = b'revision'
+
+
+def get_archive_path(archive_path=None):
+    return archive_path if archive_path is not None else ARCHIVE_PATH
+
+
+def get_partition_dir(model_class, symbol, interval, exchange, archive_path=None):
+    return os.path.join(
+        get_archive_path(archive_path),
+        model_class._meta.db_table,
+        exchange,
+        symbol,
+        interval
+    )
+
+
+def get_month_range(month_start):
+    return month_start, month_start + pd.offsets.MonthBegin(1)
+
+
+def get_archived_months(model_class, symbol, interval, exchange='binance', archive_path=None):
+    """
+    Returns the archived month partitions as a dictionary of month start to file path.
+    """
+    if get_archive_path(archive_path) is None:
+        return {}
+
+    partition_dir = get_partition_dir(model_class, symbol, interval, exchange, archive_path)
+
+    if not os.path.isdir(partition_dir):
+        return {}
+
+    return {
+        pd.Timestamp(file_name[:-len('.parquet')], tz=pytz.utc): os.path.join(partition_dir, file_name)
+        for file_name in sorted(os.listdir(partition_dir))
+        if file_name.endswith('.parquet')
+    }
+
+
+def read_archive(model_class, start_date, symbol, interval, exchange='binance', archive_path=None):
+    """
+    Reads archived rows from start_date onwards.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class whose archive is read.
+    start_date: datetime object - required. Start date from which to read data. Can be None.
+    symbol: str - required. Symbol of the data.
+    interval: str - required. Candle size of the data.
+    exchange: str - optional. Exchange name.
+    archive_path: str - optional. Directory of the archive.
+
+    Returns
+    -------
+    Tuple with a DataFrame of the archived rows, and a list of the (start, end) date
+    ranges of the archived months that were read.
+
+    """
+
+    archived_months = {
+        month_start: path
+        for month_start, path in get_archived_months(model_class, symbol, interval, exchange, archive_path).items()
+        if start_date is None or get_month_range(month_start)[1] > start_date
+    }
+
+    if not archived_months:
+        return pd.DataFrame(), []
+
+    data = pd.concat([pd.read_parquet(path) for path in archived_months.values()], ignore_index=True)
+
+    if start_date is not None:
+        data = data[data["open_time"] >= start_date]
+
+    return data, [get_month_range(month_start) for month_start in archived_months]
+
+
+def write_partition(data, path, revision=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), REVISION_KEY: str(revision).encode()})
+
+    # Written to a temporary file first, so that readers never see a partially written partition.
+    temporary_path = path + '.tmp'
+
+    pq.write_table(table, temporary_path, compression=ARCHIVE_COMPRESSION)
+
+    os.replace(temporary_path, path)
+
+
+def get_partition_metadata(path):
+    """
+    Returns the number of rows of a partition and the revision of its market it was written at,
+    without reading its rows. Partitions written before revisions were tracked are at revision 0.
+    """
+    metadata = pq.read_metadata(path)
+
+    revision = (metadata.metadata or {}).get(REVISION_KEY)
+
+    return metadata.num_rows, int(revision) if revision is not None else 0
+
+
+def archive_data(model_class, exchange='binance', prune=False, now=None, archive_path=None, header=''):
+    """
+    Exports the rows of closed months to Parquet files, one per symbol, candle size
+    and month, and optionally prunes them from the database.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class to archive.
+    exchange: str - optional. Exchange name.
+    prune: bool - optional. Whether archived rows are deleted from the database.
+    now: datetime object - optional. Reference date, months before which are closed. Defaults to now.
+    archive_path: str - optional. Directory of the archive.
+    header: Header for logging line.
+
+    Returns
+    -------
+    Number of month partitions written.
+
+    """
+
+    if get_archive_path(archive_path) is None:
+        logging.debug(header + "Archive path is not set, skipping archiving.")
+        return 0
+
+    if now is None:
+        now = datetime.now(pytz.utc)
+
+    current_month = pd.Timestamp(now).tz_convert(pytz.utc).normalize().replace(day=1)
+
+    markets = model_class.objects \
+        .filter(exchange_id=exchange, open_time__lt=current_month) \
+        .values_list('symbol_id', 'interval') \
+        .distinct()
+
+    written_partitions = 0
+
+    for symbol, interval in markets:
+        written_partitions += archive_market(
+            model_class, symbol, interval, current_month, exchange, prune, archive_path, header
+        )
+
+    logging.info(header + f"Archived {written_partitions} month(s) of {model_class.__name__}.")
+
+    return written_partitions
+
+
+def archive_market(model_class, symbol, interval, current_month, exchange, prune, archive_path, header=''):
+
+    rows = model_class.objects.filter(exchange_id=exchange, symbol_id=symbol, interval=interval)
+
+    first_entry = rows.filter(open_time__lt=current_month).order_by('open_time').first()
+
+    if first_entry is None:
+        return 0
+
+    # Read before the rows, so that rows revised meanwhile are archived again on the next run.
+    revision = get_latest_revision(model_class, symbol, interval, exchange)
+
+    archived_months = get_archived_months(model_class, symbol, interval, exchange, archive_path)
+
+    partition_dir = get_partition_dir(model_class, symbol, interval, exchange, archive_path)
+
+    written_partitions = 0
+
+    month_start = pd.Timestamp(first_entry.open_time).tz_convert(pytz.utc).normalize().replace(day=1)
+
+    while month_start < current_month:
+        start_date, end_date = get_month_range(month_start)
+
+        month_rows = rows.filter(open_time__gte=start_date, open_time__lt=end_date)
+
+        archived_rows, archived_revision = get_partition_metadata(archived_months[month_start]) \
+            if month_start in archived_months else (0, 0)
+
+        month_count = month_rows.count()
+
+        # Rows which reached the database, or were revised, after the month was archived are merged onto it.
+        is_outdated = month_count > 0 and (
+            prune
+            or month_count != archived_rows
+            or is_revised(model_class, symbol, interval, start_date, end_date, exchange, archived_revision)
+        )
+
+        if is_outdated:
+            archived_data = pd.read_parquet(archived_months[month_start]) \
+                if month_start in archived_months else pd.DataFrame()
+
+            new_data = pd.DataFrame(month_rows.order_by('open_time').values())
+
+            data = pd.concat([archived_data, new_data], ignore_index=True) \
+                .drop_duplicates(subset=['open_time'], keep='last') \
+                .sort_values('open_time')
+
+            write_partition(data, os.path.join(partition_dir, f"{month_start.strftime('%Y-%m')}.parquet"), revision)
+
+            written_partitions += 1
+
+            if prune:
+                month_rows.delete()
+
+            logging.debug(header + f"Archived {len(data)} rows of {symbol} {interval} for {month_start:%Y-%m}.")
+
+        month_start = end_date
+
+    return written_partitions
@@ -0,0 +1,283 @@
+import fcntl
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from shared.data.revisions import get_revised_start
+
+# Directory of the local candle cache. Caching is disabled if it is not set.
+CACHE_PATH = os.getenv('CANDLE_CACHE_PATH')
+
+# Number of trailing cached rows which are compared against the database on every
+# sync, as the latest candles may still be updated. Older rows are compared once
+# their revision is recorded, eg. when gaps are repaired.
+RESYNC_ROWS = int(os.getenv('CANDLE_CACHE_RESYNC_ROWS', 100))
+
+TIME_COLUMNS = ["open_time", "close_time"]
+
+VALUE_COLUMNS = [
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "quote_volume",
+    "trades",
+    "taker_buy_asset_volume",
+    "taker_buy_quote_volume",
+]
+
+RECORD_DTYPE = np.dtype(
+    [(column, np.int64) for column in TIME_COLUMNS] + [(column, np.float64) for column in VALUE_COLUMNS]
+)
+
+
+def is_cache_enabled():
+    return bool(CACHE_PATH)
+
+
+def to_records(data):
+    """
+    Converts a DataFrame indexed by open_time onto an array of fixed width records.
+    """
+    records = np.empty(len(data), dtype=RECORD_DTYPE)
+
+    records["open_time"] = pd.DatetimeIndex(data.index).asi8
+
+    if "close_time" in data:
+        records["close_time"] = pd.to_datetime(data["close_time"], utc=True).values.astype(np.int64)
+    else:
+        records["close_time"] = np.iinfo(np.int64).min
+
+    for column in VALUE_COLUMNS:
+        records[column] = pd.to_numeric(data[column], errors='coerce').astype(np.float64) \
+            if column in data else np.nan
+
+    return records
+
+
+class CandleCache:
+    """
+    On disk cache of the candles of a single (exchange, symbol, interval), stored as
+    an append only file of fixed width records. The file is memory mapped, so that
+    readers get views of it instead of copies. Syncing with the database is done
+    under an exclusive file lock, as several processes may share the cache.
+
+    The latest revision of the market which the cache is synced with is stored next
+    to it, so that rows written before the trailing ones since then are synced too.
+    """
+
+    def __init__(self, model_class, symbol, interval, exchange='binance', cache_path=None):
+        self.model_class = model_class
+        self.symbol = symbol
+        self.interval = interval
+        self.exchange = exchange
+
+        directory = os.path.join(cache_path or CACHE_PATH, model_class._meta.db_table, exchange, symbol)
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = os.path.join(directory, f"{interval}.bin")
+        self.lock_path = os.path.join(directory, f"{interval}.lock")
+        self.revision_path = os.path.join(directory, f"{interval}.rev")
+
+        self._lock = threading.Lock()
+        self._records = np.empty(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def records(self):
+        return self._records
+
+    def sync(self, query):
+        """
+        Brings the cache up to date with the database.
+
+        Parameters
+        ----------
+        query: method - required. Function with the signature of query_data, used to read the database.
+
+        Returns
+        -------
+        The cache itself.
+
+        """
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                records = self._map()
+
+                cached_revision = self._read_revision()
+
+                # Read before the rows, so that rows revised meanwhile are synced on the next sync.
+                revised_start, revision = get_revised_start(
+                    self.model_class, self.symbol, self.interval, self.exchange, cached_revision or 0
+                )
+
+                new_records = None if cached_revision is None \
+                    else self._get_new_records(records, query, revised_start)
+
+                if new_records is None:
+                    self._rebuild(query)
+                elif len(new_records[1]) > 0:
+                    self._write(*new_records)
+
+                if revision != cached_revision:
+                    self._write_revision(revision)
+
+                self._records = self._map()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        return self
+
+    def tail(self, rows):
+        """
+        Returns a view of the last rows of the cache.
+        """
+        return self._records[max(len(self._records) - rows, 0):]
+
+    def to_frame(self, start_date=None, rows=None):
+        """
+        Returns the cached candles as a DataFrame indexed by open_time, in the
+        format of query_data.
+
+        Parameters
+        ----------
+        start_date: datetime object - optional. Start date from which to return data.
+        rows: int - optional. Maximum number of trailing rows to return.
+
+        Returns
+        -------
+        DataFrame with the cached candles.
+
+        """
+        records = self._records
+
+        if start_date is not None:
+            records = records[np.searchsorted(records["open_time"], pd.Timestamp(start_date).value):]
+
+        if rows is not None:
+            records = records[max(len(records) - rows, 0):]
+
+        data = pd.DataFrame(
+            {column: records[column] for column in VALUE_COLUMNS},
+            index=pd.DatetimeIndex(pd.to_datetime(records["open_time"], utc=True), name="open_time"),
+        )
+
+        data.insert(0, "close_time", pd.to_datetime(records["close_time"], utc=True))
+
+        return data
+
+    def _map(self):
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        # A partially written record, eg. from an interrupted append, is ignored.
+        length = os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+
+        if length == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(length,))
+
+    def _read_revision(self):
+        try:
+            with open(self.revision_path) as file:
+                return int(file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_revision(self, revision):
+        temporary_path = self.revision_path + '.tmp'
+
+        with open(temporary_path, 'w') as file:
+            file.write(str(revision))
+
+        os.replace(temporary_path, self.revision_path)
+
+    def _get_new_records(self, records, query, revised_start=None):
+        """
+        Reads the rows of the database from the trailing cached rows onwards, or from
+        the earliest revised row if it precedes them.
+
+        Returns
+        -------
+        Tuple with the position from which records are to be written and the records,
+        or None if the cache does not match the database and has to be rebuilt.
+
+        """
+        if len(records) == 0:
+            return None
+
+        resync_start = max(len(records) - RESYNC_ROWS, 0)
+
+        if revised_start is not None:
+            resync_start = min(
+                resync_start,
+                int(np.searchsorted(records["open_time"], pd.Timestamp(revised_start).value))
+            )
+
+        start_date = pd.Timestamp(records["open_time"][resync_start], tz='utc')
+
+        # Rows filling a gap precede the first cached row after it.
+        if revised_start is not None:
+            start_date = min(start_date, pd.Timestamp(revised_start).tz_convert('utc'))
+
+        new_records = to_records(query(self.model_class, start_date, self.symbol, self.interval, self.exchange))
+
+        cached_records = records[resync_start:]
+
+        # Candles were inserted or removed within the trailing rows.
+        if len(new_records) < len(cached_records) \
+                or not np.array_equal(new_records["open_time"][:len(cached_records)], cached_records["open_time"]):
+            return None
+
+        if len(new_records) == len(cached_records) and new_records.tobytes() == cached_records.tobytes():
+            return resync_start, new_records[:0]
+
+        return resync_start, new_records
+
+    def _write(self, position, new_records):
+        with open(self.path, 'r+b') as file:
+            file.seek(position * RECORD_DTYPE.itemsize)
+            file.write(new_records.tobytes())
+
+            # Drops a partially written record left by an interrupted write, if any.
+            file.truncate()
+
+    def _rebuild(self, query):
+        logging.debug(f"Rebuilding candle cache of {self.symbol} {self.interval}.")
+
+        data = query(self.model_class, None, self.symbol, self.interval, self.exchange)
+
+        # Written to a new file, so that readers of the current file are not affected.
+        temporary_path = self.path + '.tmp'
+
+        with open(temporary_path, 'wb') as file:
+            file.write(to_records(data).tobytes())
+
+        os.replace(temporary_path, self.path)
+
+
+_candle_caches = {}
+_candle_caches_lock = threading.Lock()
+
+
+def get_candle_cache(model_class, symbol, interval, exchange='binance'):
+    """
+    Returns the candle cache of the process for the given market, creating it on first use.
+    """
+    key = (model_class, symbol, interval, exchange)
+
+    with _candle_caches_lock:
+        if key not in _candle_caches:
+            _candle_caches[key] = CandleCache(model_class, symbol, interval, exchange)
+
+        return _candle_caches[key]
@@ -1,15 +1,117 @@
+import numpy as np
 import pandas as pd
 
+from shared.data.archive import read_archive, get_archived_months
+from shared.data.cache import get_candle_cache, is_cache_enabled, TIME_COLUMNS, VALUE_COLUMNS
 
-def get_data(model_class, start_date, symbol, interval, exchange='binance'):
+# Columns read by default, ie. the candles without the ids of their rows and markets.
+CANDLE_COLUMNS = TIME_COLUMNS + VALUE_COLUMNS
+
+# Columns needed to compute the signals of the strategies.
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Number of rows fetched at a time when reading whole markets.
+CHUNK_SIZE = 2000
+
+
+def get_data(model_class, start_date, symbol, interval, exchange='binance', rows=None, columns=None):
+
+    if is_cache_enabled():
+        data = get_candle_cache(model_class, symbol, interval, exchange).sync(query_data).to_frame(start_date, rows)
+
+        return data if columns is None else data[[column for column in columns if column != 'open_time']]
+
+    return query_data(model_class, start_date, symbol, interval, exchange, rows, columns)
+
+
+def query_data(model_class, start_date, symbol, interval, exchange='binance', rows=None, columns=None):
+
+    if rows is not None:
+        data = read_candles(model_class, start_date, symbol, interval, exchange, columns=columns, limit=rows)
+
+        # Older rows may only be found on the archive.
+        if len(data) >= rows or not get_archived_months(model_class, symbol, interval, exchange):
+            return data
+
+        return query_data(model_class, start_date, symbol, interval, exchange, columns=columns).iloc[-rows:]
+
+    archived_data, archived_months = read_archive(model_class, start_date, symbol, interval, exchange)
+
+    # Archived months are read from the archive only.
+    data = read_candles(model_class, start_date, symbol, interval, exchange, columns=columns, exclude=archived_months)
+
+    if len(archived_data) > 0:
+        archived_data = archived_data.set_index(
+            pd.DatetimeIndex(pd.to_datetime(archived_data["open_time"], utc=True), name='open_time')
+        )
+
+        data = pd.concat([archived_data.reindex(columns=data.columns), data])
+
+    return data
+
+
+def read_candles(model_class, start_date, symbol, interval, exchange='binance', columns=None, limit=None, exclude=()):
+    """
+    Reads candles from the database column by column, with a values_list query of
+    the requested columns only, whose values are converted to numpy arrays without
+    building a Python object per row.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class to read.
+    start_date: datetime object - required. Start date from which to read data. Can be None.
+    symbol: str - required. Symbol of the data.
+    interval: str - required. Candle size of the data.
+    exchange: str - optional. Exchange name.
+    columns: list - optional. Columns to read. Defaults to CANDLE_COLUMNS.
+    limit: int - optional. Number of trailing rows to read, with an ORDER BY open_time DESC LIMIT
+           query which is served by the market index of the candle tables.
+    exclude: list - optional. (start, end) date ranges of the rows not to read.
+
+    Returns
+    -------
+    DataFrame indexed by open_time, with a tz-aware DatetimeIndex.
+
+    """
+    columns = [column for column in (columns or CANDLE_COLUMNS) if column != 'open_time']
 
     query = dict(exchange=exchange, symbol=symbol, interval=interval)
 
     if start_date:
         query["open_time__gte"] = start_date
 
-    rows = model_class.objects.filter(**query).order_by('open_time').values()
+    rows = model_class.objects.filter(**query)
 
-    data = pd.DataFrame(rows).set_index('open_time')
+    for start, end in exclude:
+        rows = rows.exclude(open_time__gte=start, open_time__lt=end)
 
-    return data
+    if limit is not None:
+        rows = list(rows.order_by('-open_time').values_list('open_time', *columns)[:limit])[::-1]
+    else:
+        rows = list(rows.order_by('open_time').values_list('open_time', *columns).iterator(chunk_size=CHUNK_SIZE))
+
+    values = list(zip(*rows)) if rows else [()] * (len(columns) + 1)
+
+    return pd.DataFrame(
+        {column: to_array(model_class, column, column_values) for column, column_values in zip(columns, values[1:])},
+        index=pd.DatetimeIndex(pd.to_datetime(list(values[0]), utc=True), name='open_time'),
+        columns=columns,
+    )
+
+
+def to_array(model_class, column, values):
+    """
+    Converts the values of a column onto an array of the type of its field.
+    """
+    field_type = model_class._meta.get_field(column).get_internal_type()
+
+    if field_type == 'DateTimeField':
+        return pd.to_datetime(list(values), utc=True)
+
+    if field_type == 'FloatField':
+        return np.array(values, dtype=np.float64)
+
+    if field_type in ('IntegerField', 'BigIntegerField'):
+        return np.array(values, dtype=np.float64 if None in values else np.int64)
+
+    return np.array(values, dtype=object)
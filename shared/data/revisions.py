@@ -0,0 +1,72 @@
+import os
+
+import django
+from django.db.models import Max, Min, Q
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "database.settings")
+django.setup()
+
+from database.model.models import CandleRevision
+
+
+def get_market_revisions(model_class, symbol, interval, exchange='binance'):
+    return CandleRevision.objects.filter(
+        table=model_class._meta.db_table,
+        exchange_id=exchange,
+        symbol_id=symbol,
+        interval=interval
+    )
+
+
+def get_revised_start(model_class, symbol, interval, exchange='binance', revision=0):
+    """
+    Returns the earliest open time of the rows of a market revised since a revision.
+
+    Parameters
+    ----------
+    model_class: class - required. Database model class of the market.
+    symbol: str - required. Symbol of the market.
+    interval: str - required. Candle size of the market.
+    exchange: str - optional. Exchange name.
+    revision: int - optional. Revision from which to look for revised rows.
+
+    Returns
+    -------
+    Tuple with the earliest revised open time, which is None if no rows were revised, and the latest revision.
+
+    """
+    revisions = get_market_revisions(model_class, symbol, interval, exchange) \
+        .filter(id__gt=revision) \
+        .aggregate(start_time=Min('start_time'), revision=Max('id'))
+
+    return revisions["start_time"], revisions["revision"] or revision
+
+
+def get_latest_revision(model_class, symbol, interval, exchange='binance'):
+    return get_market_revisions(model_class, symbol, interval, exchange).aggregate(revision=Max('id'))["revision"] or 0
+
+
+def is_revised(model_class, symbol, interval, start_date, end_date, exchange='binance', revision=0):
+    """
+    Returns whether rows of a market between start_date, inclusive, and end_date, exclusive,
+    were revised since a revision. Revisions without an end time span all later rows.
+    """
+    return get_market_revisions(model_class, symbol, interval, exchange) \
+        .filter(id__gt=revision, start_time__lt=end_date) \
+        .filter(Q(end_time__isnull=True) | Q(end_time__gte=start_date)) \
+        .exists()
+
+
+def add_revision(model_class, exchange, symbol, interval, start_time, end_time=None):
+    """
+    Records that rows of a market from start_time to end_time were written after later rows,
+    ie. that its history was revised rather than extended.
+    """
+    CandleRevision.objects.create(
+        table=model_class._meta.db_table,
+        exchange_id=exchange,
+        symbol_id=symbol,
+        interval=interval,
+        start_time=start_time,
+        end_time=end_time
+    )
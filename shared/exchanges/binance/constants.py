@@ -109,16 +109,29 @@ FUNCTION_MAPPER = {
 }
 
 
-BINANCE_KEY = {
-    "open_time": lambda x: datetime.fromtimestamp(x[0] / 1000).astimezone(pytz.timezone('UTC')),
-    "close_time": lambda x: datetime.fromtimestamp(x[6] / 1000).astimezone(pytz.timezone('UTC')),
-    "open": lambda x: float(x[1]),
-    "high": lambda x: float(x[2]),
-    "low": lambda x: float(x[3]),
-    "close": lambda x: float(x[4]),
-    "volume": lambda x: float(x[5]),
-    "quote_volume": lambda x: float(x[7]),
-    "trades": lambda x: int(x[8]),
-    "taker_buy_asset_volume": lambda x: float(x[9]),
-    "taker_buy_quote_volume": lambda x: float(x[10]),
+BINANCE_KLINE_COLUMNS = {
+    "open_time": (0, "datetime"),
+    "close_time": (6, "datetime"),
+    "open": (1, "float64"),
+    "high": (2, "float64"),
+    "low": (3, "float64"),
+    "close": (4, "float64"),
+    "volume": (5, "float64"),
+    "quote_volume": (7, "float64"),
+    "trades": (8, "int64"),
+    "taker_buy_asset_volume": (9, "float64"),
+    "taker_buy_quote_volume": (10, "float64"),
 }
+
+
+BINANCE_REQUEST_WEIGHT_PER_MINUTE = 1200
+
+BINANCE_KLINES_MAX_LIMIT = 1000
+
+# (exclusive upper bound on the limit parameter, request weight)
+BINANCE_KLINES_WEIGHT = [
+    (100, 1),
+    (500, 2),
+    (1001, 5),
+    (1501, 10),
+]
@@ -0,0 +1,43 @@
+import json
+
+# Channel on which the model app publishes the completion of signal generation jobs.
+JOB_NOTIFICATIONS_CHANNEL = 'signal_jobs'
+
+# Time for which job results are kept, for listeners which start waiting after a job finished.
+JOB_RESULT_TTL = 300
+
+
+def get_job_result_key(job_id):
+    return f"job_result {job_id}"
+
+
+def publish_job_result(connection, job_id, response):
+    """
+    Stores the final response of a job and notifies the listeners of its completion.
+
+    Parameters
+    ----------
+    connection: redis.Redis - required. Redis connection.
+    job_id: str - required. Id of the job.
+    response: dict - required. Response of the job, in the format of the check_job endpoint.
+
+    Returns
+    -------
+    None
+
+    """
+    payload = json.dumps(dict(job_id=job_id, response=response))
+
+    pipeline = connection.pipeline()
+    pipeline.set(get_job_result_key(job_id), payload, ex=JOB_RESULT_TTL)
+    pipeline.publish(JOB_NOTIFICATIONS_CHANNEL, payload)
+    pipeline.execute()
+
+
+def get_job_result(connection, job_id):
+    """
+    Returns the stored response of a finished job, or None if it has not finished.
+    """
+    payload = connection.get(get_job_result_key(job_id))
+
+    return json.loads(payload)["response"] if payload else None
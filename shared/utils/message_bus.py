@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import socket
+import threading
+
+import redis
+
+# Whether candles and orders are passed between the services over redis streams instead of HTTP.
+USE_MESSAGE_BUS = os.getenv('USE_MESSAGE_BUS', '').lower() in ('1', 'true')
+
+# Pipelines whose candle closed, consumed by the model workers.
+CANDLES_STREAM = 'candles'
+
+# Orders to execute for the generated signals, consumed by the execution service.
+ORDERS_STREAM = 'orders'
+
+# Approximate number of entries kept on each stream.
+MAX_STREAM_LENGTH = int(os.getenv('MESSAGE_BUS_MAX_LENGTH', 10000))
+
+# Time after which entries read by a consumer which did not acknowledge them are claimed by another one.
+CLAIM_IDLE_TIME = int(os.getenv('MESSAGE_BUS_CLAIM_IDLE_TIME', 60000))
+
+# Number of deliveries after which an entry is given up on.
+MAX_DELIVERIES = 3
+
+_connection = None
+
+
+def get_connection():
+    global _connection
+
+    if _connection is None:
+        _connection = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+
+    return _connection
+
+
+def encode_entry(fields):
+    return {key: json.dumps(value) for key, value in fields.items()}
+
+
+def decode_entry(fields):
+    return {
+        (key.decode() if isinstance(key, bytes) else key): json.loads(value)
+        for key, value in fields.items()
+    }
+
+
+def publish(stream, connection=None, **fields):
+    """
+    Appends an entry onto a stream.
+
+    Parameters
+    ----------
+    stream: str - required. Name of the stream.
+    connection: redis.Redis - optional. Redis connection. Defaults to the one of REDIS_URL.
+    fields: Fields of the entry. Values are JSON encoded.
+
+    Returns
+    -------
+    Id of the entry.
+
+    """
+    connection = connection or get_connection()
+
+    entry_id = connection.xadd(stream, encode_entry(fields), maxlen=MAX_STREAM_LENGTH, approximate=True)
+
+    return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+
+class StreamConsumer:
+    """
+    Member of a consumer group of a stream, which passes each entry to a handler
+    and acknowledges it once handled. Consumers of the same group share the
+    entries of the stream between them, so that they can be scaled horizontally.
+
+    Entries which were read but not acknowledged, because the consumer died or
+    the handler raised an exception, are replayed when the consumer restarts,
+    or claimed by another consumer of the group once they have been idle for long.
+    """
+
+    def __init__(
+        self,
+        stream,
+        group,
+        handler,
+        consumer=None,
+        connection=None,
+        count=10,
+        block=5000,
+        claim_idle_time=CLAIM_IDLE_TIME,
+        header=''
+    ):
+        self.stream = stream
+        self.group = group
+        self.handler = handler
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.connection = connection or get_connection()
+        self.count = count
+        self.block = block
+        self.claim_idle_time = claim_idle_time
+        self.header = header
+
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def ensure_group(self):
+        try:
+            self.connection.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def consume(self):
+        """
+        Reads and handles a batch of new entries, blocking until there is one.
+
+        Returns
+        -------
+        Number of entries read.
+
+        """
+        response = self.connection.xreadgroup(
+            self.group, self.consumer, {self.stream: '>'}, count=self.count, block=self.block
+        )
+
+        entries = response[0][1] if response else []
+
+        self._handle_entries(entries)
+
+        return len(entries)
+
+    def replay_pending(self):
+        """
+        Handles the entries delivered to this consumer which were not acknowledged.
+        Entries which keep failing are handled once per replay.
+        """
+        handled = set()
+
+        while True:
+            response = self.connection.xreadgroup(self.group, self.consumer, {self.stream: '0'}, count=self.count)
+
+            entries = [entry for entry in (response[0][1] if response else []) if entry[0] not in handled]
+
+            if not entries:
+                return
+
+            handled.update(entry_id for entry_id, _ in entries)
+
+            self._handle_entries(entries)
+
+    def handle(self, entry_id, fields):
+        entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+        try:
+            self.handler(entry_id, decode_entry(fields))
+        except Exception as e:
+            logging.exception(self.header + f"Failed to handle entry {entry_id} of {self.stream}: {e}")
+            return False
+
+        self.connection.xack(self.stream, self.group, entry_id)
+
+        return True
+
+    def _handle_entries(self, entries):
+        for entry_id, fields in entries:
+            # Entries which were trimmed off the stream are still pending, without fields.
+            if fields:
+                self.handle(entry_id, fields)
+            else:
+                self.connection.xack(self.stream, self.group, entry_id)
+
+    def claim_stale(self):
+        """
+        Claims the entries which other consumers of the group, or this one, left
+        unacknowledged for longer than the claim idle time. Entries which were
+        delivered too many times are acknowledged and dropped.
+
+        Returns
+        -------
+        Number of entries claimed.
+
+        """
+        pending = self.connection.xpending_range(self.stream, self.group, '-', '+', self.count)
+
+        stale = [entry for entry in pending if entry["time_since_delivered"] >= self.claim_idle_time]
+
+        dropped = [entry["message_id"] for entry in stale if entry["times_delivered"] >= MAX_DELIVERIES]
+
+        if dropped:
+            logging.warning(self.header + f"Dropping entries of {self.stream} which failed repeatedly: {dropped}.")
+            self.connection.xack(self.stream, self.group, *dropped)
+
+        claimable = [entry["message_id"] for entry in stale if entry["message_id"] not in dropped]
+
+        if not claimable:
+            return 0
+
+        return len(self.connection.xclaim(self.stream, self.group, self.consumer, self.claim_idle_time, claimable))
+
+    def run(self):
+        self.ensure_group()
+
+        logging.info(self.header + f"Consuming {self.stream} as {self.consumer} of group {self.group}.")
+
+        self.replay_pending()
+
+        while not self._stopped.is_set():
+            try:
+                if self.claim_stale():
+                    self.replay_pending()
+
+                self.consume()
+
+            except redis.ConnectionError as e:
+                logging.warning(self.header + f"Lost connection to the message bus: {e}.")
+                self._stopped.wait(5)
+
+    def start(self):
+        self._stopped.clear()
+
+        self._thread = threading.Thread(target=self.run, name=f"{self.stream}-consumer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,120 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from django.db import connection
+
+from shared.exchanges.binance.constants import CANDLE_SIZES_MAPPER
+
+# Number of pipelines resumed at the same time on startup.
+RESUMPTION_WORKERS = int(os.getenv('RESUMPTION_WORKERS', 8))
+
+
+def get_candle_size_duration(candle_size):
+    return pd.Timedelta(CANDLE_SIZES_MAPPER.get(candle_size, candle_size))
+
+
+class PipelineResumption:
+    """
+    Resumes the pipelines which were active when the service stopped, on a bounded
+    pool of threads and in the background, so that the service accepts requests
+    while they are resumed. Pipelines with shorter candle sizes, whose next signal
+    is due sooner, are resumed first.
+    """
+
+    def __init__(self, resume, get_candle_size=None, max_workers=RESUMPTION_WORKERS, header=''):
+        """
+        Parameters
+        ----------
+        resume: method - required. Function which resumes a pipeline, given the pipeline.
+        get_candle_size: method - optional. Function which returns the candle size of a pipeline.
+                         Defaults to its candle_size attribute.
+        max_workers: int - optional. Number of pipelines resumed at the same time.
+        header: Header for logging line.
+
+        """
+        self.resume = resume
+        self.get_candle_size = get_candle_size or (lambda pipeline: pipeline.candle_size)
+        self.max_workers = max_workers
+        self.header = header
+
+        self.total = 0
+        self.resumed = []
+        self.failed = {}
+
+        self._start_time = None
+        self._end_time = None
+        self._thread = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def elapsed(self):
+        if self._start_time is None:
+            return 0
+
+        return (self._end_time or time.perf_counter()) - self._start_time
+
+    def start(self, pipelines):
+        pipelines = sorted(pipelines, key=lambda pipeline: get_candle_size_duration(self.get_candle_size(pipeline)))
+
+        self.total = len(pipelines)
+        self._start_time = time.perf_counter()
+
+        logging.info(self.header + f"Resuming {self.total} pipeline(s).")
+
+        self._thread = threading.Thread(target=self._run, args=(pipelines,), name='pipeline-resumption', daemon=True)
+        self._thread.start()
+
+        return self
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return dict(
+            total=self.total,
+            resumed=len(self.resumed),
+            failed=self.failed,
+            pending=self.total - len(self.resumed) - len(self.failed),
+            elapsed=self.elapsed,
+            done=self.done,
+        )
+
+    def _resume(self, pipeline):
+        try:
+            self.resume(pipeline)
+        finally:
+            # Each worker thread holds its own database connection.
+            connection.close()
+
+    def _run(self, pipelines):
+        try:
+            with ThreadPoolExecutor(max(self.max_workers, 1), thread_name_prefix='pipeline-resumption') as executor:
+                # Pipelines are picked up by the workers in the order in which they were submitted.
+                futures = {executor.submit(self._resume, pipeline): pipeline for pipeline in pipelines}
+
+                for future in as_completed(futures):
+                    pipeline = futures[future]
+
+                    try:
+                        future.result()
+                        self.resumed.append(pipeline.id)
+                    except Exception as e:
+                        logging.warning(self.header + f"Failed to resume pipeline {pipeline.id}: {e}")
+                        self.failed[pipeline.id] = str(e)
+
+                    logging.info(
+                        self.header + f"Resumed {len(self.resumed)}/{self.total} pipeline(s), {len(self.failed)} failed."
+                    )
+        finally:
+            self._end_time = time.perf_counter()
+            self._done.set()
+
+        logging.info(self.header + f"Pipeline resumption finished: {self.to_dict()}.")